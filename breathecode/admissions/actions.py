@@ -10,4 +10,38 @@ def get_bucket_object(file_name):
 
     storage = Storage()
     file = storage.file(BUCKET_NAME, file_name)
-    return file.blob
\ No newline at end of file
+    return file.blob
+
+def get_cohort_users_to_update(items):
+    """
+    Return the CohortUser that each item of a bulk update points to, by id or by
+    user and cohort, using one query per kind of lookup
+    """
+    # the models module imports this module
+    from breathecode.utils import ValidationException
+    from .models import CohortUser
+
+    index = -1
+    for x in items:
+        index = index + 1
+        if 'id' not in x and ('user' not in x or 'cohort' not in x):
+            raise ValidationException('Cannot determine CohortUser in '
+                                      f'index {index}')
+
+    # the ids can come as strings in the body
+    ids = [x['id'] for x in items if 'id' in x]
+    pairs = [(x['user'], x['cohort']) for x in items if 'id' not in x]
+
+    by_id = {}
+    by_pair = {}
+
+    if ids:
+        by_id = {str(x.id): x for x in CohortUser.objects.filter(id__in=ids)}
+
+    if pairs:
+        query = CohortUser.objects.filter(user__id__in=[x[0] for x in pairs],
+                                          cohort__id__in=[x[1] for x in pairs])
+        by_pair = {(str(x.user_id), str(x.cohort_id)): x for x in query}
+
+    return [by_id.get(str(x['id'])) if 'id' in x else by_pair.get((str(x['user']), str(x['cohort'])))
+            for x in items]
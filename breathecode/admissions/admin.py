@@ -7,6 +7,9 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib import messages
 from .models import Academy, Certificate, Cohort, CohortUser, Country, City, UserAdmissions, Syllabus, AcademyCertificate
 from breathecode.assignments.actions import sync_student_tasks
+from breathecode.certificate.caches import UserSpecialtyCache
+from breathecode.events.caches import ICalCohortsCache
+from .caches import CohortCache, UserMeCache
 
 logger = logging.getLogger(__name__)
 
@@ -105,16 +108,27 @@ def sync_tasks(modeladmin, request, queryset):
 
 sync_tasks.short_description = "Sync Tasks"
 
+def __clear_cohorts__(queryset):
+    # update does not send the post_save signal, the receivers of the cohorts never run
+    user_ids = CohortUser.objects.filter(cohort__in=queryset).values_list('user__id', flat=True)
+    UserMeCache().delete(*[{'user_id': x} for x in user_ids])
+    CohortCache().clear()
+    ICalCohortsCache().clear()
+    UserSpecialtyCache().clear()
+
 def mark_as_ended(modeladmin, request, queryset):
     issues = queryset.update(stage='ENDED')
+    __clear_cohorts__(queryset)
 mark_as_ended.short_description = "Mark as ENDED"
 
 def mark_as_started(modeladmin, request, queryset):
     issues = queryset.update(stage='STARTED')
+    __clear_cohorts__(queryset)
 mark_as_started.short_description = "Mark as STARTED"
 
 def mark_as_innactive(modeladmin, request, queryset):
     issues = queryset.update(stage='INACTIVE')
+    __clear_cohorts__(queryset)
 mark_as_innactive.short_description = "Mark as INACTIVE"
 
 class CohortForm(forms.ModelForm):
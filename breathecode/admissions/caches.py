@@ -4,3 +4,28 @@ class CohortCache(Cache):
     model = 'Cohort'
     depends = ['Academy', 'Syllabus']
     parents = ['CohortUser', 'Task', 'UserInvite', 'UserSpecialty', 'Survey', 'SlackChannel']
+
+
+class TimezonesCache(Cache):
+    model = 'Timezones'
+    parents = []
+
+
+class UserMeCache(Cache):
+    """
+    Each user has its own version counter folded into the key, delete() bumps it
+    so a document built while the user was changing is saved under a dead key
+    """
+    model = 'UserMe'
+    parents = []
+
+    def __user_model__(self, user_id):
+        return f'{self.model}__user_{user_id}'
+
+    def versions(self, user_id):
+        """Versions to read and write the document of the user, take them before build it"""
+        return {'version': self.__get_version__(), 'user_version': self.__get_version__(self.__user_model__(user_id))}
+
+    def delete(self, *items):
+        for item in items:
+            self.__bump_version__(self.__user_model__(item['user_id']))
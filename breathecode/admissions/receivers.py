@@ -0,0 +1,64 @@
+import logging
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from breathecode.authenticate.models import Profile, ProfileAcademy, CredentialsGithub, Role
+from .caches import UserMeCache, CohortCache
+from .models import Academy, Certificate, Cohort, CohortUser, Syllabus
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_user_me(sender, instance, **kwargs):
+    UserMeCache().delete({'user_id': instance.id})
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=ProfileAcademy)
+@receiver(post_delete, sender=ProfileAcademy)
+@receiver(post_save, sender=CredentialsGithub)
+@receiver(post_delete, sender=CredentialsGithub)
+@receiver(post_save, sender=CohortUser)
+@receiver(post_delete, sender=CohortUser)
+def clear_user_me_of_owner(sender, instance, **kwargs):
+    # the invites of ProfileAcademy don't have user yet
+    if instance.user_id:
+        logger.debug(f"{sender.__name__} was changed, clearing the user {instance.user_id} me")
+        UserMeCache().delete({'user_id': instance.user_id})
+
+
+@receiver(post_save, sender=Cohort)
+@receiver(post_delete, sender=Cohort)
+def clear_user_me_of_cohort(sender, instance, **kwargs):
+    user_ids = CohortUser.objects.filter(cohort__id=instance.id).values_list('user__id', flat=True)
+    UserMeCache().delete(*[{'user_id': x} for x in user_ids])
+
+
+# the academies, roles and syllabus are shared by many users and rarely change
+@receiver(post_save, sender=Academy)
+@receiver(post_delete, sender=Academy)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Syllabus)
+@receiver(post_delete, sender=Syllabus)
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def clear_all_user_me(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the me of all the users")
+    UserMeCache().clear()
+
+
+@receiver(post_save, sender=Cohort)
+@receiver(post_delete, sender=Cohort)
+@receiver(post_save, sender=Academy)
+@receiver(post_delete, sender=Academy)
+@receiver(post_save, sender=Syllabus)
+@receiver(post_delete, sender=Syllabus)
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def clear_cohorts(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the cohorts")
+    CohortCache().clear()
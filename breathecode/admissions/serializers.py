@@ -2,11 +2,13 @@ import logging
 import serpy
 from django.db.models import Q
 from breathecode.assignments.models import Task
-from breathecode.utils import ValidationException, localize_query
+from breathecode.utils import ValidationException, localize_query, get_academy_capabilities
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from rest_framework.exceptions import ValidationError
 from breathecode.authenticate.models import CredentialsGithub, ProfileAcademy
+from breathecode.events.caches import ICalCohortsCache
+from .caches import CohortCache, UserMeCache
 from .models import Academy, Cohort, Certificate, CohortUser, Syllabus
 
 logger = logging.getLogger(__name__)
@@ -223,11 +225,12 @@ class UserMeSerializer(serpy.Serializer):
         return GithubSmallSerializer(github).data
 
     def get_roles(self, obj):
-        roles = ProfileAcademy.objects.filter(user=obj.id)
+        roles = ProfileAcademy.objects.filter(user=obj.id).select_related('academy', 'role')
         return ProfileAcademySmallSerializer(roles, many=True).data
 
     def get_cohorts(self, obj):
-        cohorts = CohortUser.objects.filter(user__id=obj.id)
+        cohorts = CohortUser.objects.filter(user__id=obj.id).select_related('cohort__academy',
+            'cohort__syllabus__certificate')
         return GETCohortUserSmallSerializer(cohorts, many=True).data
 
 
@@ -365,84 +368,142 @@ class UserDJangoRestSerializer(serializers.ModelSerializer):
 
 class CohortUserSerializerMixin(serializers.ModelSerializer):
     index = -1
-
-    def count_certificates_by_cohort(self, cohort, user_id):
-        return CohortUser.objects.filter(user_id=user_id, role='STUDENT', cohort__syllabus__certificate=cohort.syllabus.certificate).filter(Q(educational_status='ACTIVE') | Q(educational_status__isnull=True)).count()
+    batch = None
 
     def validate_just_one(self):
         pass
 
-    def validate(self, data):
-        self.index = self.index + 1
-
-        request = self.context['request']
-        is_many = isinstance(request.data, list)
-        cohort_id = self.context['cohort_id']
-        user_id = self.context['user_id']
-        disable_cohort_user_just_once = True
-        disable_certificate_validations = True
-        body = request.data if is_many else [request.data]
-        request_item = body[self.index]
-        is_post_method = request.method == 'POST'
+    def __to_int__(self, value):
+        # the ids can come as strings in the body, the invalid ones are rejected later
+        return int(value) if str(value).isdigit() else value
 
+    def __resolve_ids__(self, request_item, is_many, ids):
         id = None
+        user_id = self.__to_int__(self.context['user_id'])
+        cohort_id = self.__to_int__(self.context['cohort_id'])
+
         if is_many and 'id' in request_item:
-            id = request_item['id']
+            id = self.__to_int__(request_item['id'])
 
         if is_many and 'user' in request_item:
-            user_id = request_item['user']
+            user_id = self.__to_int__(request_item['user'])
 
         if is_many and 'cohort' in request_item:
-            cohort_id = request_item['cohort']
+            cohort_id = self.__to_int__(request_item['cohort'])
 
         if id and (not user_id or not cohort_id):
-            ids = CohortUser.objects.filter(id=id).values_list(
-                'user_id', 'cohort_id').first()
-
-            if not ids:
+            if id not in ids:
                 raise ValidationException("Invalid id", code=400)
-            user_id = ids[0]
-            cohort_id = ids[1]
+
+            user_id, cohort_id = ids[id]
 
         if user_id is None:
-            user_id = request_item.get('user')
+            user_id = self.__to_int__(request_item.get('user'))
+
+        return id, user_id, cohort_id
+
+    def __load_batch__(self, request, body, is_many):
+        """
+        Load everything the validation needs for the whole body in a few set-based
+        queries, instead of run the same queries for each item
+        """
+
+        item_ids = [x for x in [self.__to_int__(x['id']) for x in body if is_many and 'id' in x]
+            if isinstance(x, int)]
+        ids = {}
+        if item_ids:
+            ids = {id: (user_id, cohort_id) for id, user_id, cohort_id in
+                CohortUser.objects.filter(id__in=item_ids).values_list('id', 'user_id', 'cohort_id')}
+
+        resolved = [self.__resolve_ids__(x, is_many, ids) for x in body]
+        user_ids = {x[1] for x in resolved if str(x[1]).isdigit()}
+        cohort_ids = {x[2] for x in resolved if str(x[2]).isdigit()}
+
+        cohorts = Cohort.objects.filter(id__in=cohort_ids).select_related('syllabus')
+        academy_ids = set(get_academy_capabilities(request).keys())
+        certificate_ids = {x.syllabus.certificate_id for x in cohorts if x.syllabus}
+
+        students = set()
+        if request.method == 'POST' and certificate_ids:
+            students = set(CohortUser.objects.filter(user_id__in=user_ids, role='STUDENT',
+                cohort__syllabus__certificate__id__in=certificate_ids).filter(
+                Q(educational_status='ACTIVE') | Q(educational_status__isnull=True)).values_list(
+                'user_id', 'cohort__syllabus__certificate_id'))
+
+        teachers = {}
+        for cohort_id, user_id in CohortUser.objects.filter(role='TEACHER',
+                cohort_id__in=cohort_ids).values_list('cohort_id', 'user_id'):
+            teachers.setdefault(cohort_id, set()).add(user_id)
+
+        cohort_users = {(x.user_id, x.cohort_id): x for x in
+            CohortUser.objects.filter(user_id__in=user_ids, cohort_id__in=cohort_ids)}
+
+        users_with_pending_tasks = set(Task.objects.filter(user_id__in=user_ids, task_status='PENDING',
+            task_type='PROJECT').values_list('user_id', flat=True))
+
+        return {
+            'resolved': resolved,
+            'users': User.objects.in_bulk(user_ids),
+            'cohorts': {x.id: x for x in cohorts},
+            'academy_ids': academy_ids,
+            'students': students,
+            'teachers': teachers,
+            'cohort_users': cohort_users,
+            'users_with_pending_tasks': users_with_pending_tasks,
+        }
+
+    def validate(self, data):
+        self.index = self.index + 1
+
+        request = self.context['request']
+        is_many = isinstance(request.data, list)
+        disable_cohort_user_just_once = True
+        disable_certificate_validations = True
+        body = request.data if is_many else [request.data]
+        request_item = body[self.index]
+        is_post_method = request.method == 'POST'
+
+        # the child serializer is shared by all the items of the list
+        if self.batch is None:
+            self.batch = self.__load_batch__(request, body, is_many)
+
+        id, user_id, cohort_id = self.batch['resolved'][self.index]
 
         if not is_many and (cohort_id is None or user_id is None):
             raise ValidationException("Missing cohort_id or user_id", code=400)
 
-        if User.objects.filter(id=user_id).count() == 0:
+        if not str(user_id).isdigit() or int(user_id) not in self.batch['users']:
             raise ValidationException("invalid user_id", code=400)
 
-        cohort = Cohort.objects.filter(id=cohort_id)
+        user_id = int(user_id)
+        cohort = self.batch['cohorts'].get(int(cohort_id)) if str(cohort_id).isdigit() else None
         if not cohort:
             raise ValidationException("invalid cohort_id", code=400)
 
-        # only from this academy
-        cohort = localize_query(cohort, request).first()
+        cohort_id = cohort.id
 
-        if cohort is None:
+        # only from this academy
+        if cohort.academy_id not in self.batch['academy_ids']:
             logger.debug(f"Cohort not be found in related academies")
             raise ValidationException('Specified cohort not be found')
 
-        if not disable_cohort_user_just_once and CohortUser.objects.filter(user_id=user_id,
-                                                                           cohort_id=cohort_id).count():
+        cohort_user = self.batch['cohort_users'].get((user_id, cohort_id))
+
+        if not disable_cohort_user_just_once and cohort_user:
             raise ValidationException(
                 'That user already exists in this cohort')
 
         if (is_post_method and cohort.syllabus and
-                self.count_certificates_by_cohort(cohort, user_id) > 0):
+                (user_id, cohort.syllabus.certificate_id) in self.batch['students']):
 
             raise ValidationException(
                 'This student is already in another cohort for the same certificate, please mark him/her hi educational status on this prior cohort different than ACTIVE before cotinuing')
 
         role = request_item.get('role')
-        if role == 'TEACHER' and CohortUser.objects.filter(role=role, cohort_id=cohort_id).exclude(user__id__in=[user_id]).count():
+        if role == 'TEACHER' and self.batch['teachers'].get(cohort_id, set()) - {user_id}:
             raise ValidationException(
                 'There can only be one main instructor in a cohort')
 
-        cohort_user = CohortUser.objects.filter(
-            user__id=user_id, cohort__id=cohort_id).first()
-
         if not is_post_method and not cohort_user:
             raise ValidationException('Cannot find CohortUser')
 
@@ -456,8 +517,7 @@ class CohortUserSerializerMixin(serializers.ModelSerializer):
             raise ValidationException(('Cannot be marked as `GRADUATED` if its financial '
                                        'status is `LATE`'))
 
-        has_tasks = Task.objects.filter(user_id=user_id, task_status='PENDING',
-                                        task_type='PROJECT').count()
+        has_tasks = user_id in self.batch['users_with_pending_tasks']
         if is_graduated and has_tasks:
             raise ValidationException(
                 'User has tasks with status pending the educational status cannot be GRADUATED')
@@ -469,7 +529,7 @@ class CohortUserSerializerMixin(serializers.ModelSerializer):
 
         data['cohort'] = cohort_id
 
-        user = User.objects.filter(id=user_id).first()
+        user = self.batch['users'][user_id]
         return {**data, 'id': id, 'cohort': cohort, 'user': user}
 
 
@@ -478,10 +538,20 @@ class CohortUserListSerializer(serializers.ListSerializer):
         books = [CohortUser(**item) for item in validated_data]
         items = CohortUser.objects.bulk_create(books)
 
-        for key in range(0, len(items)):
-            item = items[key]
-            items[key].id = CohortUser.objects.filter(
-                cohort__id=item.cohort_id, user__id=item.user_id).values_list('id', flat=True).first()
+        # the databases that can't return the ids from the insert need one query more
+        missing = [x for x in items if x.id is None]
+        if missing:
+            ids = {(user_id, cohort_id): id for id, user_id, cohort_id in CohortUser.objects.filter(
+                user__id__in=[x.user_id for x in missing],
+                cohort__id__in=[x.cohort_id for x in missing]).values_list('id', 'user_id', 'cohort_id')}
+
+            for item in missing:
+                item.id = ids.get((item.user_id, item.cohort_id))
+
+        # bulk_create doesn't send post_save, the receivers never see these rows
+        UserMeCache().delete(*[{'user_id': x.user_id} for x in items])
+        ICalCohortsCache().clear()
+        CohortCache().clear()
 
         return items
 
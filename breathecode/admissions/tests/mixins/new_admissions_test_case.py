@@ -2,10 +2,11 @@
 Collections of mixins used to login in authorize microservice
 """
 from rest_framework.test import APITestCase
-from breathecode.tests.mixins import GenerateModelsMixin, CacheMixin, GenerateQueriesMixin, DatetimeMixin, ICallMixin
+from breathecode.tests.mixins import (GenerateModelsMixin, CacheMixin, GenerateQueriesMixin,
+    DatetimeMixin, ICallMixin, QueriesMixin)
 
 class AdmissionsTestCase(APITestCase, GenerateModelsMixin, CacheMixin,
-        GenerateQueriesMixin, DatetimeMixin, ICallMixin):
+        GenerateQueriesMixin, DatetimeMixin, ICallMixin, QueriesMixin):
     """AdmissionsTestCase with auth methods"""
     def setUp(self):
         self.generate_queries()
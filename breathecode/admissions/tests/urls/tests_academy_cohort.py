@@ -3,7 +3,7 @@ Test /academy/cohort
 """
 from breathecode.admissions.caches import CohortCache
 from django.core.validators import BaseValidator
-from breathecode.utils import Cache
+from breathecode.utils import Cache, AcademyCapabilitiesCache
 from breathecode.services import datetime_to_iso_format
 import re
 from random import choice
@@ -1256,33 +1256,45 @@ class AcademyCohortTestSuite(AdmissionsTestCase):
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_with_data_testing_cache(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Cohort__resource=None&academy_id=1&upcoming=None&academy='
-                'None&location=None&like=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'resource': None,
+            'academy_id': 1,
+            'upcoming': None,
+            'academy': None,
+            'location': None,
+            'like': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_models = self.test_academy_cohort_with_data()
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.test_academy_cohort_with_data(old_models)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_with_data_testing_cache_and_remove_in_post(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Cohort__resource=None&academy_id=1&upcoming=None&academy='
-                'None&location=None&like=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'resource': None,
+            'academy_id': 1,
+            'upcoming': None,
+            'academy': None,
+            'location': None,
+            'like': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_models = self.test_academy_cohort_with_data()
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.headers(academy=1)
 
@@ -1328,7 +1340,7 @@ class AcademyCohortTestSuite(AdmissionsTestCase):
         }
 
         self.assertEqual(json, expected)
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         self.assertEqual(self.all_cohort_dict(), [{
             **self.model_to_dict(old_models[0], 'cohort')
@@ -1342,4 +1354,30 @@ class AcademyCohortTestSuite(AdmissionsTestCase):
         ]
 
         self.test_academy_cohort_with_data(base)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_cohort_with_capabilities_cached_and_removed_from_role(self):
+        """Test /cohort without auth"""
+        self.headers(academy=1)
+        model = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_cohort', role='potato')
+        url = reverse_lazy('admissions:academy_cohort')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AcademyCapabilitiesCache().get(user_id=1), {'1': ['read_cohort']})
+
+        model['role'].capabilities.clear()
+        self.assertEqual(AcademyCapabilitiesCache().get(user_id=1), None)
+
+        response = self.client.get(url)
+        json = response.json()
+
+        self.assertEqual(json, {
+            'detail': "You (user: 1) don't have this capability: read_cohort for academy 1",
+            'status_code': 403
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -471,15 +471,20 @@ class AcademyCohortIdTestSuite(AdmissionsTestCase):
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_id_with_data_testing_cache_and_remove_in_delete(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Cohort__resource=None&academy_id=1&upcoming=None&academy='
-                'None&location=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'resource': None,
+            'academy_id': 1,
+            'upcoming': None,
+            'academy': None,
+            'location': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_models = AcademyCohortTestSuite.test_academy_cohort_with_data(self)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.headers(academy=1)
 
@@ -500,7 +505,7 @@ class AcademyCohortIdTestSuite(AdmissionsTestCase):
             print(response.json())
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
         self.assertEqual(self.all_cohort_dict(), [{
             **self.model_to_dict(model, 'cohort'),
             'stage': 'DELETED',
@@ -513,22 +518,28 @@ class AcademyCohortIdTestSuite(AdmissionsTestCase):
         ]
 
         AcademyCohortTestSuite.test_academy_cohort_with_data(self, base)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_id_with_data_testing_cache_and_remove_in_delete(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Cohort__resource=None&academy_id=1&upcoming=None&academy='
-                'None&location=None&like=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'resource': None,
+            'academy_id': 1,
+            'upcoming': None,
+            'academy': None,
+            'location': None,
+            'like': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_models = AcademyCohortTestSuite.test_academy_cohort_with_data(self)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.headers(academy=1)
 
@@ -548,7 +559,7 @@ class AcademyCohortIdTestSuite(AdmissionsTestCase):
             print(response.json())
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
         self.assertEqual(self.all_cohort_dict(), [{
             **self.model_to_dict(model, 'cohort'),
             'stage': 'DELETED'
@@ -561,4 +572,4 @@ class AcademyCohortIdTestSuite(AdmissionsTestCase):
         ]
 
         AcademyCohortTestSuite.test_academy_cohort_with_data(self, base)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
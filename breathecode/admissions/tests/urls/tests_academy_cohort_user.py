@@ -2,6 +2,7 @@
 Test /cohort/user
 """
 import re
+from json import loads
 from random import choice
 from unittest.mock import patch
 from django.urls.base import reverse_lazy
@@ -90,6 +91,71 @@ class CohortUserTestSuite(AdmissionsTestCase):
         self.assertEqual(self.count_cohort_user(), 1)
         self.assertEqual(self.get_cohort_user_dict(1), model_dict)
 
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_user_with_format_csv(self):
+        """Test /cohort/user?format=csv"""
+        self.headers(academy=1)
+        model = self.generate_models(authenticate=True, cohort_user=True,
+            profile_academy=True, capability='read_cohort', role='potato')
+        model_dict = self.remove_dinamics_fields(model['cohort_user'].__dict__)
+        url = reverse_lazy('admissions:academy_cohort_user') + '?format=csv'
+        response = self.client.get(url)
+        lines = b''.join(response.streaming_content).decode('utf-8').split('\r\n')
+
+        cohort_user = model['cohort_user']
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=cohort_users.csv')
+        self.assertEqual(lines[0], 'user.id,user.first_name,user.last_name,user.email,cohort.id,'
+            'cohort.slug,cohort.name,role,finantial_status,educational_status,created_at')
+        self.assertEqual(lines[1], ','.join([str(cohort_user.user.id), cohort_user.user.first_name,
+            cohort_user.user.last_name, cohort_user.user.email, str(cohort_user.cohort.id),
+            cohort_user.cohort.slug, cohort_user.cohort.name, cohort_user.role,
+            cohort_user.finantial_status or '', cohort_user.educational_status or '',
+            str(cohort_user.created_at)]))
+        self.assertEqual(lines[2:], [''])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.count_cohort_user(), 1)
+        self.assertEqual(self.get_cohort_user_dict(1), model_dict)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_user_with_format_ndjson(self):
+        """Test /cohort/user?format=ndjson"""
+        self.headers(academy=1)
+        model = self.generate_models(authenticate=True, cohort_user=True,
+            profile_academy=True, capability='read_cohort', role='potato')
+        model_dict = self.remove_dinamics_fields(model['cohort_user'].__dict__)
+        url = reverse_lazy('admissions:academy_cohort_user') + '?format=ndjson'
+        response = self.client.get(url)
+        lines = b''.join(response.streaming_content).decode('utf-8').split('\n')
+        json = [loads(x) for x in lines if x]
+
+        self.assertDatetime(json[0]['created_at'])
+        del json[0]['created_at']
+
+        cohort_user = model['cohort_user']
+        expected = [{
+            'user.id': cohort_user.user.id,
+            'user.first_name': cohort_user.user.first_name,
+            'user.last_name': cohort_user.user.last_name,
+            'user.email': cohort_user.user.email,
+            'cohort.id': cohort_user.cohort.id,
+            'cohort.slug': cohort_user.cohort.slug,
+            'cohort.name': cohort_user.cohort.name,
+            'role': cohort_user.role,
+            'finantial_status': cohort_user.finantial_status,
+            'educational_status': cohort_user.educational_status,
+        }]
+
+        self.assertEqual(json, expected)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.count_cohort_user(), 1)
+        self.assertEqual(self.get_cohort_user_dict(1), model_dict)
+
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
@@ -708,6 +774,45 @@ class CohortUserTestSuite(AdmissionsTestCase):
             'educational_status': 'GRADUATED'
         }])
 
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_user_put_in_bulk_with_string_ids(self):
+        """Test /cohort/user with the ids as strings"""
+        self.headers(academy=1)
+        url = reverse_lazy('admissions:academy_cohort_user')
+        model = [self.generate_models(authenticate=True, cohort_user=True,
+            profile_academy=True, capability='crud_cohort', role='potato')]
+
+        base = model[0].copy()
+        del base['user']
+        del base['cohort']
+        del base['cohort_user']
+        del base['profile_academy']
+
+        model = model + [self.generate_models(cohort_user=True, profile_academy=True,
+            models=base)]
+
+        data = [{
+            'id': '1',
+            'finantial_status': 'LATE',
+        }, {
+            'id': '2',
+            'user': '2',
+            'cohort': '2',
+            'educational_status': 'GRADUATED'
+        }]
+        response = self.client.put(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(x['id'], x['finantial_status'], x['educational_status']) for x in response.json()],
+            [(1, 'LATE', None), (2, None, 'GRADUATED')])
+        self.assertEqual([(x['id'], x['user_id'], x['cohort_id'], x['finantial_status'],
+            x['educational_status']) for x in self.all_cohort_user_dict()], [
+                (1, 1, 1, 'LATE', None),
+                (2, 2, 2, None, 'GRADUATED'),
+            ])
+
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
@@ -860,6 +965,57 @@ class CohortUserTestSuite(AdmissionsTestCase):
             'user_id': 3,
         }])
 
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_id_user_post_in_bulk_with_many_items_in_a_few_queries(self):
+        """Test /cohort/:id/user the validation don't run queries per item"""
+        self.headers(academy=1)
+        base = self.generate_models(authenticate=True, cohort=True,
+            profile_academy=True, capability='crud_cohort', role='potato')
+        del base['user']
+
+        models = [self.generate_models(user=True, models=base) for _ in range(0, 10)]
+        url = reverse_lazy('admissions:academy_cohort_user')
+        data = [{
+            'user':  model['user'].id,
+            'cohort':  models[0]['cohort'].id,
+        } for model in models]
+
+        # the token, the capabilities and the whole validation are resolved
+        # without depend of the number of items
+        with self.assertNumQueries(9):
+            response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([x['id'] for x in response.json()], list(range(1, 11)))
+        self.assertEqual([(x['id'], x['user_id']) for x in self.all_cohort_user_dict()],
+            [(x, x + 1) for x in range(1, 11)])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_id_user_post_in_bulk_clear_the_user_me(self):
+        """Test /cohort/:id/user the cached /user/me of the added users is rebuilt"""
+        self.headers(academy=1)
+        model = self.generate_models(authenticate=True, cohort=True,
+            profile_academy=True, capability='crud_cohort', role='potato')
+        me_url = reverse_lazy('admissions:user_me')
+
+        response = self.client.get(me_url)
+        self.assertEqual(response.json()['cohorts'], [])
+
+        url = reverse_lazy('admissions:academy_cohort_user')
+        data = [{
+            'user':  model['user'].id,
+            'cohort':  model['cohort'].id,
+        }]
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(me_url)
+        self.assertEqual([x['cohort']['id'] for x in response.json()['cohorts']], [model['cohort'].id])
+
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
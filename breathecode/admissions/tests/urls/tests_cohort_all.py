@@ -433,3 +433,50 @@ class CohortAllTestSuite(AdmissionsTestCase):
         self.assertEqual(self.all_cohort_dict(), [{
             **self.model_to_dict(model, 'cohort')
         }])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_all_with_many_cohorts_in_one_query(self):
+        """Test /cohort/all without auth"""
+        url = reverse_lazy('admissions:cohort_all')
+        for _ in range(0, 5):
+            self.generate_models(cohort=True, syllabus=True, certificate=True,
+                cohort_kwargs={'private': False})
+
+        with self.assertMaxNumQueries(1):
+            response = self.client.get(url)
+
+        json = response.json()
+
+        self.assertEqual(len(json), 5)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_all_from_cache(self):
+        """Test /cohort/all is cached until a cohort changes"""
+        url = reverse_lazy('admissions:cohort_all')
+        model = self.generate_models(cohort=True, syllabus=True, certificate=True,
+            cohort_kwargs={'private': False})
+
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        self.assertEqual([x['id'] for x in response.json()], [model['cohort'].id])
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(response['Vary'], 'Accept, Authorization, Academy, Origin')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        model['cohort'].private = True
+        model['cohort'].save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+        self.assertNotEqual(response['ETag'], etag)
@@ -822,3 +822,21 @@ class CohortUserTestSuite(AdmissionsTestCase):
 
             self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
             self.assertEqual(self.all_cohort_user_dict(), [])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_cohort_user_with_many_cohort_users_in_one_query(self):
+        """Test /cohort/user without auth"""
+        self.generate_models(authenticate=True)
+        for _ in range(0, 5):
+            self.generate_models(user=True, profile=True, cohort_user=True)
+
+        url = reverse_lazy('admissions:cohort_user')
+        with self.assertMaxNumQueries(1):
+            response = self.client.get(url)
+
+        json = response.json()
+
+        self.assertEqual(len(json), 5)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
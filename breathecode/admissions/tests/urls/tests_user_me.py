@@ -0,0 +1,98 @@
+"""
+Test /user/me
+"""
+from unittest.mock import patch
+from django.urls.base import reverse_lazy
+from rest_framework import status
+from breathecode.tests.mocks import (
+    GOOGLE_CLOUD_PATH,
+    apply_google_cloud_client_mock,
+    apply_google_cloud_bucket_mock,
+    apply_google_cloud_blob_mock,
+)
+from ..mixins import AdmissionsTestCase
+
+
+class UserMeTestSuite(AdmissionsTestCase):
+    """Test /user/me"""
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_user_me_from_cache(self):
+        """Test /user/me is built once, answered with 304 and rebuilt when the cohort user changes"""
+        self.generate_models(authenticate=True, cohort_user=True)
+        url = reverse_lazy('admissions:user_me')
+
+        response = self.client.get(url)
+        json = response.json()
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json['id'], self.user.id)
+        self.assertEqual([x['cohort']['id'] for x in json['cohorts']], [self.cohort.id])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.json(), json)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.cohort_user.educational_status = 'GRADUATED'
+        self.cohort_user.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['cohorts'][0]['educational_status'], 'GRADUATED')
+        self.assertNotEqual(response['ETag'], etag)
+
+        self.cohort.name = 'New name'
+        self.cohort.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['cohorts'][0]['cohort']['name'], 'New name')
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_user_me_changed_while_it_was_built(self):
+        """Test a document built before the user changed is never answered"""
+        from breathecode.admissions.caches import UserMeCache
+        self.generate_models(authenticate=True, cohort_user=True)
+        url = reverse_lazy('admissions:user_me')
+
+        cache = UserMeCache()
+        versions = cache.versions(self.user.id)
+
+        self.cohort_user.educational_status = 'GRADUATED'
+        self.cohort_user.save()
+
+        # the request that read the old versions saves its document after the change
+        cache.set({'data': {'id': self.user.id, 'cohorts': []}, 'etag': 'old'}, user_id=self.user.id,
+            **versions)
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['cohorts'][0]['educational_status'], 'GRADUATED')
+        self.assertNotEqual(response['ETag'], '"old"')
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_user_me_after_the_cohorts_were_changed_in_the_admin(self):
+        """Test /user/me is rebuilt after the stage of the cohorts is changed in bulk"""
+        from django.http.request import HttpRequest
+        from breathecode.admissions.admin import mark_as_ended
+        from breathecode.admissions.models import Cohort
+        self.generate_models(authenticate=True, cohort_user=True)
+        url = reverse_lazy('admissions:user_me')
+
+        response = self.client.get(url)
+        self.assertNotEqual(response.json()['cohorts'][0]['cohort']['stage'], 'ENDED')
+
+        mark_as_ended(None, HttpRequest(), Cohort.objects.filter(id=self.cohort.id))
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['cohorts'][0]['cohort']['stage'], 'ENDED')
@@ -1,13 +1,15 @@
-from breathecode.admissions.caches import CohortCache
-import logging
+from breathecode.admissions.caches import CohortCache, UserMeCache, TimezonesCache
+import logging, hashlib, json
 import re
 import pytz
 from django.db.models import Q
 from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.http import quote_etag, parse_etags
 from django.shortcuts import render
 from django.contrib.auth.models import AnonymousUser
 from breathecode.utils import HeaderLimitOffsetPagination
+from .actions import get_cohort_users_to_update
 from rest_framework.views import APIView
 from django.db.models import Q
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -24,13 +26,13 @@ from .models import (
     Academy, AcademyCertificate, CohortUser, Certificate, Cohort, Country,
     STUDENT, DELETED, Syllabus
 )
-from breathecode.authenticate.models import ProfileAcademy
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
 from breathecode.utils import (
     localize_query, capable_of, ValidationException,
-    HeaderLimitOffsetPagination, GenerateLookupsMixin
+    HeaderLimitOffsetPagination, GenerateLookupsMixin, get_academy_capabilities,
+    eager_load, export_response, get_export_format, cache_view
 )
 from rest_framework.exceptions import ParseError, PermissionDenied, ValidationError
 
@@ -43,6 +45,7 @@ logger = logging.getLogger(__name__)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(TimezonesCache(), max_age=60 * 60 * 24)
 def get_timezones(request, id=None):
     # timezones = [(x, x) for x in pytz.common_timezones]
     return Response(pytz.common_timezones)
@@ -57,6 +60,7 @@ def get_all_academies(request, id=None):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(CohortCache())
 def get_cohorts(request, id=None):
 
     items = Cohort.objects.filter(private=False)
@@ -79,12 +83,15 @@ def get_cohorts(request, id=None):
         items = items.filter(academy__slug__in=location.split(","))
 
     items = items.order_by('kickoff_date')
+    items = eager_load(items, GetCohortSerializer)
     serializer = GetCohortSerializer(items, many=True)
 
     return Response(serializer.data)
 
 
 class UserMeView(APIView):
+    cache = UserMeCache()
+
     def get(self, request, format=None):
 
         try:
@@ -94,8 +101,20 @@ class UserMeView(APIView):
         except User.DoesNotExist:
             raise PermissionDenied("You don't have a user")
 
-        users = UserMeSerializer(request.user)
-        return Response(users.data)
+        # the document is built once, the receivers bump the version of the user when it
+        # changes, a document built meanwhile is saved with the old version
+        versions = self.cache.versions(request.user.id)
+        me = self.cache.get(user_id=request.user.id, **versions)
+        if me is None:
+            body = JSONRenderer().render(UserMeSerializer(request.user).data)
+            me = {'data': json.loads(body), 'etag': hashlib.md5(body).hexdigest()}
+            self.cache.set(me, user_id=request.user.id, **versions)
+
+        etag = quote_etag(me['etag'])
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        return Response(me['data'], headers={'ETag': etag})
 
 # Create your views here.
 
@@ -172,6 +191,7 @@ class CohortUserView(APIView, GenerateLookupsMixin):
         if users is not None:
             items = items.filter(user__id__in=users.split(","))
 
+        items = eager_load(items, GETCohortUserSerializer)
         serializer = GETCohortUserSerializer(items, many=True)
         return Response(serializer.data)
 
@@ -204,22 +224,7 @@ class CohortUserView(APIView, GenerateLookupsMixin):
             current = CohortUser.objects.filter(
                 user__id=user_id, cohort__id=cohort_id).first()
         else:
-            current = []
-            index = -1
-            for x in request.data:
-                index = index + 1
-
-                if 'id' in x:
-                    current.append(
-                        CohortUser.objects.filter(id=x['id']).first())
-
-                elif 'user' in x and 'cohort' in x:
-                    current.append(CohortUser.objects.filter(user__id=x['user'],
-                                                             cohort__id=x['cohort']).first())
-
-                else:
-                    raise ValidationException('Cannot determine CohortUser in '
-                                              f'index {index}')
+            current = get_cohort_users_to_update(request.data)
 
         serializer = CohortUserPUTSerializer(current, data=request.data,
                                              context=context, many=many)
@@ -238,8 +243,7 @@ class CohortUserView(APIView, GenerateLookupsMixin):
             raise ValidationException('user_id or cohort_id was provided in url '
                                       'in bulk mode request, use querystring style instead', code=400)
 
-        academy_ids = ProfileAcademy.objects.filter(user=request.user).values_list('academy__id',
-                                                                                   flat=True)
+        academy_ids = list(get_academy_capabilities(request).keys())
 
         if lookups:
             items = CohortUser.objects.filter(
@@ -263,6 +267,11 @@ class CohortUserView(APIView, GenerateLookupsMixin):
         return Response(None, status=status.HTTP_204_NO_CONTENT)
 
 
+COHORT_USER_EXPORT_FIELDS = ['user__id', 'user__first_name', 'user__last_name', 'user__email',
+    'cohort__id', 'cohort__slug', 'cohort__name', 'role', 'finantial_status', 'educational_status',
+    'created_at']
+
+
 class AcademyCohortUserView(APIView, GenerateLookupsMixin):
     """
     List all snippets, or create a new snippet.
@@ -305,6 +314,12 @@ class AcademyCohortUserView(APIView, GenerateLookupsMixin):
         except Exception as e:
             raise ValidationException(str(e), 400)
 
+        export_format = get_export_format(request)
+        if export_format:
+            return export_response(items.order_by('id'), COHORT_USER_EXPORT_FIELDS, export_format,
+                filename='cohort_users')
+
+        items = eager_load(items, GETCohortUserSerializer)
         serializer = GETCohortUserSerializer(items, many=True)
         return Response(serializer.data)
 
@@ -339,22 +354,7 @@ class AcademyCohortUserView(APIView, GenerateLookupsMixin):
             current = CohortUser.objects.filter(
                 user__id=user_id, cohort__id=cohort_id).first()
         else:
-            current = []
-            index = -1
-            for x in request.data:
-                index = index + 1
-
-                if 'id' in x:
-                    current.append(
-                        CohortUser.objects.filter(id=x['id']).first())
-
-                elif 'user' in x and 'cohort' in x:
-                    current.append(CohortUser.objects.filter(user__id=x['user'],
-                                                             cohort__id=x['cohort']).first())
-
-                else:
-                    raise ValidationException('Cannot determine CohortUser in '
-                                              f'index {index}')
+            current = get_cohort_users_to_update(request.data)
 
         serializer = CohortUserPUTSerializer(current, data=request.data,
                                              context=context, many=many)
@@ -424,12 +424,12 @@ class AcademyCohortView(APIView, HeaderLimitOffsetPagination, GenerateLookupsMix
             return Response(cache, status=status.HTTP_200_OK)
 
         if cohort_id is not None:
-            item = None
+            item = eager_load(Cohort.objects.all(), GetCohortSerializer)
             if str.isnumeric(cohort_id):
-                item = Cohort.objects.filter(
+                item = item.filter(
                     id=int(cohort_id), academy__id=academy_id).first()
             else:
-                item = Cohort.objects.filter(
+                item = item.filter(
                     slug=cohort_id, academy__id=academy_id).first()
 
             if item is None:
@@ -454,6 +454,7 @@ class AcademyCohortView(APIView, HeaderLimitOffsetPagination, GenerateLookupsMix
             items = items.filter(Q(name__icontains=like) |
                                  Q(slug__icontains=like))
 
+        items = eager_load(items, GetCohortSerializer)
         page = self.paginate_queryset(items, request)
         serializer = GetCohortSerializer(page, many=True)
 
@@ -1,10 +1,130 @@
 # authentication.py
- 
+
+import hashlib, threading, time
+from collections import OrderedDict
 from rest_framework.authentication import TokenAuthentication
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from .models import Token
 from rest_framework.exceptions import AuthenticationFailed
 from django.utils import timezone
 
+# redis keeps the token a short time, the in-process copy even less because
+# it only can be cleared in the process that deleted the token
+TOKEN_CACHE_SECONDS = 60
+LOCAL_TOKEN_CACHE_SECONDS = 5
+LOCAL_TOKEN_CACHE_SIZE = 1024
+
+# the version must outlive the entries stored before it was bumped
+TOKEN_VERSION_SECONDS = 60 * 60
+
+TOKEN_FIELDS = ['id', 'key', 'user_id', 'token_type', 'expires_at']
+USER_FIELDS = ['id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff',
+    'is_superuser']
+
+__local_tokens__ = OrderedDict()
+__local_tokens_lock__ = threading.Lock()
+
+
+def __token_cache_key__(key):
+    return 'Token__' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def __token_version_key__(key):
+    return 'Token__version__' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def __get_local_token__(cache_key):
+    with __local_tokens_lock__:
+        item = __local_tokens__.get(cache_key)
+        if item is None:
+            return None
+
+        stored_at, data = item
+        if time.monotonic() - stored_at > LOCAL_TOKEN_CACHE_SECONDS:
+            del __local_tokens__[cache_key]
+            return None
+
+        __local_tokens__.move_to_end(cache_key)
+        return data
+
+
+def __set_local_token__(cache_key, data):
+    with __local_tokens_lock__:
+        __local_tokens__[cache_key] = (time.monotonic(), data)
+        __local_tokens__.move_to_end(cache_key)
+
+        while len(__local_tokens__) > LOCAL_TOKEN_CACHE_SIZE:
+            __local_tokens__.popitem(last=False)
+
+
+def __from_cache__(model, data):
+    # from_db expects the values in the same order than the model fields
+    field_names = [x.attname for x in model._meta.concrete_fields if x.attname in data]
+    return model.from_db('default', field_names, [data[x] for x in field_names])
+
+
+def get_cached_token(key):
+    """
+    Return the Token with its user rebuilt from the cache without touching
+    the database, the fields that are not cached are deferred
+    """
+    cache_key = __token_cache_key__(key)
+    data = __get_local_token__(cache_key)
+
+    if data is None:
+        version_key = __token_version_key__(key)
+        values = cache.get_many([cache_key, version_key])
+
+        # an entry filled before the token was forgotten has an old version
+        data = values.get(cache_key)
+        if data is None or data['version'] != values.get(version_key):
+            return None
+
+        __set_local_token__(cache_key, data)
+
+    token = __from_cache__(Token, data['token'])
+    token.user = __from_cache__(User, data['user'])
+    return token
+
+
+def get_token_version(key):
+    """Read it before the token is read from the database and pass it to cache_token"""
+    return cache.get(__token_version_key__(key))
+
+
+def cache_token(token, version):
+    seconds = TOKEN_CACHE_SECONDS
+    if token.expires_at:
+        seconds = min(seconds, int((token.expires_at - timezone.now()).total_seconds()))
+
+    if seconds <= 0:
+        return
+
+    data = {
+        'version': version,
+        'token': {x: getattr(token, x) for x in TOKEN_FIELDS},
+        'user': {x: getattr(token.user, x) for x in USER_FIELDS},
+    }
+
+    # the local copy is only taken from an entry whose version was checked
+    cache.set(__token_cache_key__(token.key), data, seconds)
+
+
+def forget_tokens(keys):
+    cache_keys = [__token_cache_key__(key) for key in keys]
+    version = time.time_ns()
+
+    # the requests that read the token before it was forgotten hold the old version
+    cache.set_many({__token_version_key__(key): version for key in keys}, TOKEN_VERSION_SECONDS)
+
+    with __local_tokens_lock__:
+        for cache_key in cache_keys:
+            __local_tokens__.pop(cache_key, None)
+
+    cache.delete_many(cache_keys)
+
+
 class ExpiringTokenAuthentication(TokenAuthentication):
     '''
     Expiring token for mobile and desktop clients.
@@ -12,9 +132,15 @@ class ExpiringTokenAuthentication(TokenAuthentication):
     and password for new one to be created.
     '''
     def authenticate_credentials(self, key, request=None):
-        token = Token.objects.select_related('user').filter(key=key).first()
+        token = get_cached_token(key)
+
         if token is None:
-            raise AuthenticationFailed({'error':'Invalid or Inactive Token', 'is_authenticated': False})
+            version = get_token_version(key)
+            token = Token.objects.select_related('user').filter(key=key).first()
+            if token is None:
+                raise AuthenticationFailed({'error':'Invalid or Inactive Token', 'is_authenticated': False})
+
+            cache_token(token, version)
 
         if not token.user.is_active:
             raise AuthenticationFailed({'error':'Invalid or innactive user', 'is_authenticated': False})
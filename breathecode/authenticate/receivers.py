@@ -0,0 +1,39 @@
+import logging
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from breathecode.utils import AcademyCapabilitiesCache
+from .authentication import forget_tokens
+from .models import ProfileAcademy, Role, Capability, Token
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=ProfileAcademy)
+@receiver(post_delete, sender=ProfileAcademy)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=Capability)
+def clear_academy_capabilities(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the academy capabilities")
+    AcademyCapabilitiesCache().clear()
+
+
+@receiver(m2m_changed, sender=Role.capabilities.through)
+def clear_academy_capabilities_of_role(sender, action, **kwargs):
+    if action in ['post_add', 'post_remove', 'post_clear']:
+        AcademyCapabilitiesCache().clear()
+
+
+# queryset.delete() also sends post_delete per token because this receiver exists,
+# that covers LogoutView, LoginView and delete_tokens
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    forget_tokens([instance.key])
+
+
+@receiver(post_save, sender=User)
+def forget_tokens_of_user(sender, instance, created, **kwargs):
+    if not created:
+        forget_tokens(Token.objects.filter(user__id=instance.id).values_list('key', flat=True))
@@ -5,6 +5,8 @@ import re
 from django.urls.base import reverse_lazy
 from rest_framework import status
 from ..mixins import AuthTestCase
+from ...authentication import get_cached_token, get_token_version, cache_token
+from ...models import Token
 
 
 class AuthenticateTestSuite(AuthTestCase):
@@ -37,3 +39,50 @@ class AuthenticateTestSuite(AuthTestCase):
     #     self.assertEqual(len(response.data), 1)
     #     self.assertEqual(message, 'User tokens successfully deleted')
     #     self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logout_with_cached_token(self):
+        """Test /logout forget the cached token"""
+        self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+        url = reverse_lazy('authenticate:logout')
+        response = self.client.get(url)
+
+        self.assertEqual(response.data, {'message': 'User tokens successfully deleted'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_cached_token(self.token), None)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_cached_after_first_request(self):
+        """Test the token is not read from the database in the next requests"""
+        self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(get_cached_token(self.token), None)
+
+        url = reverse_lazy('authenticate:user')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        token = get_cached_token(self.token)
+        self.assertEqual(token.key, self.token)
+        self.assertEqual(token.user.id, self.user.id)
+        self.assertEqual(token.user.is_active, True)
+
+    def test_token_revoked_while_it_was_read(self):
+        """Test a token read before a logout is not cached by the request that read it"""
+        self.login()
+        version = get_token_version(self.token)
+        token = Token.objects.select_related('user').get(key=self.token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        response = self.client.get(reverse_lazy('authenticate:logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        cache_token(token, version)
+        self.assertEqual(get_cached_token(self.token), None)
+
+        response = self.client.get(reverse_lazy('authenticate:user'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -23,6 +23,23 @@ app.conf.update(BROKER_URL=REDIS_URL, CELERY_RESULT_BACKEND=REDIS_URL, namespace
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
+# the hits are counted in redis and written to the database from time to time
+app.conf.beat_schedule = {
+    'flush-link-hits': {
+        'task': 'breathecode.marketing.tasks.flush_link_hits',
+        'schedule': 60.0,
+    },
+    'flush-media-hits': {
+        'task': 'breathecode.media.tasks.flush_media_hits',
+        'schedule': 60.0,
+    },
+    # the emails that failed are retried from here
+    'send-outbound-emails': {
+        'task': 'breathecode.notify.tasks.async_send_outbound_emails',
+        'schedule': 60.0,
+    },
+}
+
 if bool(os.environ.get('CELERY_WORKER_RUNNING', False)) and REDIS_URL is not None:
     from django.conf import settings
     import rollbar
@@ -7,6 +7,7 @@ from breathecode.admissions.models import CohortUser, FULLY_PAID, UP_TO_DATE
 from breathecode.assignments.models import Task
 from breathecode.utils import ValidationException, APIException
 from .models import ERROR, PERSISTED, UserSpecialty, LayoutDesign
+from .caches import UserSpecialtyCache
 from ..services.google_cloud import Storage
 
 logger = logging.getLogger(__name__)
@@ -170,3 +171,20 @@ def remove_certificate_screenshot(certificate_id):
     certificate.save()
 
     return True
+
+def remove_certificate_screenshots(certificate_ids):
+    certificates = UserSpecialty.objects.filter(id__in=certificate_ids).exclude(preview_url__isnull=True).exclude(
+        preview_url="")
+
+    file_names = [x.token for x in certificates]
+    if not file_names:
+        return 0
+
+    storage = Storage()
+    storage.delete_files(BUCKET_NAME, file_names)
+
+    updated = UserSpecialty.objects.filter(token__in=file_names).update(preview_url="")
+
+    # update does not send the post_save signal
+    UserSpecialtyCache().clear()
+    return updated
@@ -4,7 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
 from breathecode.admissions.admin import CohortAdmin
 from .models import Badge, Specialty, UserSpecialty, UserProxy, LayoutDesign, CohortProxy
-from .tasks import remove_screenshot, reset_screenshot, generate_cohort_certificates
+from .tasks import remove_screenshots, reset_screenshot, generate_cohort_certificates
 from .actions import generate_certificate
 from django.http import HttpResponse
 
@@ -35,9 +35,8 @@ screenshot.short_description = "🔄 RETAKE Screenshot"
 def delete_screenshot(modeladmin, request, queryset):
     from django.contrib import messages
     
-    certificate_ids = queryset.values_list('id', flat=True)
-    for cert_id in certificate_ids:
-        remove_screenshot.delay(cert_id)
+    certificate_ids = list(queryset.values_list('id', flat=True))
+    remove_screenshots.delay(certificate_ids)
     messages.success(request, message="Screenshots scheduled for deletion")
 delete_screenshot.short_description = "⛔️ DELETE Screenshot"
 
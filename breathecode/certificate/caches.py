@@ -0,0 +1,15 @@
+from breathecode.utils import Cache
+
+class SpecialtyCache(Cache):
+    model = 'Specialty'
+    parents = []
+
+
+class BadgeCache(Cache):
+    model = 'Badge'
+    parents = []
+
+
+class UserSpecialtyCache(Cache):
+    model = 'UserSpecialty'
+    parents = []
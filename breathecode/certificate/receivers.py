@@ -0,0 +1,36 @@
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from breathecode.admissions.models import Academy, Cohort
+from .caches import SpecialtyCache, BadgeCache, UserSpecialtyCache
+from .models import Specialty, Badge, UserSpecialty
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Specialty)
+@receiver(post_delete, sender=Specialty)
+def clear_specialties(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the specialties")
+    SpecialtyCache().clear()
+
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def clear_badges(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the badges")
+    BadgeCache().clear()
+
+
+# the certificates include the student, the academy and the cohort
+@receiver(post_save, sender=UserSpecialty)
+@receiver(post_delete, sender=UserSpecialty)
+@receiver(post_save, sender=Specialty)
+@receiver(post_delete, sender=Specialty)
+@receiver(post_save, sender=Academy)
+@receiver(post_delete, sender=Academy)
+@receiver(post_save, sender=Cohort)
+@receiver(post_delete, sender=Cohort)
+def clear_user_specialties(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the certificates")
+    UserSpecialtyCache().clear()
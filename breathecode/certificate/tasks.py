@@ -29,6 +29,15 @@ def remove_screenshot(self, certificate_id):
     remove_certificate_screenshot(certificate_id)
     return True
 
+@shared_task(bind=True, base=BaseTaskWithRetry)
+def remove_screenshots(self, certificate_ids):
+    logger.debug("Starting remove_screenshots")
+    # unittest.mock.patch is poor applying mocks
+    from .actions import remove_certificate_screenshots
+
+    remove_certificate_screenshots(certificate_ids)
+    return True
+
 @shared_task(bind=True, base=BaseTaskWithRetry)
 def reset_screenshot(self, certificate_id):
     logger.debug("Starting reset_screenshot")
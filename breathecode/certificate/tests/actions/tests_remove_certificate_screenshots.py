@@ -0,0 +1,32 @@
+"""
+Tasks tests
+"""
+from unittest.mock import patch, MagicMock
+from django.test import override_settings
+from mixer.backend.django import mixer
+from breathecode.services.google_cloud import fake
+from breathecode.services.google_cloud.storage import get_bucket
+from ...actions import remove_certificate_screenshots, BUCKET_NAME
+from ..mixins import CertificateTestCase
+from ...models import UserSpecialty
+
+
+@override_settings(GOOGLE_CLOUD_STORAGE_BACKEND='local')
+@patch('breathecode.certificate.tasks.take_screenshot.delay', MagicMock())
+class ActionRemoveCertificateScreenshotsTestCase(CertificateTestCase):
+    """Tests action remove_certificate_screenshots"""
+    def test_remove_certificate_screenshots(self):
+        """remove_certificate_screenshots deletes the screenshots in one batch"""
+        fake.clear()
+        bucket = get_bucket(BUCKET_NAME)
+
+        certificates = [mixer.blend('certificate.UserSpecialty', token=token, preview_url=preview_url)
+            for token, preview_url in [('a', 'https://a.com'), ('b', 'https://b.com'), ('c', '')]]
+
+        for token in ['a', 'b', 'c']:
+            bucket.blob(token).upload_from_string(token)
+
+        self.assertEqual(remove_certificate_screenshots([x.id for x in certificates]), 2)
+        self.assertEqual(list(bucket.files), ['c'])
+        self.assertEqual(list(UserSpecialty.objects.order_by('token').values_list('token', 'preview_url')),
+            [('a', ''), ('b', ''), ('c', '')])
@@ -1,5 +1,10 @@
+from contextlib import contextmanager
 from .bucket_mock import BucketMock
 
 class ClientMock():
     def bucket(self, bucket_name):
         return BucketMock(bucket_name)
+
+    @contextmanager
+    def batch(self):
+        yield self
@@ -6,7 +6,7 @@ from django.contrib.auth.models import User
 from .models import Specialty, Badge, UserSpecialty
 from django.db.models import Q
 from breathecode.admissions.models import CohortUser
-from breathecode.utils import capable_of, ValidationException, HeaderLimitOffsetPagination
+from breathecode.utils import capable_of, ValidationException, HeaderLimitOffsetPagination, cache_view
 from .serializers import SpecialtySerializer, UserSpecialtySerializer, UserSmallSerializer
 from rest_framework.exceptions import NotFound
 from rest_framework.decorators import api_view, permission_classes
@@ -16,12 +16,14 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from .tasks import take_screenshot
 from .actions import generate_certificate
+from .caches import SpecialtyCache, BadgeCache, UserSpecialtyCache
 
 logger = logging.getLogger(__name__)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(SpecialtyCache())
 def get_specialties(request):
     items = Specialty.objects.all()
     serializer = SpecialtySerializer(items, many=True)
@@ -30,6 +32,7 @@ def get_specialties(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(BadgeCache())
 def get_badges(request):
     items = Badge.objects.all()
     serializer = SpecialtySerializer(items, many=True)
@@ -38,6 +41,7 @@ def get_badges(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(UserSpecialtyCache())
 def get_certificate(request, token):
     item = UserSpecialty.objects.filter(token=token).first()
     if item is None:
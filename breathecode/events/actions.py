@@ -1,9 +1,12 @@
-import os, requests
-from rest_framework.exceptions import ValidationError
+import logging
+from django.core.exceptions import ValidationError
 from .models import Organization, Venue, Event, Organizer
-from .utils import Eventbrite
+from .caches import EventCache, ICalEventsCache
+from breathecode.services.eventbrite import Eventbrite
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 status_map = {
     "draft": 'DRAFT',
     "live": 'ACTIVE',
@@ -12,6 +15,127 @@ status_map = {
     "ended": 'ACTIVE',
     "canceled": 'DELETED',
 }
+
+
+def __to_python__(model, values):
+    # the values are compared with the ones in the database, eventbrite send strings
+    return {key: model._meta.get_field(key).to_python(value) for key, value in values.items()}
+
+
+def __clear_caches__():
+    # bulk_create and bulk_update don't send post_save, the receivers never see these rows
+    EventCache().clear()
+    ICalEventsCache().clear()
+
+
+def __bulk_upsert__(model, items, lookups=None, update=True, create_only=None, fill=None, touch=None):
+    """
+    Create or update the rows of `items` (eventbrite_id => field values) with
+    one query to fetch the existing rows, one bulk_create and one bulk_update,
+    the rows without changes are not written
+    """
+    lookups = lookups or {}
+    create_only = create_only or {}
+    fill = fill or {}
+    touch = touch or {}
+
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+    if not items:
+        return {}, counts
+
+    now = timezone.now()
+    instances = {x.eventbrite_id: x for x in model.objects.filter(eventbrite_id__in=list(items), **lookups)}
+
+    to_create = []
+    to_update = []
+    fields = set()
+
+    for eventbrite_id, values in items.items():
+        instance = instances.get(eventbrite_id)
+
+        if instance is None:
+            to_create.append(model(eventbrite_id=eventbrite_id, **values, **create_only,
+                **fill.get(eventbrite_id, {}), **touch))
+            counts['created'] += 1
+            continue
+
+        changed = [key for key, value in values.items() if update and getattr(instance, key) != value]
+        changed += [key for key, value in fill.get(eventbrite_id, {}).items() if not getattr(instance, key)]
+
+        if not changed:
+            counts['unchanged'] += 1
+            continue
+
+        for key in changed:
+            setattr(instance, key, values[key] if key in values else fill[eventbrite_id][key])
+
+        for key, value in touch.items():
+            setattr(instance, key, value)
+
+        # bulk_update doesn't set the auto_now fields
+        instance.updated_at = now
+        fields.update(changed)
+        to_update.append(instance)
+        counts['updated'] += 1
+
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=500)
+
+        # not every database return the primary keys of the rows created in bulk
+        instances.update({x.eventbrite_id: x for x in
+            model.objects.filter(eventbrite_id__in=[x.eventbrite_id for x in to_create])})
+
+    if to_update:
+        model.objects.bulk_update(to_update, [*fields, *touch, 'updated_at'], batch_size=500)
+
+    return instances, counts
+
+
+def __venue_values__(data):
+    return __to_python__(Venue, {
+        'title': data['name'],
+        'street_address': data['address']['address_1'],
+        'country': data['address']['country'],
+        'city': data['address']['city'],
+        'state': data['address']['region'],
+        'zip_code': data['address']['postal_code'],
+        'latitude': data['latitude'],
+        'longitude': data['longitude'],
+        'eventbrite_url': data['resource_uri'],
+    })
+
+
+def bulk_upsert_venues(items, org, force_update=False):
+    venues = {}
+    for data in items:
+        try:
+            venues[str(data['id'])] = __venue_values__(data)
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.error(f"Error saving venue eventbrite_id: {str(data.get('id'))} skipping to the next: {str(e)}")
+
+    venues, counts = __bulk_upsert__(Venue, venues, lookups={'academy__id': org.academy.id},
+        update=force_update, create_only={'academy_id': org.academy.id})
+
+    if counts['created'] or counts['updated']:
+        __clear_caches__()
+
+    return venues, counts
+
+
+def bulk_upsert_organizers(items, org):
+    organizers = {}
+    for data in items:
+        try:
+            organizers[str(data['id'])] = __to_python__(Organizer, {
+                'name': data['name'],
+                'description': data['description']['text'],
+            })
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.error(f"Error saving organizer eventbrite_id: {str(data.get('id'))} skipping to the next: {str(e)}")
+
+    return __bulk_upsert__(Organizer, organizers, create_only={'organization_id': org.id})
+
+
 def sync_org_venues(org):
 
     if org.academy is None:
@@ -19,79 +143,112 @@ def sync_org_venues(org):
     # client.get_my_organizations()
     # self.stdout.write(self.style.SUCCESS("Successfully sync organizations"))
     client = Eventbrite(org.eventbrite_key)
-    result = client.get_organization_venues(org.eventbrite_id)
-    for data in result['venues']:
-        create_or_update_venue(data, org, force_update=True)
+
+    # each page is saved before request the next one
+    for page in client.get_organization_venue_pages(org.eventbrite_id):
+        bulk_upsert_venues(page, org, force_update=True)
 
     return True
 
-def create_or_update_organizer(data, org, force_update=False):
-    organizer = Organizer.objects.filter(eventbrite_id=data['id']).first()
 
-    try:
-        if organizer is None:
-            organizer = Organizer(
-                name=data['name'],
-                description=data['description']['text'],
-                eventbrite_id=data['id'],
-                organization=org
-            )
-            organizer.save()
-        elif force_update == True:
-            organizer.title=data['name']
-            organizer.description=data['description']['text']
-            organizer.save()
-    except Exception as e:
-        print("Error saving organizer eventbrite_id: "+str(data['id'])+" skipping to the next", e)
+def bulk_upsert_events(items, org):
+    """
+    Save one page of eventbrite events with its organizers and venues, it
+    returns the amount of events created, updated, unchanged and with errors
+    """
+    now = timezone.now()
+    items = [x for x in items if x is not None]
 
-    return organizer
+    organizers, _ = bulk_upsert_organizers([x['organizer'] for x in items if x.get('organizer')], org)
 
-def create_or_update_venue(data, org, force_update=False):
-    venue = Venue.objects.filter(eventbrite_id=data['id'], academy__id=org.academy.id).first()
+    venues = {}
+    if org.academy is not None:
+        venues, _ = bulk_upsert_venues([x['venue'] for x in items if isinstance(x.get('venue'), dict)], org)
+
+        # the venues that were not expanded in this page were saved by sync_org_venues
+        missing = {str(x['venue_id']) for x in items if x.get('venue_id') and str(x['venue_id']) not in venues}
+        if missing:
+            venues.update({x.eventbrite_id: x for x in Venue.objects.filter(eventbrite_id__in=missing,
+                academy__id=org.academy.id)})
+
+    events = {}
+    fill = {}
+    errors = {}
+
+    for data in items:
+        try:
+            if data['status'] not in status_map:
+                raise Exception("Uknown eventbrite status " + data['status'])
+
+            venue_id = data['venue']['id'] if isinstance(data.get('venue'), dict) else data.get('venue_id')
+            venue = venues.get(str(venue_id)) if venue_id else None
+            organizer = organizers.get(str(data['organizer']['id'])) if data.get('organizer') else None
+
+            values = {
+                'title': data['name']['text'],
+                'description': data['description']['text'],
+                'excerpt': data['description']['text'],
+                'starting_at': data['start']['utc'],
+                'ending_at': data['end']['utc'],
+                'capacity': data['capacity'],
+                'online_event': data['online_event'],
+                'eventbrite_url': data['url'],
+                'status': status_map[data['status']],
+                'eventbrite_status': data['status'],
+                'venue_id': venue.id if venue else None,
+                # look for the academy ownership based on organizer first
+                'academy_id': organizer.academy_id if organizer and organizer.academy_id else org.academy_id,
+                'sync_status': 'PERSISTED',
+            }
+
+            if "published" in data:
+                values['published_at'] = data['published']
+            if "logo" in data and data['logo'] is not None:
+                values['banner'] = data['logo']['url']
+
+            events[str(data['id'])] = __to_python__(Event, values)
+            fill[str(data['id'])] = {'url': data['url']}
+
+        except Exception as e:
+            errors[str(data.get('id'))] = str(e)
+
+    _, counts = __bulk_upsert__(Event, events, lookups={'organization__id': org.id},
+        create_only={'organization_id': org.id}, fill=fill, touch={'sync_desc': str(now)})
+
+    failed = list(Event.objects.filter(eventbrite_id__in=list(errors), organization__id=org.id))
+    for event in failed:
+        event.sync_status = 'ERROR'
+        event.sync_desc = str(now) + " => " + errors[event.eventbrite_id]
+        event.updated_at = now
+
+    Event.objects.bulk_update(failed, ['sync_status', 'sync_desc', 'updated_at'])
+
+    for eventbrite_id, error in errors.items():
+        logger.error(f"Error saving event eventbrite_id: {eventbrite_id}: {error}")
+
+    if counts['created'] or counts['updated'] or failed:
+        __clear_caches__()
+
+    counts['errors'] = len(errors)
+    return counts
 
-    try:
-        if venue is None:
-            venue = Venue(
-                title=data['name'],
-                street_address=data['address']['address_1'],
-                country=data['address']['country'],
-                city=data['address']['city'],
-                state=data['address']['region'],
-                zip_code=data['address']['postal_code'],
-                latitude=data['latitude'],
-                longitude=data['longitude'],
-                eventbrite_id=data['id'],
-                eventbrite_url=data['resource_uri'],
-                academy=org.academy,
-            )
-            venue.save()
-        elif force_update == True:
-            venue.title=data['name']
-            venue.street_address=data['address']['address_1']
-            venue.country=data['address']['country']
-            venue.city=data['address']['city']
-            venue.state=data['address']['region'],
-            venue.zip_code=data['address']['postal_code']
-            venue.latitude=data['latitude']
-            venue.longitude=data['longitude']
-            venue.eventbrite_url=data['resource_uri']
-            venue.save()
-    except:
-        print("Error saving venue eventbrite_id: "+str(data['id'])+" skipping to the next")
-
-    return venue
 
 def sync_org_events(org):
 
     client = Eventbrite(org.eventbrite_key)
-    result = client.get_organization_events(org.eventbrite_id)
-        
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
+
     try:
-        for data in result['events']:
-            update_or_create_event(data, org)
+        # each page is saved before request the next one
+        for page in client.get_organization_event_pages(org.eventbrite_id):
+            for key, value in bulk_upsert_events(page, org).items():
+                counts[key] += value
 
-        org.sync_status = 'PERSISTED'
-        org.sync_desc = f"Success with {len(result['events'])} events..."
+        total = sum(counts.values())
+        org.sync_status = 'ERROR' if counts['errors'] else 'PERSISTED'
+        outcome = 'Error' if counts['errors'] else 'Success'
+        org.sync_desc = (f"{outcome} with {total} events: {counts['created']} created, {counts['updated']} "
+            f"updated, {counts['unchanged']} unchanged and {counts['errors']} with errors")
         org.save()
     except Exception as e:
         if org is not None:
@@ -101,84 +258,3 @@ def sync_org_events(org):
         raise e
 
     return True
-
-def update_or_create_event(data, org):
-        
-    if data is None: #skip if no data
-        print("Ignored event")
-        return False
-
-    now = timezone.now()
-
-    if data['status'] not in status_map:
-        raise Exception("Uknown eventbrite status "+data['status'])
-    
-    event = Event.objects.filter(eventbrite_id=data['id'], organization__id=org.id).first()
-    try:
-        venue = None
-        if 'venue' in data:
-            venue = create_or_update_venue(data['venue']['id'], org)
-        organizer = None
-        if 'organizer' in data:
-            organizer = create_or_update_organizer(data['organizer'], org, force_update=True)
-        else:
-            print("Event without organizer", data)
-
-        if event is None:
-            event = Event(
-                title=data['name']['text'],
-                description=data['description']['text'],
-                excerpt=data['description']['text'],
-                starting_at=data['start']['utc'],
-                ending_at=data['end']['utc'],
-                capacity=data['capacity'],
-                online_event=data['online_event'],
-                eventbrite_id=data['id'],
-                eventbrite_url=data['url'],
-                status = status_map[data['status']],
-                eventbrite_status=data['status'],
-                organization=org,
-                # organizer=organizer,
-                venue=venue,
-            )
-        else:
-            event.title=data['name']['text']
-            event.description=data['description']['text']
-            event.excerpt=data['description']['text']
-            event.starting_at=data['start']['utc']
-            event.ending_at=data['end']['utc']
-            event.capacity=data['capacity']
-            event.online_event=data['online_event']
-            event.eventbrite_id=data['id']
-            event.eventbrite_url=data['url']
-            event.status= status_map[data['status']]
-            event.eventbrite_status=data['status']
-            # event.organizer=organizer
-            event.venue=venue
-        
-        if "published" in data:
-            event.published_at=data['published']
-        if "logo" in data and data['logo'] is not None:
-            event.banner=data['logo']['url']
-        if event.url is None or event.url == "":
-            event.url = event.eventbrite_url
-
-        # look for the academy ownership based on organizer first
-        if organizer is not None and organizer.academy is not None:
-            event.academy=organizer.academy
-        elif Organization.academy is not None:
-            event.academy=organizer.academy
-
-        event.save()
-
-        event.sync_desc = str(now)
-        event.sync_status = 'PERSISTED'
-        event.save()
-    except Exception as e:
-        if event is not None:
-            event.sync_desc = str(now) + " => " + str(e)
-            event.sync_status = 'ERROR'
-            event.save()
-        raise e
-    
-    return event
\ No newline at end of file
@@ -4,3 +4,16 @@ class EventCache(Cache):
     model = 'Event'
     depends = ['User', 'Academy', 'Organization', 'Venue', 'EventType']
     parents = ['EventCheckin']
+
+    # the upcoming events change with the time
+    timeout = 60
+
+
+class ICalCohortsCache(Cache):
+    model = 'ICalCohorts'
+    parents = []
+
+
+class ICalEventsCache(Cache):
+    model = 'ICalEvents'
+    parents = []
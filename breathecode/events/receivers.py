@@ -0,0 +1,55 @@
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from breathecode.admissions.models import Academy, Cohort, CohortUser
+from breathecode.authenticate.models import DeviceId
+from .caches import EventCache, ICalCohortsCache, ICalEventsCache
+from .models import Event, EventType, Venue, Organization
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Cohort)
+@receiver(post_delete, sender=Cohort)
+@receiver(post_save, sender=CohortUser)
+@receiver(post_delete, sender=CohortUser)
+def clear_ical_cohorts(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the cohorts calendars")
+    ICalCohortsCache().clear()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def clear_ical_events(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the events calendars")
+    ICalEventsCache().clear()
+
+
+# both calendars include the academy and the server key
+@receiver(post_save, sender=Academy)
+@receiver(post_delete, sender=Academy)
+@receiver(post_save, sender=DeviceId)
+@receiver(post_delete, sender=DeviceId)
+def clear_ical_calendars(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the calendars")
+    ICalCohortsCache().clear()
+    ICalEventsCache().clear()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_save, sender=Academy)
+@receiver(post_delete, sender=Academy)
+def clear_events(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the events")
+    EventCache().clear()
@@ -0,0 +1,139 @@
+"""
+Test sync_org_events
+"""
+from unittest.mock import patch, MagicMock, call
+from breathecode.tests.mocks import (
+    GOOGLE_CLOUD_PATH,
+    apply_google_cloud_client_mock,
+    apply_google_cloud_bucket_mock,
+    apply_google_cloud_blob_mock,
+)
+from ..mixins import EventTestCase
+from ...actions import sync_org_events
+
+
+def eventbrite_event(id):
+    return {
+        'id': str(id),
+        'status': 'live',
+        'name': {'text': f'Event {id}'},
+        'description': {'text': 'Description'},
+        'start': {'utc': '2021-01-01T10:00:00Z'},
+        'end': {'utc': '2021-01-01T12:00:00Z'},
+        'capacity': 10,
+        'online_event': True,
+        'url': f'https://www.eventbrite.com/e/{id}',
+        'organizer': {'id': '1', 'name': 'Organizer', 'description': {'text': 'Organizer'}},
+    }
+
+
+def eventbrite_page(events, continuation=None):
+    response = MagicMock()
+    response.json.return_value = {
+        'events': events,
+        'pagination': {
+            'has_more_items': continuation is not None,
+            'continuation': continuation,
+        },
+    }
+    return response
+
+
+class SyncOrgEventsTestSuite(EventTestCase):
+    """Test sync_org_events"""
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch('breathecode.services.http.request', MagicMock(side_effect=[
+        eventbrite_page([eventbrite_event(1), eventbrite_event(2)], continuation='abc'),
+        eventbrite_page([eventbrite_event(3)]),
+    ]))
+    def test_sync_org_events_with_two_pages(self):
+        """Test sync_org_events follow the continuation"""
+        from breathecode.services import http
+
+        model = self.generate_models(organization=True, academy=True,
+            organization_kwargs={'eventbrite_id': '1', 'eventbrite_key': 'x'})
+
+        self.assertTrue(sync_org_events(model['organization']))
+
+        url = 'https://www.eventbriteapi.com/v3/organizations/1/events/?expand=organizer%2Cvenue&status=live'
+        headers = {'Authorization': 'Bearer x'}
+        self.assertEqual(http.request.call_args_list, [
+            call('GET', url, headers=headers),
+            call('GET', url + '&continuation=abc', headers=headers),
+        ])
+
+        self.assertEqual([x['eventbrite_id'] for x in self.all_event_dict()], ['1', '2', '3'])
+        organization = self.all_organization_dict()[0]
+        self.assertEqual(organization['sync_status'], 'PERSISTED')
+        self.assertEqual(organization['sync_desc'], 'Success with 3 events: 3 created, 0 updated, '
+            '0 unchanged and 0 with errors')
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_sync_org_events_twice(self):
+        """Test sync_org_events only write the events that changed"""
+        model = self.generate_models(organization=True, academy=True,
+            organization_kwargs={'eventbrite_id': '1', 'eventbrite_key': 'x'})
+
+        events = [eventbrite_event(1), eventbrite_event(2), {**eventbrite_event(3), 'status': 'potato'}]
+        with patch('breathecode.services.http.request', MagicMock(return_value=eventbrite_page(events))):
+            sync_org_events(model['organization'])
+
+        events = [eventbrite_event(1), {**eventbrite_event(2), 'capacity': 20}, eventbrite_event(3)]
+        with patch('breathecode.services.http.request', MagicMock(return_value=eventbrite_page(events))):
+            # fetch the events, create the new one, fetch it back, update the changed one and the organization
+            with self.assertNumQueries(6):
+                sync_org_events(model['organization'])
+
+        self.assertEqual([(x['eventbrite_id'], x['capacity'], x['sync_status'])
+            for x in self.all_event_dict()], [('1', 10, 'PERSISTED'), ('2', 20, 'PERSISTED'),
+                ('3', 10, 'PERSISTED')])
+
+        organization = self.all_organization_dict()[0]
+        self.assertEqual(organization['sync_status'], 'PERSISTED')
+        self.assertEqual(organization['sync_desc'], 'Success with 3 events: 1 created, 1 updated, '
+            '1 unchanged and 0 with errors')
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_sync_org_events_with_venue_id_and_errors(self):
+        """Test sync_org_events resolve the venues that were not expanded and report the errors"""
+        model = self.generate_models(organization=True, academy=True, venue=True,
+            organization_kwargs={'eventbrite_id': '1', 'eventbrite_key': 'x'},
+            venue_kwargs={'eventbrite_id': '10'})
+
+        events = [{**eventbrite_event(1), 'venue_id': '10'}, {**eventbrite_event(2), 'status': 'potato'}]
+        with patch('breathecode.services.http.request', MagicMock(return_value=eventbrite_page(events))):
+            sync_org_events(model['organization'])
+
+        self.assertEqual([(x['eventbrite_id'], x['venue_id'], x['sync_status'])
+            for x in self.all_event_dict()], [('1', model['venue'].id, 'PERSISTED')])
+
+        organization = self.all_organization_dict()[0]
+        self.assertEqual(organization['sync_status'], 'ERROR')
+        self.assertEqual(organization['sync_desc'], 'Error with 2 events: 1 created, 0 updated, '
+            '0 unchanged and 1 with errors')
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_sync_org_events_clear_the_caches(self):
+        """Test the cached events and calendars are not served after a sync that wrote events"""
+        from breathecode.events.caches import EventCache, ICalEventsCache
+        model = self.generate_models(organization=True, academy=True,
+            organization_kwargs={'eventbrite_id': '1', 'eventbrite_key': 'x'})
+
+        EventCache().set([{'id': 1}], academy=1)
+        ICalEventsCache().set({'id': 1}, academy=1)
+
+        with patch('breathecode.services.http.request', MagicMock(return_value=eventbrite_page([
+                eventbrite_event(1)]))):
+            sync_org_events(model['organization'])
+
+        self.assertEqual(EventCache().get(academy=1), None)
+        self.assertEqual(ICalEventsCache().get(academy=1), None)
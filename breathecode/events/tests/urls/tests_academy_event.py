@@ -632,18 +632,25 @@ class AcademyEventTestSuite(EventTestCase):
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_all_academy_events_with_data_testing_cache(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Event__academy_id=1&event_id=None&city=None&'
-                'country=None&zip_code=None&upcoming=None&past=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'academy_id': 1,
+            'event_id': None,
+            'city': None,
+            'country': None,
+            'zip_code': None,
+            'upcoming': None,
+            'past': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_models = self.test_all_academy_events()
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.test_all_academy_events(old_models)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
@@ -665,15 +672,22 @@ class AcademyEventTestSuite(EventTestCase):
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_with_data_testing_cache_and_remove_in_post(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Event__academy_id=1&event_id=None&city=None&'
-                'country=None&zip_code=None&upcoming=None&past=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'academy_id': 1,
+            'event_id': None,
+            'city': None,
+            'country': None,
+            'zip_code': None,
+            'upcoming': None,
+            'past': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_model = self.test_all_academy_events()
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.headers(academy=1)
 
@@ -761,7 +775,7 @@ class AcademyEventTestSuite(EventTestCase):
             'url': 'https://www.google.com/',
             'venue_id': None,
         }])
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         base = [
             self.generate_models(authenticate=True, models=old_model[0]),
@@ -769,7 +783,7 @@ class AcademyEventTestSuite(EventTestCase):
         ]
 
         self.test_all_academy_events(base)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
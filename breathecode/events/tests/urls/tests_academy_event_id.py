@@ -191,15 +191,22 @@ class AcademyEventsTestSuite(EventTestCase):
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
     def test_academy_cohort_with_data_testing_cache_and_remove_in_put(self):
         """Test /cohort without auth"""
-        cache_keys = [
-            'Event__academy_id=1&event_id=None&city=None&'
-                'country=None&zip_code=None&upcoming=None&past=None&limit=None&offset=None'
-        ]
+        cache_kwargs = {
+            'academy_id': 1,
+            'event_id': None,
+            'city': None,
+            'country': None,
+            'zip_code': None,
+            'upcoming': None,
+            'past': None,
+            'limit': None,
+            'offset': None,
+        }
 
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
 
         old_model = AcademyEventTestSuite.test_all_academy_events(self)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
 
         self.headers(academy=1)
 
@@ -265,7 +272,7 @@ class AcademyEventsTestSuite(EventTestCase):
             'starting_at': current_date,
             'ending_at': current_date,
         }])
-        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get(**cache_kwargs), None)
         event = old_model[0]['event']
 
         for x in data:
@@ -280,4 +287,4 @@ class AcademyEventsTestSuite(EventTestCase):
         ]
 
         AcademyEventTestSuite.test_all_academy_events(self, base)
-        self.assertEqual(self.cache.keys(), cache_keys)
+        self.assertNotEqual(self.cache.get(**cache_kwargs), None)
@@ -554,3 +554,46 @@ class AcademyCohortTestSuite(EventTestCase):
     #         file.write(response.content.decode('utf-8').replace('\r', ''))
 
     #     assert False
+
+    def test_ical_cohorts__with_one__if_none_match(self):
+        """Test /academy/cohort with the etag of the last response"""
+        device_id_kwargs = {'name': 'server'}
+        self.generate_models(academy=True, event=True, cohort=True,
+            device_id=True, device_id_kwargs=device_id_kwargs)
+
+        url = reverse_lazy('events:academy_id_ical_cohorts')
+        args ={'academy': "1"}
+        response = self.client.get(url + "?" + urllib.parse.urlencode(args))
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Last-Modified'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url + "?" + urllib.parse.urlencode(args),
+                HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_ical_cohorts__with_one__cleared_on_cohort_change(self):
+        """Test /academy/cohort after the cohort was changed"""
+        device_id_kwargs = {'name': 'server'}
+        model = self.generate_models(academy=True, event=True, cohort=True,
+            device_id=True, device_id_kwargs=device_id_kwargs)
+
+        url = reverse_lazy('events:academy_id_ical_cohorts')
+        args ={'academy': "1"}
+        response = self.client.get(url + "?" + urllib.parse.urlencode(args))
+        etag = response['ETag']
+
+        model.cohort.name = 'Another name'
+        model.cohort.save()
+
+        response = self.client.get(url + "?" + urllib.parse.urlencode(args),
+            HTTP_IF_NONE_MATCH=etag)
+
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(b'Another name', response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,10 +1,11 @@
 import os
 from breathecode.authenticate.actions import server_id
-from breathecode.events.caches import EventCache
-import logging, datetime
+from breathecode.events.caches import EventCache, ICalCohortsCache, ICalEventsCache
+import logging, datetime, hashlib
 import re
 
 from django.http.response import HttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
 from breathecode.utils.cache import Cache
 from django.shortcuts import render
 from django.utils import timezone
@@ -21,7 +22,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 # from django.http import HttpResponse
 from rest_framework.response import Response
-from breathecode.utils import ValidationException, capable_of, HeaderLimitOffsetPagination
+from breathecode.utils import ValidationException, capable_of, HeaderLimitOffsetPagination, cache_view
 from rest_framework.decorators import renderer_classes
 from breathecode.renderers import PlainTextRenderer
 from breathecode.services.eventbrite import Eventbrite
@@ -35,6 +36,7 @@ logger = logging.getLogger(__name__)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_view(EventCache())
 def get_events(request):
     items = Event.objects.all()
     lookup = {}
@@ -339,18 +341,60 @@ def ical_academies_repr(slugs=None, ids=None):
     return ret
 
 
+def ical_response(request, cache, cache_kwargs, render):
+    """
+    Return the calendar rendered once per set of academies, the calendar
+    clients get a 304 while nothing changed.
+    """
+    feed = cache.get(**cache_kwargs)
+
+    if feed is None:
+        calendar_text, updated_at = render()
+        feed = {
+            'body': calendar_text.decode('utf-8'),
+            'etag': hashlib.md5(calendar_text).hexdigest(),
+            'last_modified': http_date((updated_at or timezone.now()).timestamp()),
+        }
+        cache.set(feed, **cache_kwargs)
+
+    etag = quote_etag(feed['etag'])
+    if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponse(status=304)
+
+    else:
+        response = HttpResponse(feed['body'].encode('utf-8'), content_type='text/calendar')
+        response['Content-Disposition'] = 'attachment; filename="calendar.ics"'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = feed['last_modified']
+    return response
+
+
 class ICalCohortsView(APIView):
     permission_classes = [AllowAny]
+    cache = ICalCohortsCache()
 
     def get(self, request):
-        items = Cohort.objects.all()
-
         ids = request.GET.get('academy', '')
         slugs = request.GET.get('academy_slug', '')
 
         ids = ids.split(",") if ids else []
         slugs = slugs.split(",") if slugs else []
 
+        cache_kwargs = {
+            'academy': ','.join(ids),
+            'academy_slug': ','.join(slugs),
+            'upcoming': request.GET.get('upcoming'),
+        }
+
+        return ical_response(request, self.cache, cache_kwargs,
+            lambda: self.render(request, ids, slugs))
+
+    def render(self, request, ids, slugs):
+        items = Cohort.objects.all()
+
         if ids:
             items = Cohort.objects.filter(academy__id__in=ids).order_by('id')
 
@@ -367,7 +411,7 @@ class ICalCohortsView(APIView):
                 Academy.objects.filter(slug__in=slugs).count() != len(slugs)):
             raise ValidationException("Some academy not exist")
 
-        items = items.exclude(stage='DELETED')
+        items = items.exclude(stage='DELETED').select_related('academy')
 
         upcoming = request.GET.get('upcoming')
         if upcoming == 'true':
@@ -402,6 +446,14 @@ class ICalCohortsView(APIView):
 
         calendar.add('version', '2.0')
 
+        items = list(items)
+        teachers = {}
+
+        # the first teacher of each cohort, like CohortUser.objects.filter(...).first()
+        for teacher in CohortUser.objects.filter(role='TEACHER', cohort__id__in=[x.id for x in items])\
+                .select_related('user').order_by('id'):
+            teachers.setdefault(teacher.cohort_id, teacher)
+
         for item in items:
             event = iEvent()
 
@@ -414,7 +466,7 @@ class ICalCohortsView(APIView):
 
             event.add('dtstamp', item.created_at)
 
-            teacher = CohortUser.objects.filter(role='TEACHER', cohort__id=item.id).first()
+            teacher = teachers.get(item.id)
 
             if teacher:
                 organizer = vCalAddress(f'MAILTO:{teacher.user.email}')
@@ -438,37 +490,41 @@ class ICalCohortsView(APIView):
 
             calendar.add_component(event)
 
-        calendar_text = calendar.to_ical()
-
-        response = HttpResponse(calendar_text, content_type='text/calendar')
-        response['Content-Disposition'] = 'attachment; filename="calendar.ics"'
-        return response
+        return calendar.to_ical(), max([x.updated_at for x in items], default=None)
 
 
 class ICalEventView(APIView):
     permission_classes = [AllowAny]
+    cache = ICalEventsCache()
 
     def get(self, request):
-        items = Event.objects.filter(status='ACTIVE')
-
         ids = request.GET.get('academy', '')
         slugs = request.GET.get('academy_slug', '')
 
         ids = ids.split(",") if ids else []
         slugs = slugs.split(",") if slugs else []
 
-        if ids:
-            items = Event.objects.filter(academy__id__in=ids, status='ACTIVE').order_by('id')
+        cache_kwargs = {
+            'academy': ','.join(ids),
+            'academy_slug': ','.join(slugs),
+            'upcoming': request.GET.get('upcoming'),
+        }
 
-        elif slugs:
-            items = Event.objects.filter(academy__slug__in=slugs, status='ACTIVE').order_by('id')
-
-        else:
-            items = []
+        return ical_response(request, self.cache, cache_kwargs,
+            lambda: self.render(request, ids, slugs))
 
+    def render(self, request, ids, slugs):
         if not ids and not slugs:
             raise ValidationException("You need to specify at least one academy or academy_slug (comma separated) in the querystring")
 
+        items = Event.objects.filter(status='ACTIVE').select_related('academy', 'venue', 'event_type', 'author')
+
+        if ids:
+            items = items.filter(academy__id__in=ids).order_by('id')
+
+        else:
+            items = items.filter(academy__slug__in=slugs).order_by('id')
+
         if (Academy.objects.filter(id__in=ids).count() != len(ids) or
                 Academy.objects.filter(slug__in=slugs).count() != len(slugs)):
             raise ValidationException("Some academy not exist")
@@ -506,6 +562,7 @@ class ICalEventView(APIView):
 
         calendar.add('version', '2.0')
 
+        items = list(items)
         for item in items:
             event = iEvent()
 
@@ -568,8 +625,4 @@ class ICalEventView(APIView):
 
             calendar.add_component(event)
 
-        calendar_text = calendar.to_ical()
-
-        response = HttpResponse(calendar_text, content_type='text/calendar')
-        response['Content-Disposition'] = 'attachment; filename="calendar.ics"'
-        return response
+        return calendar.to_ical(), max([x.updated_at for x in items], default=None)
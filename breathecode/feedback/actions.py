@@ -6,7 +6,7 @@ from breathecode.authenticate.models import Token
 from .models import Answer, Survey
 from .utils import strings
 from breathecode.admissions.models import CohortUser
-from .tasks import send_cohort_survey, build_question
+from .tasks import send_cohort_survey_group, build_question
 
 logger = logging.getLogger(__name__)
 
@@ -27,17 +27,22 @@ def send_survey_group(survey=None,cohort=None):
     if cohort_teacher.count() == 0:
         raise ValidationException("This cohort must have a teacher assigned to be able to survey it", 400)
 
-    ucs = CohortUser.objects.filter(cohort=cohort, role='STUDENT').filter()
+    ucs = CohortUser.objects.filter(cohort=cohort, role='STUDENT').select_related('user')
     result = { "success": [], "error": [] }
+    user_ids = []
     for uc in ucs:
         if uc.educational_status in ['ACTIVE', 'GRADUATED']:
-            send_cohort_survey.delay(uc.user.id, survey.id)
+            user_ids.append(uc.user.id)
             logger.debug(f"Survey scheduled to send for {uc.user.email}")
             result["success"].append(f"Survey scheduled to send for {uc.user.email}")
         else:
             logger.debug(f"Survey NOT sent to {uc.user.email} because it's not an active or graduated student")
             result["error"].append(f"Survey NOT sent to {uc.user.email} because it's not an active or graduated student")
 
+    # the whole cohort is rendered and sent by one task
+    if user_ids:
+        send_cohort_survey_group.delay(survey.id, user_ids)
+
     return result
 
 def send_question(user, cohort=None):
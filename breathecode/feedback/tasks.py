@@ -1,10 +1,11 @@
 import logging
 from celery import shared_task, Task
 from django.utils import timezone
-from breathecode.notify.actions import send_email_message, send_slack
+from breathecode.notify.actions import send_email_message, send_slack, send_email_messages, send_slack_messages
 from .utils import strings
 from breathecode.authenticate.actions import create_token
 from breathecode.admissions.models import CohortUser
+from breathecode.utils import ValidationException
 from django.contrib.auth.models import User
 from .models import Survey, Answer
 from django.utils import timezone
@@ -104,31 +105,14 @@ def generate_user_cohort_survey_answers(user, survey, status='OPENED'):
     return _answers
 
 
-@shared_task(bind=True, base=BaseTaskWithRetry)
-def send_cohort_survey(self, user_id, survey_id):
-    logger.debug("Starting send_cohort_survey")
-    survey = Survey.objects.filter(id=survey_id).first()
-    if survey is None:
-        logger.error("Survey not found")
-        return False
-
-    user = User.objects.filter(id=user_id).first()
-    if user is None:
-        logger.error("User not found")
-        return False
-
-    utc_now = timezone.now()
-    if utc_now > survey.created_at + survey.duration:
-        logger.error("This survey has already expired")
-        return False
-
+def __get_cohort_survey_data__(user, survey):
     cu = CohortUser.objects.filter(
         cohort=survey.cohort, role="STUDENT", user=user).first()
     if cu is None:
         raise ValidationException(
             "This student does not belong to this cohort", 400)
 
-    answers = generate_user_cohort_survey_answers(user, survey, status='SENT')
+    generate_user_cohort_survey_answers(user, survey, status='SENT')
 
     has_slackuser = hasattr(user, 'slackuser')
     if not user.email and not has_slackuser:
@@ -137,14 +121,35 @@ def send_cohort_survey(self, user_id, survey_id):
         raise Exception(message)
 
     token = create_token(user, hours_length=48)
-    data = {
+    return {
         "SUBJECT": strings[survey.lang]["survey_subject"],
         "MESSAGE": strings[survey.lang]["survey_message"],
-        "SURVEY_ID": survey_id,
+        "SURVEY_ID": survey.id,
         "BUTTON": strings[survey.lang]["button_label"],
-        "LINK": f"https://nps.breatheco.de/survey/{survey_id}?token={token.key}",
+        "LINK": f"https://nps.breatheco.de/survey/{survey.id}?token={token.key}",
     }
 
+
+@shared_task(bind=True, base=BaseTaskWithRetry)
+def send_cohort_survey(self, user_id, survey_id):
+    logger.debug("Starting send_cohort_survey")
+    survey = Survey.objects.filter(id=survey_id).first()
+    if survey is None:
+        logger.error("Survey not found")
+        return False
+
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        logger.error("User not found")
+        return False
+
+    utc_now = timezone.now()
+    if utc_now > survey.created_at + survey.duration:
+        logger.error("This survey has already expired")
+        return False
+
+    data = __get_cohort_survey_data__(user, survey)
+
     if user.email:
         send_email_message("nps_survey", user.email, data)
         survey.sent_at = timezone.now()
@@ -152,3 +157,48 @@ def send_cohort_survey(self, user_id, survey_id):
     if hasattr(user, 'slackuser') and hasattr(survey.cohort.academy, 'slackteam'):
         send_slack("nps_survey", user.slackuser,
                    survey.cohort.academy.slackteam, data=data)
+
+
+@shared_task(bind=True, base=BaseTaskWithRetry)
+def send_cohort_survey_group(self, survey_id, user_ids):
+    """
+    Send the survey to a group of students of the cohort, the messages of the
+    whole group are rendered and sent together
+    """
+    logger.debug("Starting send_cohort_survey_group")
+    survey = Survey.objects.filter(id=survey_id).select_related('cohort__academy').first()
+    if survey is None:
+        logger.error("Survey not found")
+        return False
+
+    utc_now = timezone.now()
+    if utc_now > survey.created_at + survey.duration:
+        logger.error("This survey has already expired")
+        return False
+
+    team = getattr(survey.cohort.academy, 'slackteam', None)
+    emails = []
+    slack_messages = []
+
+    for user in User.objects.filter(id__in=user_ids).select_related('slackuser'):
+        # the task is not retried for one student, the rest of the group already got it
+        try:
+            data = __get_cohort_survey_data__(user, survey)
+        except Exception as e:
+            logger.error(f"Survey not sent to the user {user.id}: {str(e)}")
+            continue
+
+        if user.email:
+            emails.append((user.email, data))
+
+        if hasattr(user, 'slackuser') and team is not None:
+            slack_messages.append((user.slackuser, team, data))
+
+    send_email_messages("nps_survey", emails)
+    send_slack_messages("nps_survey", slack_messages)
+
+    if emails or slack_messages:
+        survey.sent_at = timezone.now()
+        survey.save()
+
+    return True
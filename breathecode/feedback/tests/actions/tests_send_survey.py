@@ -132,7 +132,8 @@ class SendSurveyTestSuite(FeedbackTestCase):
         model = self.generate_models(user=True, cohort_user=True, syllabus=True)
         certificate = model['cohort'].syllabus.certificate.name
 
-        send_question(model['user'])
+        with self.captureOnCommitCallbacks(execute=True):
+            send_question(model['user'])
 
         expected = [{
             'academy_id': None,
@@ -176,7 +177,8 @@ class SendSurveyTestSuite(FeedbackTestCase):
             slack_team=True, credentials_slack=True, academy=True, syllabus=True)
         certificate = model['cohort'].syllabus.certificate.name
 
-        send_question(model['user'])
+        with self.captureOnCommitCallbacks(execute=True):
+            send_question(model['user'])
 
         expected = [{
             'id': 1,
@@ -223,7 +225,8 @@ class SendSurveyTestSuite(FeedbackTestCase):
         certificate = model['cohort'].syllabus.certificate.name
 
         try:
-            send_question(model['user'])
+            with self.captureOnCommitCallbacks(execute=True):
+                send_question(model['user'])
         except Exception as e:
             self.assertEqual(str(e), f"Team owner not has slack credentials")
 
@@ -271,7 +274,8 @@ class SendSurveyTestSuite(FeedbackTestCase):
             syllabus=True)
         certificate = model['cohort'].syllabus.certificate.name
 
-        send_question(model['user'])
+        with self.captureOnCommitCallbacks(execute=True):
+            send_question(model['user'])
         expected = [{
             'academy_id': None,
             'cohort_id': 1,
@@ -0,0 +1,51 @@
+"""
+Test send_cohort_survey_group
+"""
+from unittest.mock import patch, MagicMock
+from django.template.loader import get_template
+from mixer.backend.django import mixer
+from breathecode.tests.mocks import (
+    GOOGLE_CLOUD_PATH,
+    apply_google_cloud_client_mock,
+    apply_google_cloud_bucket_mock,
+    apply_google_cloud_blob_mock,
+    MAILGUN_PATH,
+    MAILGUN_INSTANCES,
+    apply_mailgun_requests_post_mock,
+)
+from ..mixins.new_feedback_test_case import FeedbackTestCase
+from ...models import Survey, Answer
+from ...tasks import send_cohort_survey_group
+from breathecode.notify import actions
+
+
+class SendCohortSurveyGroupTestSuite(FeedbackTestCase):
+    """Test send_cohort_survey_group"""
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch(MAILGUN_PATH['post'], apply_mailgun_requests_post_mock())
+    @patch('breathecode.notify.actions.get_template', MagicMock(wraps=get_template))
+    def test_send_cohort_survey_group(self):
+        """Test the survey is rendered once per template and sent to each student"""
+        mock_mailgun = MAILGUN_INSTANCES['post']
+        mock_mailgun.call_args_list = []
+
+        model = self.generate_models(user=True, cohort_user=True, survey=True, syllabus=True,
+            cohort_user_kwargs={'role': 'STUDENT'}, survey_kwargs={'lang': 'en'})
+        user = mixer.blend('auth.User', email='b@4geeks.co')
+        mixer.blend('admissions.CohortUser', user=user, cohort=model['cohort'], role='STUDENT')
+        mixer.blend('admissions.CohortUser', cohort=model['cohort'], role='TEACHER')
+        outsider = mixer.blend('auth.User', email='c@4geeks.co')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(send_cohort_survey_group(model['survey'].id,
+                [model['user'].id, user.id, outsider.id]), True)
+
+        self.assertEqual(sorted(x[1]['data']['to'] for x in mock_mailgun.call_args_list),
+            sorted([model['user'].email, 'b@4geeks.co']))
+        self.assertEqual(sorted(x[0][0] for x in actions.get_template.call_args_list),
+            ['nps_survey.html', 'nps_survey.txt'])
+        self.assertEqual(set(Answer.objects.values_list('user__id', flat=True)), {model['user'].id, user.id})
+        self.assertNotEqual(Survey.objects.get(id=model['survey'].id).sent_at, None)
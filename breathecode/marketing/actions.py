@@ -1,12 +1,15 @@
-import os, re, requests, logging
-from itertools import chain
+import os, re, logging, requests
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.utils import timezone
-from .models import FormEntry, Tag, Automation, ActiveCampaignAcademy
+from django.db import transaction
+from django.db.models import Count, F
+from .models import FormEntry, Tag, Automation, ActiveCampaignAcademy, LeadReportRollup
 from schema import Schema, And, Use, Optional, SchemaError
 from rest_framework.exceptions import APIException, ValidationError, PermissionDenied
-from activecampaign.client import Client
 from rest_framework.decorators import api_view, permission_classes
-from .utils import AC_Old_Client
+from .utils import AC_Old_Client, AC_Client, RateLimiter, ActiveCampaignTransientError
+from breathecode.services import http
 from .serializers import FormEntrySerializer
 from breathecode.notify.actions import send_email_message
 from breathecode.authenticate.models import CredentialsFacebook
@@ -16,6 +19,20 @@ logger = logging.getLogger(__name__)
 SAVE_LEADS = os.getenv('SAVE_LEADS',None)
 GOOGLE_CLOUD_KEY = os.getenv('GOOGLE_CLOUD_KEY',None)
 
+# the tags of a lead sorted by importance
+LEAD_TAG_TYPES = ['STRONG', 'SOFT', 'DISCOVERY', 'OTHER']
+
+# active campaign accepts 5 requests per second by account
+AC_MAX_WORKERS = 5
+AC_REQUESTS_PER_SECOND = 5
+
+# a lead that failed because active campaign was unavailable stays pending and
+# it is sent again after AC_RETRY_SECONDS * 2 ** attempts
+AC_MAX_ATTEMPTS = 5
+AC_RETRY_SECONDS = 60
+AC_TRANSIENT_ERRORS = (ActiveCampaignTransientError, requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout)
+
 acp_ids = {
     # "strong": "49",
     # "soft": "48",
@@ -42,7 +59,29 @@ def set_optional(contact, key, data, custom_key=None):
 
     return contact
 
-def get_lead_tags(ac_academy, form_entry):
+def get_lead_context(ac_academy):
+    """
+    Load once the tags and automations of the academy, to resolve the ones of
+    many leads without touch the database again.
+    """
+    context = {
+        'tags': {},
+        'automations': {},
+        'automations_by_acp_id': {},
+    }
+
+    tags = Tag.objects.filter(ac_academy=ac_academy, tag_type__in=LEAD_TAG_TYPES).select_related('automation')
+    for tag in tags:
+        context['tags'].setdefault(tag.slug, []).append(tag)
+
+    for automation in Automation.objects.filter(ac_academy=ac_academy):
+        context['automations'].setdefault(automation.slug, []).append(automation)
+        context['automations_by_acp_id'].setdefault(automation.acp_id, automation)
+
+    return context
+
+
+def get_lead_tags(ac_academy, form_entry, context=None):
     if 'tags' not in form_entry or form_entry['tags'] == '':
         raise Exception('You need to specify tags for this entry')
     else:
@@ -50,12 +89,14 @@ def get_lead_tags(ac_academy, form_entry):
         if len(_tags) == 0 or _tags[0] == '':
             raise Exception('The contact tags are empty', 400)
 
-    strong_tags = Tag.objects.filter(slug__in=_tags, tag_type='STRONG', ac_academy=ac_academy)
-    soft_tags = Tag.objects.filter(slug__in=_tags, tag_type='SOFT', ac_academy=ac_academy)
-    dicovery_tags = Tag.objects.filter(slug__in=_tags, tag_type='DISCOVERY', ac_academy=ac_academy)
-    other_tags = Tag.objects.filter(slug__in=_tags, tag_type='OTHER', ac_academy=ac_academy)
+    if context is None:
+        tags = list(Tag.objects.filter(slug__in=_tags, tag_type__in=LEAD_TAG_TYPES,
+            ac_academy=ac_academy).select_related('automation'))
+    else:
+        tags = [tag for slug in set(_tags) for tag in context['tags'].get(slug, [])]
 
-    tags = list(chain(strong_tags, soft_tags, dicovery_tags, other_tags))
+    # the strong tags first, then the soft, the discovery and the other ones
+    tags = sorted(tags, key=lambda x: (LEAD_TAG_TYPES.index(x.tag_type), x.id))
     if len(tags) == 0:
         logger.error("Tag applied to the contact not found or has tag_type assigned")
         logger.error(_tags)
@@ -63,21 +104,25 @@ def get_lead_tags(ac_academy, form_entry):
 
     return tags
 
-def get_lead_automations(ac_academy, form_entry):
+def get_lead_automations(ac_academy, form_entry, context=None):
     _automations = []
     if 'automations' not in form_entry or form_entry['automations'] == '':
         return []
     else:
         _automations = form_entry['automations'].split(",")
 
-    automations = Automation.objects.filter(slug__in=_automations, ac_academy=ac_academy)
-    count = automations.count()
+    if context is None:
+        automations = list(Automation.objects.filter(slug__in=_automations, ac_academy=ac_academy))
+    else:
+        automations = [x for slug in set(_automations) for x in context['automations'].get(slug, [])]
+
+    count = len(automations)
     if count == 0:
         _name = form_entry['automations']
         raise Exception(f"The specified automation {_name} was not found for this AC Academy")
 
     logger.debug(f"found {str(count)} automations")
-    return automations.values_list('acp_id', flat=True)
+    return [x.acp_id for x in automations]
 
 
 def add_to_active_campaign(contact, academy_id: int, automation_id: int):
@@ -99,7 +144,7 @@ def add_to_active_campaign(contact, academy_id: int, automation_id: int):
         logger.error("error adding contact", response)
         raise APIException('Could not save contact in CRM')
 
-    client = Client(ac_url, ac_key)
+    client = AC_Client(ac_url, ac_key)
 
     if event_attendancy_automation_id != automation_id:
         message = 'Automation doesn\'t exist for this AC Academy'
@@ -131,18 +176,24 @@ def add_to_active_campaign(contact, academy_id: int, automation_id: int):
         # # entry.automation_objects.add(auto)
 
 
-def register_new_lead(form_entry=None):
+def prepare_lead(form_entry=None, ac_academy=None, context=None, entry=None):
+    """
+    Validate the lead and return everything needed to send it to active
+    campaign, the new contact emails are sent here.
+    """
     if form_entry is None:
         raise Exception('You need to specify the form entry data')
 
     if 'location' not in form_entry or form_entry['location'] is None:
         raise Exception('Missing location information')
 
-    ac_academy = ActiveCampaignAcademy.objects.filter(academy__slug=form_entry['location']).first()
+    if ac_academy is None:
+        ac_academy = ActiveCampaignAcademy.objects.filter(academy__slug=form_entry['location']).first()
+
     if ac_academy is None:
         raise Exception(f"No academy found with slug {form_entry['location']}")
 
-    automations = get_lead_automations(ac_academy, form_entry)
+    automations = get_lead_automations(ac_academy, form_entry, context)
 
     if automations:
         logger.debug("found automations")
@@ -150,7 +201,7 @@ def register_new_lead(form_entry=None):
     else:
         logger.debug("automations not found")
 
-    tags = get_lead_tags(ac_academy, form_entry)
+    tags = get_lead_tags(ac_academy, form_entry, context)
     logger.debug("found tags")
     logger.debug(set(t.slug for t in tags))
     LEAD_TYPE = tags[0].tag_type
@@ -190,14 +241,12 @@ def register_new_lead(form_entry=None):
     contact = set_optional(contact, 'gclid', form_entry)
     contact = set_optional(contact, 'referral_key', form_entry)
 
-    entry = FormEntry.objects.filter(id=form_entry['id']).first()
+    if entry is None:
+        entry = FormEntry.objects.filter(id=form_entry['id']).first()
 
     if not entry:
         raise Exception('FormEntry not found (id: ' + str(form_entry['id']) + ')')
 
-    # save geolocalization info
-    # save_get_geolocal(entry, form_enty)
-
     if 'contact-us' == tags[0].slug:
         send_email_message('new_contact', ac_academy.academy.marketing_email, {
             "subject": f"New contact from the website {form_entry['first_name']} {form_entry['last_name']}",
@@ -207,22 +256,34 @@ def register_new_lead(form_entry=None):
             # "data": { **form_entry, **address },
         })
 
-    # ENV Variable to fake lead storage
-    if SAVE_LEADS == 'FALSE':
-        logger.debug("Ignoring leads because SAVE_LEADS is FALSE on the env variables")
-        return form_entry
+    return {
+        'ac_academy': ac_academy,
+        'entry': entry,
+        'contact': contact,
+        'tags': tags,
+        'automations': automations,
+    }
 
-    logger.debug("ready to send contact with following details: ", contact)
-    old_client = AC_Old_Client(ac_academy.ac_url, ac_academy.ac_key)
-    response = old_client.contacts.create_contact(contact)
-    contact_id = response['subscriber_id']
+
+def send_lead(lead, old_client, client):
+    """
+    Send the lead prepared by prepare_lead to active campaign, it doesn't touch
+    the database so it can run in any thread. Return the acp_id of the
+    automations triggered and the tags added.
+    """
+    logger.debug("ready to send contact with following details: ", lead['contact'])
+    response = old_client.contacts.create_contact(lead['contact'])
     if 'subscriber_id' not in response:
         logger.error("error adding contact", response)
         raise APIException('Could not save contact in CRM')
 
-    client = Client(ac_academy.ac_url, ac_academy.ac_key)
-    if automations:
-        for automation_id in automations:
+    contact_id = response['subscriber_id']
+
+    # the contact already exists and its automations could be triggered, sending the lead
+    # again would trigger them twice, so from here active campaign errors are not retried
+    try:
+        triggered = []
+        for automation_id in lead['automations']:
             data = {
                 "contactAutomation": {
                     "contact": contact_id,
@@ -235,21 +296,62 @@ def register_new_lead(form_entry=None):
                 raise APIException('Could not add contact to Automation')
             else:
                 logger.debug(f"Triggered automation with id {str(automation_id)}", response)
-                auto = Automation.objects.filter(acp_id=automation_id, ac_academy=ac_academy).first()
-                entry.automation_objects.add(auto)
-
-    for t in tags:
-        data = {
-            "contactTag": {
-                "contact": contact_id,
-                "tag": t.acp_id
+                triggered.append(automation_id)
+
+        tags = []
+        for t in lead['tags']:
+            data = {
+                "contactTag": {
+                    "contact": contact_id,
+                    "tag": t.acp_id
+                }
             }
-        }
-        response = client.contacts.add_a_tag_to_contact(data)
-        if 'contacts' in response:
-            entry.tag_objects.add(t.id)
+            response = client.contacts.add_a_tag_to_contact(data)
+            if 'contacts' in response:
+                tags.append(t)
+
+    except AC_TRANSIENT_ERRORS as e:
+        logger.error(f"contact {contact_id} was saved in CRM but the lead was not completed", e)
+        raise APIException(f'Contact {contact_id} was saved in CRM but the lead was not completed: {str(e)}')
+
+    return {
+        'automations': triggered,
+        'tags': tags,
+    }
+
+
+def get_lead_automation_objects(ac_academy, acp_ids, context=None):
+    if context is None:
+        automations = {}
+        for automation in Automation.objects.filter(acp_id__in=acp_ids, ac_academy=ac_academy):
+            automations.setdefault(automation.acp_id, automation)
+    else:
+        automations = context['automations_by_acp_id']
+
+    return [automations[x] for x in acp_ids if x in automations]
 
 
+def register_new_lead(form_entry=None):
+    lead = prepare_lead(form_entry)
+
+    # ENV Variable to fake lead storage
+    if SAVE_LEADS == 'FALSE':
+        logger.debug("Ignoring leads because SAVE_LEADS is FALSE on the env variables")
+        return form_entry
+
+    ac_academy = lead['ac_academy']
+    old_client = AC_Old_Client(ac_academy.ac_url, ac_academy.ac_key)
+    client = AC_Client(ac_academy.ac_url, ac_academy.ac_key)
+    sent = send_lead(lead, old_client, client)
+
+    entry = lead['entry']
+    automations = get_lead_automation_objects(ac_academy, sent['automations'])
+    if automations:
+        entry.automation_objects.add(*automations)
+
+    if sent['tags']:
+        entry.tag_objects.add(*[x.id for x in sent['tags']])
+
     entry.storage_status = 'PERSISTED'
     entry.save()
 
@@ -257,14 +359,147 @@ def register_new_lead(form_entry=None):
 
     return entry
 
+
+def __send_lead_and_get_geolocal__(lead, form_entry, old_client, client):
+    sent = send_lead(lead, old_client, client)
+
+    # the lead is already in active campaign, the geolocalization is optional
+    try:
+        sent['geolocal'] = get_geolocal(form_entry)
+    except Exception as e:
+        logger.error(f"Geolocalization of the lead {form_entry['id']} failed: {str(e)}")
+        sent['geolocal'] = None
+
+    return sent
+
+
+def register_leads(entries):
+    """
+    Send many FormEntry to active campaign, the leads are prepared with the tags
+    and automations of its academy loaded once, then sent at the same time by
+    academy over the shared connection pool and with its rate limit. The outcome of
+    each entry is saved in storage_status and storage_status_text, the entries
+    that failed because active campaign was unavailable stay pending with a backoff.
+    """
+    entries = list(entries)
+    locations = {x.location for x in entries if x.location}
+    ac_academies = {x.academy.slug: x for x in
+        ActiveCampaignAcademy.objects.filter(academy__slug__in=locations).select_related('academy')}
+
+    contexts = {}
+    leads = []
+    outcomes = {}
+    transient = set()
+
+    for entry in entries:
+        form_entry = entry.toFormData()
+        ac_academy = ac_academies.get(entry.location)
+
+        try:
+            if entry.location and not ac_academy:
+                raise Exception(f"No academy found with slug {entry.location}")
+
+            context = None
+            if ac_academy:
+                if ac_academy.id not in contexts:
+                    contexts[ac_academy.id] = get_lead_context(ac_academy)
+
+                context = contexts[ac_academy.id]
+
+            lead = prepare_lead(form_entry, ac_academy, context, entry)
+            leads.append((lead, form_entry))
+
+        except Exception as e:
+            outcomes[entry.id] = str(e)
+
+    if SAVE_LEADS == 'FALSE':
+        logger.debug("Ignoring leads because SAVE_LEADS is FALSE on the env variables")
+        leads = []
+
+    by_academy = {}
+    for lead, form_entry in leads:
+        by_academy.setdefault(lead['ac_academy'].id, []).append((lead, form_entry))
+
+    sent = {}
+    for academy_leads in by_academy.values():
+        ac_academy = academy_leads[0][0]['ac_academy']
+
+        limiter = RateLimiter(AC_REQUESTS_PER_SECOND)
+
+        # the connections come from the pool shared by all the integrations
+        old_client = AC_Old_Client(ac_academy.ac_url, ac_academy.ac_key, limiter=limiter)
+        client = AC_Client(ac_academy.ac_url, ac_academy.ac_key, limiter=limiter)
+
+        with ThreadPoolExecutor(max_workers=AC_MAX_WORKERS) as executor:
+            futures = {executor.submit(__send_lead_and_get_geolocal__, lead, form_entry, old_client,
+                client): lead for lead, form_entry in academy_leads}
+
+            for future in as_completed(futures):
+                entry = futures[future]['entry']
+                try:
+                    sent[entry.id] = future.result()
+                except Exception as e:
+                    outcomes[entry.id] = str(e)
+                    if isinstance(e, AC_TRANSIENT_ERRORS):
+                        transient.add(entry.id)
+
+    automation_rows = []
+    tag_rows = []
+    for lead, _ in leads:
+        entry = lead['entry']
+        if entry.id not in sent:
+            continue
+
+        for automation in get_lead_automation_objects(lead['ac_academy'], sent[entry.id]['automations'],
+                contexts.get(lead['ac_academy'].id)):
+            automation_rows.append(FormEntry.automation_objects.through(formentry_id=entry.id,
+                automation_id=automation.id))
+
+        for tag in sent[entry.id]['tags']:
+            tag_rows.append(FormEntry.tag_objects.through(formentry_id=entry.id, tag_id=tag.id))
+
+        apply_geolocal(entry, sent[entry.id]['geolocal'])
+
+    FormEntry.automation_objects.through.objects.bulk_create(automation_rows, ignore_conflicts=True)
+    FormEntry.tag_objects.through.objects.bulk_create(tag_rows, ignore_conflicts=True)
+
+    now = timezone.now()
+    for entry in entries:
+        if entry.id in sent:
+            entry.storage_status = 'PERSISTED'
+            entry.storage_status_text = ''
+            entry.storage_retry_at = None
+            outcomes[entry.id] = None
+
+        elif entry.id in transient and entry.storage_attempts + 1 < AC_MAX_ATTEMPTS:
+            entry.storage_status = 'PENDING'
+            entry.storage_status_text = outcomes[entry.id][:250]
+            entry.storage_retry_at = now + timedelta(seconds=AC_RETRY_SECONDS * 2 ** entry.storage_attempts)
+            entry.storage_attempts += 1
+
+        elif entry.id in outcomes:
+            entry.storage_status = 'ERROR'
+            entry.storage_status_text = outcomes[entry.id][:250]
+            entry.storage_retry_at = None
+            if entry.id in transient:
+                entry.storage_attempts += 1
+
+        entry.updated_at = now
+
+    FormEntry.objects.bulk_update(entries, ['storage_status', 'storage_status_text', 'storage_attempts',
+        'storage_retry_at', 'country', 'city', 'street_address', 'zip_code', 'updated_at'])
+
+    return outcomes
+
+
 def test_ac_connection(ac_academy):
-    client = Client(ac_academy.ac_url, ac_academy.ac_key)
+    client = AC_Client(ac_academy.ac_url, ac_academy.ac_key)
     response = client.tags.list_all_tags(limit=1)
     return response
 
 def sync_tags(ac_academy):
 
-    client = Client(ac_academy.ac_url, ac_academy.ac_key)
+    client = AC_Client(ac_academy.ac_url, ac_academy.ac_key)
     response = client.tags.list_all_tags(limit=100)
 
     if 'tags' not in response:
@@ -294,7 +529,7 @@ def sync_tags(ac_academy):
 
 def sync_automations(ac_academy):
 
-    client = Client(ac_academy.ac_url, ac_academy.ac_key)
+    client = AC_Client(ac_academy.ac_url, ac_academy.ac_key)
     response = client.automations.list_all_automations(limit=100)
 
     if 'automations' not in response:
@@ -324,17 +559,13 @@ def sync_automations(ac_academy):
     return response
 
 
-def save_get_geolocal(contact, form_entry=None):
-
-    if 'latitude' not in form_entry or 'longitude' not in form_entry:
-        form_entry = contact.toFormData()
-        if 'latitude' not in form_entry or 'longitude' not in form_entry:
-            return False
-        if form_entry['latitude'] == '' or form_entry['longitude'] == '' or form_entry['latitude'] is None or form_entry['longitude'] is None:
-            return False
+def get_geolocal(form_entry):
+    if ('latitude' not in form_entry or 'longitude' not in form_entry or form_entry['latitude'] == '' or
+            form_entry['longitude'] == '' or form_entry['latitude'] is None or form_entry['longitude'] is None):
+        return None
 
     result = {}
-    resp = requests.get(f"https://maps.googleapis.com/maps/api/geocode/json?latlng={form_entry['latitude']},{form_entry['longitude']}&key={GOOGLE_CLOUD_KEY}")
+    resp = http.get(f"https://maps.googleapis.com/maps/api/geocode/json?latlng={form_entry['latitude']},{form_entry['longitude']}&key={GOOGLE_CLOUD_KEY}")
     data = resp.json()
     if 'status' in data and data['status'] == 'INVALID_REQUEST':
         raise Exception(data['error_message'])
@@ -351,6 +582,12 @@ def save_get_geolocal(contact, form_entry=None):
                 if 'postal_code' in component['types'] and 'postal_code' not in result:
                     result['postal_code'] = component['long_name']
 
+    return result
+
+
+def apply_geolocal(contact, result):
+    if not result:
+        return
 
     if 'country' in result:
         contact.country = result['country']
@@ -364,6 +601,17 @@ def save_get_geolocal(contact, form_entry=None):
     if 'postal_code' in result:
         contact.zip_code = result['postal_code']
 
+
+def save_get_geolocal(contact, form_entry=None):
+
+    if 'latitude' not in form_entry or 'longitude' not in form_entry:
+        form_entry = contact.toFormData()
+        if 'latitude' not in form_entry or 'longitude' not in form_entry:
+            return False
+        if form_entry['latitude'] == '' or form_entry['longitude'] == '' or form_entry['latitude'] is None or form_entry['longitude'] is None:
+            return False
+
+    apply_geolocal(contact, get_geolocal(form_entry))
     contact.save()
 
     return True
@@ -383,7 +631,7 @@ def get_facebook_lead_info(lead_id, academy_id=None):
     params = {
         "access_token": credential.token
     }
-    resp = requests.get(f'https://graph.facebook.com/v8.0/{lead_id}/', params=params)
+    resp = http.get(f'https://graph.facebook.com/v8.0/{lead_id}/', params=params)
     if resp.status_code == 200:
         logger.debug("Facebook responded with 200")
         data = resp.json()
@@ -404,4 +652,51 @@ def get_facebook_lead_info(lead_id, academy_id=None):
         else:
             logger.fatal("No information about the lead")
     else:
-        logger.fatal("Imposible to connect to facebook API and retrieve lead information")
\ No newline at end of file
+        logger.fatal("Imposible to connect to facebook API and retrieve lead information")
+
+LEAD_ROLLUP_FIELDS = ['academy_id', 'location', 'course', 'utm_medium', 'utm_campaign', 'utm_source']
+
+
+def get_lead_rollup_key(entry):
+    if entry.created_at is None:
+        return None
+
+    return (timezone.localdate(entry.created_at), *[getattr(entry, x) for x in LEAD_ROLLUP_FIELDS])
+
+
+def add_to_lead_rollup(key, amount=1):
+    date, *values = key
+    lookups = {'date': date, **dict(zip(LEAD_ROLLUP_FIELDS, values))}
+
+    rollup_id = LeadReportRollup.objects.filter(**lookups).values_list('id', flat=True).first()
+    if rollup_id is None:
+        LeadReportRollup.objects.create(**lookups, total_leads=amount)
+    else:
+        LeadReportRollup.objects.filter(id=rollup_id).update(total_leads=F('total_leads') + amount)
+
+
+def rollup_leads(start=None, end=None):
+    """
+    Rebuild the lead report rollups from the FormEntry table, the dates are
+    inclusive and when they are not provided all the leads are rolled up
+    """
+    entries = FormEntry.objects.all()
+    rollups = LeadReportRollup.objects.all()
+
+    if start is not None:
+        entries = entries.filter(created_at__date__gte=start)
+        rollups = rollups.filter(date__gte=start)
+
+    if end is not None:
+        entries = entries.filter(created_at__date__lte=end)
+        rollups = rollups.filter(date__lte=end)
+
+    rows = entries.values('created_at__date', *LEAD_ROLLUP_FIELDS).annotate(total_leads=Count('id')).order_by()
+
+    with transaction.atomic():
+        rollups.delete()
+        LeadReportRollup.objects.bulk_create([LeadReportRollup(date=x['created_at__date'],
+            total_leads=x['total_leads'], **{y: x[y] for y in LEAD_ROLLUP_FIELDS}) for x in rows],
+            batch_size=1000)
+
+    return sum(x['total_leads'] for x in rows)
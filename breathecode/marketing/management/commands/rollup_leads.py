@@ -0,0 +1,18 @@
+import datetime
+from django.core.management.base import BaseCommand
+from ...actions import rollup_leads
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the lead report rollups from the form entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, default=None, help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=str, default=None, help='Last day to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        start = options['start'] and datetime.datetime.strptime(options['start'], "%Y-%m-%d").date()
+        end = options['end'] and datetime.datetime.strptime(options['end'], "%Y-%m-%d").date()
+
+        total = rollup_leads(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Successfully rolled up {total} leads"))
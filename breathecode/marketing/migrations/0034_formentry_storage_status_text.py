@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0033_auto_20210302_0102'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formentry',
+            name='storage_status_text',
+            field=models.CharField(blank=True, default='', help_text='The outcome of the last attempt to save it into active campaign', max_length=250),
+        ),
+        migrations.AlterField(
+            model_name='formentry',
+            name='storage_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PERSISTED', 'Persisted'), ('ERROR', 'Error')], default='PENDING', max_length=15),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admissions', '0018_alter_cohortuser_role'),
+        ('marketing', '0034_formentry_storage_status_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadReportRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(blank=True, default=None, max_length=20, null=True)),
+                ('course', models.CharField(default=None, max_length=30, null=True)),
+                ('date', models.DateField()),
+                ('utm_medium', models.CharField(blank=True, default=None, max_length=50, null=True)),
+                ('utm_campaign', models.CharField(blank=True, default=None, max_length=50, null=True)),
+                ('utm_source', models.CharField(blank=True, default=None, max_length=50, null=True)),
+                ('total_leads', models.IntegerField(default=0)),
+                ('academy', models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.CASCADE, to='admissions.academy')),
+            ],
+            options={
+                'index_together': {('date', 'location')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0035_leadreportrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formentry',
+            name='storage_attempts',
+            field=models.IntegerField(default=0, help_text='Attempts that failed because active campaign was unavailable'),
+        ),
+        migrations.AddField(
+            model_name='formentry',
+            name='storage_retry_at',
+            field=models.DateTimeField(blank=True, default=None, help_text='It will not be sent to active campaign before this time', null=True),
+        ),
+    ]
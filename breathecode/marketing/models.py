@@ -100,9 +100,11 @@ class Contact(models.Model):
 
 PENDING = 'PENDING'
 PERSISTED = 'PERSISTED'
+ERROR = 'ERROR'
 STORAGE_SATUS = (
     (PENDING, 'Pending'),
     (PERSISTED, 'Persisted'),
+    (ERROR, 'Error'),
 )
 
 LEAD_TYPE = (
@@ -171,6 +173,9 @@ class FormEntry(models.Model):
 
     # is it saved into active campaign?
     storage_status = models.CharField(max_length=15, choices=STORAGE_SATUS, default=PENDING)
+    storage_status_text = models.CharField(max_length=250, default='', blank=True, help_text='The outcome of the last attempt to save it into active campaign')
+    storage_attempts = models.IntegerField(default=0, help_text='Attempts that failed because active campaign was unavailable')
+    storage_retry_at = models.DateTimeField(null=True, default=None, blank=True, help_text='It will not be sent to active campaign before this time')
     lead_type = models.CharField(max_length=15, choices=LEAD_TYPE, null=True, default=None)
 
     deal_status = models.CharField(max_length=15, choices=DEAL_STATUS, default=None, null=True, blank=True)
@@ -207,6 +212,28 @@ class FormEntry(models.Model):
         }
         return _entry
 
+class LeadReportRollup(models.Model):
+    """
+    Amount of leads per day and per combination of the report dimensions, it
+    is updated when a FormEntry is saved or deleted, the same key can be
+    repeated so the totals always must be summed
+    """
+    academy = models.ForeignKey(Academy, on_delete=models.CASCADE, null=True, default=None)
+    location = models.CharField(max_length=20, blank=True, null=True, default=None)
+    course = models.CharField(max_length=30, null=True, default=None)
+    date = models.DateField()
+    utm_medium = models.CharField(max_length=50, blank=True, null=True, default=None)
+    utm_campaign = models.CharField(max_length=50, blank=True, null=True, default=None)
+    utm_source = models.CharField(max_length=50, blank=True, null=True, default=None)
+
+    total_leads = models.IntegerField(default=0)
+
+    class Meta:
+        index_together = [['date', 'location']]
+
+    def __str__(self):
+        return f"{self.date} {self.location} {self.course}: {self.total_leads}"
+
 _ACTIVE = 'ACTIVE'
 NOT_FOUND = 'NOT_FOUND'
 DESTINATION_STATUS = (
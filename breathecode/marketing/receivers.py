@@ -0,0 +1,42 @@
+import logging
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .actions import LEAD_ROLLUP_FIELDS, get_lead_rollup_key, add_to_lead_rollup
+from .models import FormEntry
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_init, sender=FormEntry)
+def remember_lead_rollup_key(sender, instance, **kwargs):
+    # reading a deferred field would cost one query per instance
+    deferred = instance.get_deferred_fields()
+    if 'created_at' in deferred or any(x in deferred for x in LEAD_ROLLUP_FIELDS):
+        instance._lead_rollup_key = None
+        return
+
+    instance._lead_rollup_key = get_lead_rollup_key(instance)
+
+
+@receiver(post_save, sender=FormEntry)
+def update_lead_rollup(sender, instance, created, **kwargs):
+    key = get_lead_rollup_key(instance)
+    old_key = getattr(instance, '_lead_rollup_key', None)
+
+    if created:
+        add_to_lead_rollup(key)
+
+    # the key is unknown for deferred instances, the rollup_leads command fixes it
+    elif old_key is not None and old_key != key:
+        logger.debug(f"FormEntry {instance.id} moved to other lead rollup")
+        add_to_lead_rollup(old_key, -1)
+        add_to_lead_rollup(key)
+
+    instance._lead_rollup_key = key
+
+
+@receiver(post_delete, sender=FormEntry)
+def remove_from_lead_rollup(sender, instance, **kwargs):
+    key = get_lead_rollup_key(instance)
+    if key is not None:
+        add_to_lead_rollup(key, -1)
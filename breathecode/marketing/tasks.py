@@ -1,10 +1,13 @@
 import logging
 from celery import shared_task, Task
-from django.db.models import F
+from django.db.models import F, Q
+from django.utils import timezone
 from .models import FormEntry, ShortLink
-from .actions import register_new_lead, save_get_geolocal
+from .actions import register_new_lead, register_leads, save_get_geolocal
+from breathecode.utils import HitCounter
 
 logger = logging.getLogger(__name__)
+link_hits = HitCounter(ShortLink)
 
 class BaseTaskWithRetry(Task):
     autoretry_for = (Exception,)
@@ -15,13 +18,11 @@ class BaseTaskWithRetry(Task):
 @shared_task
 def persist_leads():
     logger.debug("Starting persist_leads")
-    entries = FormEntry.objects.filter(storage_status='PENDING')
-    for entry in entries:
-        form_data = entry.toFormData()
-        result = register_new_lead(form_data)
-        if result is not None and result != False:
-            save_get_geolocal(entry, form_data)
-    
+    # the entries that failed because active campaign was unavailable wait for its backoff
+    entries = FormEntry.objects.filter(Q(storage_retry_at__isnull=True) | Q(storage_retry_at__lte=timezone.now()),
+        storage_status='PENDING')
+    register_leads(entries)
+
     return True
 
 @shared_task(bind=True, base=BaseTaskWithRetry)
@@ -36,4 +37,9 @@ def persist_single_lead(self, form_data):
 @shared_task(bind=True, base=BaseTaskWithRetry)
 def update_link_viewcount(self, slug):
     logger.debug("Starting update_link_viewcount")
-    ShortLink.objects.filter(slug=slug).update(hits=F('hits') + 1)
\ No newline at end of file
+    ShortLink.objects.filter(slug=slug).update(hits=F('hits') + 1)
+
+@shared_task
+def flush_link_hits():
+    logger.debug("Starting flush_link_hits")
+    return link_hits.flush()
@@ -0,0 +1,37 @@
+"""
+Test rollup_leads
+"""
+from breathecode.marketing.actions import rollup_leads
+from breathecode.marketing.models import LeadReportRollup
+from ..mixins import MarketingTestCase
+
+class RollupLeadsTestSuite(MarketingTestCase):
+    """Test rollup_leads"""
+
+    def test_rollup_leads_without_data(self):
+        """Test rollup_leads without form entries"""
+        self.assertEqual(rollup_leads(), 0)
+        self.assertEqual(self.all_lead_report_rollup_dict(), [])
+
+    def test_rollup_leads(self):
+        """Test rollup_leads rebuild the rollups that were lost"""
+        form_entry_kwargs = {'location': 'downtown-miami', 'course': 'full-stack'}
+        model = self.generate_models(academy=True, form_entry=True,
+            form_entry_kwargs=form_entry_kwargs)
+        self.generate_models(form_entry=True, models={'academy': model.academy},
+            form_entry_kwargs=form_entry_kwargs)
+
+        LeadReportRollup.objects.update(total_leads=99)
+
+        self.assertEqual(rollup_leads(), 2)
+        self.assertEqual(self.all_lead_report_rollup_dict(), [{
+            'id': 2,
+            'academy_id': 1,
+            'location': 'downtown-miami',
+            'course': 'full-stack',
+            'date': model.form_entry.created_at.date(),
+            'utm_medium': model.form_entry.utm_medium,
+            'utm_campaign': model.form_entry.utm_campaign,
+            'utm_source': model.form_entry.utm_source,
+            'total_leads': 2,
+        }])
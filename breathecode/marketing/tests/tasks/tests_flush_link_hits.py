@@ -0,0 +1,107 @@
+"""
+Test flush_link_hits
+"""
+from unittest.mock import patch
+from redis.exceptions import ResponseError
+from rest_framework import status
+from breathecode.marketing.tasks import flush_link_hits, link_hits
+from ..mixins import MarketingTestCase
+
+
+class RedisMock:
+    """The hash commands used by HitCounter"""
+    def __init__(self):
+        self.hashes = {}
+
+    def hincrby(self, key, field, amount):
+        hash = self.hashes.setdefault(key, {})
+        hash[field.encode('utf-8')] = hash.get(field.encode('utf-8'), 0) + amount
+
+    def renamenx(self, key, new_key):
+        if key not in self.hashes:
+            raise ResponseError('no such key')
+
+        if new_key in self.hashes:
+            return False
+
+        self.hashes[new_key] = self.hashes.pop(key)
+        return True
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            def hgetall(self, key):
+                self.commands.append(lambda: dict(redis.hashes.get(key, {})))
+
+            def delete(self, key):
+                self.commands.append(lambda: int(redis.hashes.pop(key, None) is not None))
+
+            def execute(self):
+                return [x() for x in self.commands]
+
+        return Pipeline()
+
+class FlushLinkHitsTestSuite(MarketingTestCase):
+    """Test flush_link_hits"""
+
+    def test_flush_link_hits__without_hits(self):
+        """Test flush_link_hits without hits"""
+        model = self.generate_models(short_link=True)
+
+        self.assertEqual(flush_link_hits(), 0)
+        self.assertEqual(self.all_short_link_dict(), [self.model_to_dict(model, 'short_link')])
+
+    def test_flush_link_hits__with_three_clicks(self):
+        """Test flush_link_hits after three clicks in two links"""
+        model1 = self.generate_models(short_link=True)
+        model2 = self.generate_models(short_link=True)
+
+        for slug in [model1.short_link.slug, model1.short_link.slug, model2.short_link.slug]:
+            response = self.client.get(f'/s/{slug}')
+            self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+        # the clicks don't touch the database
+        self.assertEqual(self.all_short_link_dict(), [
+            self.model_to_dict(model1, 'short_link'),
+            self.model_to_dict(model2, 'short_link'),
+        ])
+
+        # one update per distinct amount of hits inside a savepoint
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_link_hits(), 3)
+
+        self.assertEqual(self.all_short_link_dict(), [{
+            **self.model_to_dict(model1, 'short_link'),
+            'hits': model1.short_link.hits + 2,
+        }, {
+            **self.model_to_dict(model2, 'short_link'),
+            'hits': model2.short_link.hits + 1,
+        }])
+        self.assertEqual(flush_link_hits(), 0)
+
+    def test_flush_link_hits__while_other_flush_is_in_progress(self):
+        """Test a flush never overwrites the hash that other flush is taking"""
+        model = self.generate_models(short_link=True)
+        redis = RedisMock()
+        key = link_hits.__key__()
+
+        with patch('breathecode.utils.hit_counter.__get_redis__', lambda: redis):
+            # the other flush renamed the hash and is about to read it
+            link_hits.hit(model.short_link.id, 2)
+            redis.renamenx(key, f'{key}__flushing')
+            link_hits.hit(model.short_link.id, 3)
+
+            self.assertEqual(flush_link_hits(), 2)
+            self.assertEqual(redis.hashes, {key: {str(model.short_link.id).encode('utf-8'): 3}})
+
+            self.assertEqual(flush_link_hits(), 3)
+            self.assertEqual(redis.hashes, {})
+
+        self.assertEqual(self.all_short_link_dict(), [{
+            **self.model_to_dict(model, 'short_link'),
+            'hits': model.short_link.hits + 5,
+        }])
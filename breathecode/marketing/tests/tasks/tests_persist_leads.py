@@ -0,0 +1,151 @@
+"""
+Test persist_leads
+"""
+from unittest.mock import patch, MagicMock
+from breathecode.marketing.tasks import persist_leads
+from breathecode.tests.mocks import (
+    GOOGLE_CLOUD_PATH,
+    apply_google_cloud_client_mock,
+    apply_google_cloud_bucket_mock,
+    apply_google_cloud_blob_mock,
+)
+from ..mixins import MarketingTestCase
+
+
+def active_campaign_response():
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {'Content-Type': 'application/json'}
+    response.json.return_value = {'result_code': 1, 'subscriber_id': 1, 'contacts': []}
+    return response
+
+
+class PersistLeadsTestSuite(MarketingTestCase):
+    """Test persist_leads"""
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch('requests.Session.request', MagicMock(return_value=active_campaign_response()))
+    def test_persist_leads_in_batch(self):
+        """Test persist_leads with many entries of the same academy"""
+        import requests
+        mock = requests.Session.request
+        mock.call_args_list = []
+
+        base = self.generate_models(academy=True, active_campaign_academy=True,
+            tag=True, tag_kwargs={'tag_type': 'STRONG'}, automation=True,
+            automation_kwargs={'slug': 'they-killed-kenny'})
+
+        form_entry_kwargs = {
+            'location': base['academy'].slug,
+            'tags': base['tag'].slug,
+            'automations': base['automation'].slug,
+            'email': 'pokemon@potato.io',
+            'phone': '+123456789',
+            'latitude': None,
+            'longitude': None,
+            'storage_status': 'PENDING',
+        }
+
+        models = [self.generate_models(form_entry=True, form_entry_kwargs=form_entry_kwargs,
+            models=base) for _ in range(0, 3)]
+
+        bad_model = self.generate_models(form_entry=True, models=base,
+            form_entry_kwargs={**form_entry_kwargs, 'tags': 'they-killed-kenny'})
+
+        self.assertEqual(persist_leads(), True)
+
+        self.assertEqual([(x['id'], x['storage_status'], x['storage_status_text'])
+            for x in self.all_form_entry_dict()], [
+            *[(model['form_entry'].id, 'PERSISTED', '') for model in models],
+            (bad_model['form_entry'].id, 'ERROR',
+                'Tag applied to the contact not found or has not tag_type assigned'),
+        ])
+
+        # one contact, one automation and one tag by lead
+        self.assertEqual(len(mock.call_args_list), 9)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch('requests.Session.request', MagicMock(return_value=active_campaign_response()))
+    def test_persist_leads_when_active_campaign_is_unavailable(self):
+        """Test persist_leads keeps the entries pending with a backoff after a 503"""
+        import requests
+        mock = requests.Session.request
+        mock.call_args_list = []
+        mock.return_value.status_code = 503
+
+        base = self.generate_models(academy=True, active_campaign_academy=True,
+            tag=True, tag_kwargs={'tag_type': 'STRONG'}, automation=True,
+            automation_kwargs={'slug': 'they-killed-kenny'})
+
+        form_entry_kwargs = {
+            'location': base['academy'].slug,
+            'tags': base['tag'].slug,
+            'automations': base['automation'].slug,
+            'email': 'pokemon@potato.io',
+            'phone': '+123456789',
+            'latitude': None,
+            'longitude': None,
+            'storage_status': 'PENDING',
+        }
+
+        model = self.generate_models(form_entry=True, form_entry_kwargs=form_entry_kwargs, models=base)
+        bad_model = self.generate_models(form_entry=True, models=base,
+            form_entry_kwargs={**form_entry_kwargs, 'storage_attempts': 4})
+
+        self.assertEqual(persist_leads(), True)
+
+        self.assertEqual([(x['id'], x['storage_status'], x['storage_status_text'], x['storage_attempts'],
+            x['storage_retry_at'] is not None) for x in self.all_form_entry_dict()], [
+            (model['form_entry'].id, 'PENDING', 'Active Campaign responded with 503', 1, True),
+            (bad_model['form_entry'].id, 'ERROR', 'Active Campaign responded with 503', 5, False),
+        ])
+        self.assertEqual(len(mock.call_args_list), 2)
+
+        # the backoff has not elapsed yet
+        mock.call_args_list = []
+        self.assertEqual(persist_leads(), True)
+        self.assertEqual(mock.call_args_list, [])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch('requests.Session.request', MagicMock())
+    def test_persist_leads_when_active_campaign_is_unavailable_after_save_the_contact(self):
+        """Test persist_leads don't retry the entries that already have a contact in active campaign"""
+        import requests
+        unavailable = active_campaign_response()
+        unavailable.status_code = 503
+
+        mock = requests.Session.request
+        mock.call_args_list = []
+        mock.side_effect = [active_campaign_response(), unavailable]
+
+        base = self.generate_models(academy=True, active_campaign_academy=True,
+            tag=True, tag_kwargs={'tag_type': 'STRONG'}, automation=True,
+            automation_kwargs={'slug': 'they-killed-kenny'})
+
+        form_entry_kwargs = {
+            'location': base['academy'].slug,
+            'tags': base['tag'].slug,
+            'automations': base['automation'].slug,
+            'email': 'pokemon@potato.io',
+            'phone': '+123456789',
+            'latitude': None,
+            'longitude': None,
+            'storage_status': 'PENDING',
+        }
+
+        model = self.generate_models(form_entry=True, form_entry_kwargs=form_entry_kwargs, models=base)
+
+        self.assertEqual(persist_leads(), True)
+
+        self.assertEqual([(x['id'], x['storage_status'], x['storage_status_text'], x['storage_attempts'],
+            x['storage_retry_at']) for x in self.all_form_entry_dict()], [
+            (model['form_entry'].id, 'ERROR', 'Contact 1 was saved in CRM but the lead was not completed: '
+                'Active Campaign responded with 503', 0, None),
+        ])
+        self.assertEqual(len(mock.call_args_list), 2)
@@ -1,11 +1,16 @@
 """
 Test /academy/lead
 """
-import re, string
+import re, string, base64
+from json import loads, dumps
 from random import choice, choices, randint
 from mixer.main import Mixer
 from unittest.mock import patch
 from django.urls.base import reverse_lazy
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from breathecode.utils import ValidationException, HeaderLimitOffsetPagination
+from breathecode.marketing.models import FormEntry
 from rest_framework import status
 from breathecode.tests.mocks import (
     GOOGLE_CLOUD_PATH,
@@ -156,6 +161,73 @@ class CohortUserTestSuite(MarketingTestCase):
             **self.model_to_dict(model, 'form_entry')
         }])
 
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_format_csv(self):
+        """Test /academy/lead?format=csv"""
+        self.headers(academy=1)
+        url = reverse_lazy('marketing:academy_lead') + '?format=csv'
+        model = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato', form_entry=True)
+
+        response = self.client.get(url)
+        lines = b''.join(response.streaming_content).decode('utf-8').split('\r\n')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=leads.csv')
+        self.assertEqual(lines[0], 'id,first_name,last_name,email,course,location,language,'
+            'utm_url,utm_medium,utm_campaign,utm_source,tags,storage_status,country,lead_type,'
+            'created_at')
+        self.assertTrue(lines[1].startswith('1,,,,,,en,,,,,,PENDING,,,'))
+        self.assertEqual(lines[2:], [''])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.all_form_entry_dict(), [{
+            **self.model_to_dict(model, 'form_entry')
+        }])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_format_ndjson(self):
+        """Test /academy/lead?format=ndjson"""
+        self.headers(academy=1)
+        url = reverse_lazy('marketing:academy_lead') + '?format=ndjson'
+        model = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato', form_entry=True)
+
+        response = self.client.get(url)
+        lines = b''.join(response.streaming_content).decode('utf-8').split('\n')
+        json = [loads(x) for x in lines if x]
+
+        self.assertDatetime(json[0]['created_at'])
+        del json[0]['created_at']
+
+        expected = [{
+            'country': None,
+            'course': None,
+            'email': None,
+            'first_name': '',
+            'id': 1,
+            'language': 'en',
+            'last_name': '',
+            'lead_type': None,
+            'location': None,
+            'storage_status': 'PENDING',
+            'tags': '',
+            'utm_campaign': None,
+            'utm_medium': None,
+            'utm_source': None,
+            'utm_url': None,
+        }]
+
+        self.assertEqual(json, expected)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.all_form_entry_dict(), [{
+            **self.model_to_dict(model, 'form_entry')
+        }])
+
     # TODO: we need test get method with the querystring
 
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
@@ -423,3 +495,117 @@ class CohortUserTestSuite(MarketingTestCase):
         self.assertEqual(self.all_form_entry_dict(), [{
             **self.model_to_dict(model, 'form_entry')
         } for model in models])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_ten_datas_with_cursor_pagination(self):
+        """Test /academy/lead?cursor= walking forward and backward"""
+        self.headers(academy=1)
+        base = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato')
+
+        models = [self.generate_models(form_entry=True, models=base) for _ in range(0, 10)]
+        ids = [model['form_entry'].id for model in sorted(models,
+            key=lambda x: (x['form_entry'].created_at, x['form_entry'].id), reverse=True)]
+
+        url = reverse_lazy('marketing:academy_lead') + '?limit=4&cursor='
+        response = self.client.get(url)
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['x-total-count'], '10')
+        self.assertEqual(json['count'], 10)
+        self.assertEqual(json['first'], None)
+        self.assertEqual(json['previous'], None)
+        self.assertEqual(json['last'], None)
+        self.assertEqual([x['id'] for x in json['results']], ids[:4])
+
+        response = self.client.get(json['next'])
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json['first'], 'http://testserver/v1/marketing/academy/lead?cursor=&limit=4')
+        self.assertEqual([x['id'] for x in json['results']], ids[4:8])
+
+        response = self.client.get(json['next'])
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json['next'], None)
+        self.assertEqual([x['id'] for x in json['results']], ids[8:])
+
+        response = self.client.get(json['previous'])
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([x['id'] for x in json['results']], ids[4:8])
+
+        response = self.client.get(json['previous'])
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json['previous'], None)
+        self.assertEqual([x['id'] for x in json['results']], ids[:4])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_cursor_pagination_without_count(self):
+        """Test /academy/lead?cursor=&count=false"""
+        self.headers(academy=1)
+        base = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato')
+
+        [self.generate_models(form_entry=True, models=base) for _ in range(0, 3)]
+
+        url = reverse_lazy('marketing:academy_lead') + '?limit=5&cursor=&count=false'
+        response = self.client.get(url)
+        json = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('x-total-count' in response, False)
+        self.assertEqual(json['count'], None)
+        self.assertEqual(json['next'], None)
+        self.assertEqual(len(json['results']), 3)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_bad_cursor(self):
+        """Test /academy/lead?cursor=with-a-bad-cursor"""
+        self.headers(academy=1)
+        self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato')
+
+        url = reverse_lazy('marketing:academy_lead') + '?cursor=they-killed-kenny'
+        response = self.client.get(url)
+        json = response.json()
+
+        self.assertEqual(json, {'detail': 'Invalid cursor', 'status_code': 404})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_academy_lead_with_cursor_of_wrong_shape(self):
+        """Test /academy/lead?cursor= with a valid json that is not a position"""
+        self.headers(academy=1)
+        self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato', form_entry=True)
+
+        for position in [1, [1], ['2021-01-01T00:00:00Z', 1, 2], ['potato', 1], [None, 1], [{}, 1]]:
+            cursor = base64.urlsafe_b64encode(dumps({'p': position, 'r': 0}).encode('utf-8')).decode('utf-8')
+            url = reverse_lazy('marketing:academy_lead') + f'?cursor={cursor}'
+            response = self.client.get(url)
+
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor', 'status_code': 404})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_nullable_ordering(self):
+        """Test the keyset mode is rejected when the ordering field can be null"""
+        request = Request(APIRequestFactory().get('/', {'cursor': ''}))
+        queryset = FormEntry.objects.order_by('lead_type')
+
+        with self.assertRaisesMessage(ValidationException, 'Cursor pagination is not supported'):
+            HeaderLimitOffsetPagination().paginate_queryset(queryset, request)
@@ -0,0 +1,89 @@
+"""
+Test /report/lead
+"""
+from django.urls.base import reverse_lazy
+from django.utils import timezone
+from rest_framework import status
+from ..mixins import MarketingTestCase
+
+class ReportLeadTestSuite(MarketingTestCase):
+    """Test /report/lead"""
+
+    def test_report_lead_without_auth(self):
+        """Test /report/lead without auth"""
+        url = reverse_lazy('marketing:report_lead')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_report_lead_rollup_updated_on_save(self):
+        """Test the rollup when the form entries are saved and deleted"""
+        form_entry_kwargs = {'location': 'downtown-miami', 'course': 'full-stack'}
+        model1 = self.generate_models(academy=True, form_entry=True,
+            form_entry_kwargs=form_entry_kwargs)
+        model2 = self.generate_models(form_entry=True, models={'academy': model1.academy},
+            form_entry_kwargs=form_entry_kwargs)
+
+        self.assertEqual([(x['location'], x['course'], x['total_leads'])
+            for x in self.all_lead_report_rollup_dict()], [('downtown-miami', 'full-stack', 2)])
+
+        model2.form_entry.course = 'web-development'
+        model2.form_entry.save()
+        model1.form_entry.delete()
+
+        self.assertEqual([(x['location'], x['course'], x['total_leads'])
+            for x in self.all_lead_report_rollup_dict()], [
+                ('downtown-miami', 'full-stack', 0),
+                ('downtown-miami', 'web-development', 1),
+            ])
+
+    def test_report_lead(self):
+        """Test /report/lead grouped by location and course"""
+        self.headers(academy=1)
+        form_entry_kwargs = {'location': 'downtown-miami', 'course': 'full-stack'}
+        model = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato', form_entry=True,
+            form_entry_kwargs=form_entry_kwargs)
+
+        for course in ['full-stack', 'web-development']:
+            self.generate_models(form_entry=True, models={'academy': model.academy},
+                form_entry_kwargs={**form_entry_kwargs, 'course': course})
+
+        url = reverse_lazy('marketing:report_lead') + '?by=location,course'
+        response = self.client.get(url)
+        json = sorted(response.json(), key=lambda x: x['course'])
+
+        expected = [{
+            'course': 'full-stack',
+            'location': 'downtown-miami',
+            'total_leads': 2,
+        }, {
+            'course': 'web-development',
+            'location': 'downtown-miami',
+            'total_leads': 1,
+        }]
+
+        self.assertEqual(json, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_report_lead_by_date(self):
+        """Test /report/lead grouped by date"""
+        self.headers(academy=1)
+        form_entry_kwargs = {'location': 'downtown-miami'}
+        model = self.generate_models(authenticate=True, profile_academy=True,
+            capability='read_lead', role='potato', form_entry=True,
+            form_entry_kwargs=form_entry_kwargs)
+
+        url = reverse_lazy('marketing:report_lead') + '?by=created_at__date'
+        response = self.client.get(url)
+        json = response.json()
+
+        today = timezone.localdate(model.form_entry.created_at)
+        expected = [{
+            'created_at__date': today.isoformat(),
+            'created_date': today.strftime('%Y%m%d'),
+            'total_leads': 1,
+        }]
+
+        self.assertEqual(json, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
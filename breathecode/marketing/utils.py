@@ -1,9 +1,19 @@
-import requests
+import threading, time
+from breathecode.services import http
 from requests.auth import HTTPBasicAuth
+from activecampaign.client import Client
 
 # class ActiveCampaignError(Exception):
 #     pass
 
+class ActiveCampaignTransientError(Exception):
+    """Active Campaign is rate limiting or unavailable, the request can be sent again later"""
+    pass
+
+
+def is_transient_status(status_code):
+    return status_code == 429 or (isinstance(status_code, int) and status_code >= 500)
+
 class Contacts(object):
     def __init__(self, client):
         self.client = client
@@ -115,15 +125,62 @@ class Contacts(object):
         return self.client._get("contact_delete", aditional_data=[('id', id)])
 
 
+class RateLimiter(object):
+    """Allow at most `rate` calls per second between all the threads that share it."""
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class AC_Client(Client):
+    """Active Campaign v3 client that can share a pooled session and a rate limiter."""
+
+    def __init__(self, url, api_key, session=None, limiter=None):
+        super().__init__(url, api_key)
+        self._session = session or http
+        self._limiter = limiter
+
+    def _request(self, method, endpoint, headers=None, **kwargs):
+        _headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'Api-Token': self.api_key
+        }
+        if headers:
+            _headers.update(headers)
+
+        if self._limiter:
+            self._limiter.wait()
+
+        response = self._session.request(method, self.BASE_URL + endpoint, headers=_headers, **kwargs)
+        if is_transient_status(response.status_code):
+            raise ActiveCampaignTransientError(f"Active Campaign responded with {response.status_code}")
+
+        return self._parse(response)
+
+
 class AC_Old_Client(object):
 
-    def __init__(self, url, apikey):
+    def __init__(self, url, apikey, session=None, limiter=None):
 
         if url is None:
             raise Exception("Invalid URL for active campaign API, have you setup your env variables?")
 
         self._base_url = f"https://{url}" if not url.startswith("http") else url
         self._apikey = apikey
+        self._session = session or http
+        self._limiter = limiter
         self.contacts = Contacts(self)
         # self.account = Account(self)
         # self.lists = Lists(self)
@@ -150,7 +207,13 @@ class AC_Old_Client(object):
         if aditional_data is not None:
             for aditional in aditional_data:
                 params.append(aditional)
-        response = requests.request(method, self._base_url+"/admin/api.php", params=params, data=data)
+        if self._limiter:
+            self._limiter.wait()
+
+        response = self._session.request(method, self._base_url+"/admin/api.php", params=params, data=data)
+        if is_transient_status(response.status_code):
+            raise ActiveCampaignTransientError(f"Active Campaign responded with {response.status_code}")
+
         if response.status_code >= 200 and response.status_code < 400:
             data = response.json()
             return self._parse(data)
@@ -10,17 +10,18 @@ from django.db.models import Q
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import api_view, permission_classes
 from django.db.models import Count, Sum, F, Func, Value, CharField
+from django.db.models.functions import Coalesce
 from breathecode.utils import (
     APIException, localize_query, capable_of, ValidationException,
-    GenerateLookupsMixin, HeaderLimitOffsetPagination
+    GenerateLookupsMixin, HeaderLimitOffsetPagination, export_response, get_export_format
 )
 from .serializers import (
     PostFormEntrySerializer, FormEntrySerializer, FormEntrySmallSerializer, TagSmallSerializer,
     AutomationSmallSerializer
 )
 from .actions import register_new_lead, sync_tags, sync_automations, get_facebook_lead_info
-from .tasks import persist_single_lead, update_link_viewcount
-from .models import ShortLink, ActiveCampaignAcademy, FormEntry, Tag, Automation
+from .tasks import persist_single_lead, link_hits
+from .models import ShortLink, ActiveCampaignAcademy, FormEntry, Tag, Automation, LeadReportRollup
 from breathecode.admissions.models import Academy
 from rest_framework.views import APIView
 
@@ -111,7 +112,7 @@ def redirect_link(request, link_slug):
     if short_link is None:
         return HttpResponseNotFound("URL not found")
 
-    update_link_viewcount.delay(short_link.slug)
+    link_hits.hit(short_link.id)
 
     params = {}
     if short_link.utm_source is not None:
@@ -159,21 +160,25 @@ def get_leads(request, id=None):
     return Response(serializer.data)
 
 
-@api_view(['GET'])
-def get_leads_report(request, id=None):
+# the group by accepted by the report mapped to the rollup fields
+LEAD_REPORT_DIMENSIONS = {
+    'academy': 'academy',
+    'location': 'location',
+    'course': 'course',
+    'created_at__date': 'date',
+    'utm_medium': 'utm_medium',
+    'utm_campaign': 'utm_campaign',
+    'utm_source': 'utm_source',
+}
+
 
+def __get_live_leads_report__(request, group_by):
     items = FormEntry.objects.all()
 
     if isinstance(request.user, AnonymousUser) == False:
         # filter only to the local academy
         items = localize_query(items, request)
 
-    group_by = request.GET.get('by', 'location,created_at__date,course')
-    if group_by != '':
-        group_by = group_by.split(",")
-    else:
-        group_by = ['location', 'created_at__date', 'course']
-
     academy = request.GET.get('academy', None)
     if academy is not None:
         items = items.filter(location__in=academy.split(","))
@@ -200,7 +205,57 @@ def get_leads_report(request, id=None):
             )
         )
     # items = items.order_by('created_at')
-    return Response(items)
+    return items
+
+
+@api_view(['GET'])
+def get_leads_report(request, id=None):
+
+    group_by = request.GET.get('by', 'location,created_at__date,course')
+    if group_by != '':
+        group_by = group_by.split(",")
+    else:
+        group_by = ['location', 'created_at__date', 'course']
+
+    if any(x not in LEAD_REPORT_DIMENSIONS for x in group_by):
+        return Response(__get_live_leads_report__(request, group_by))
+
+    items = LeadReportRollup.objects.exclude(total_leads=0)
+
+    if isinstance(request.user, AnonymousUser) == False:
+        # filter only to the local academy
+        items = localize_query(items, request)
+
+    academy = request.GET.get('academy', None)
+    if academy is not None:
+        items = items.filter(location__in=academy.split(","))
+
+    start = request.GET.get('start', None)
+    if start is not None:
+        start_date = datetime.datetime.strptime(start, "%Y-%m-%d").date()
+        items = items.filter(date__gte=start_date)
+
+    # the leads report always excluded the leads of the end date
+    end = request.GET.get('end', None)
+    if end is not None:
+        end_date = datetime.datetime.strptime(end, "%Y-%m-%d").date()
+        items = items.filter(date__lt=end_date)
+
+    # the leads without location never were counted
+    items = items.values(*[LEAD_REPORT_DIMENSIONS[x] for x in group_by]).annotate(
+        total_leads=Coalesce(Sum('total_leads', filter=Q(location__isnull=False)), 0)).order_by()
+
+    result = []
+    for item in items:
+        row = {x: item[LEAD_REPORT_DIMENSIONS[x]] for x in group_by}
+        row['total_leads'] = item['total_leads']
+
+        if 'created_at__date' in group_by:
+            row['created_date'] = item['date'].strftime('%Y%m%d')
+
+        result.append(row)
+
+    return Response(result)
 
 
 class AcademyTagView(APIView, GenerateLookupsMixin):
@@ -230,6 +285,11 @@ class AcademyAutomationView(APIView, GenerateLookupsMixin):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+LEAD_EXPORT_FIELDS = ['id', 'first_name', 'last_name', 'email', 'course', 'location', 'language',
+    'utm_url', 'utm_medium', 'utm_campaign', 'utm_source', 'tags', 'storage_status', 'country',
+    'lead_type', 'created_at']
+
+
 class AcademyLeadView(APIView, HeaderLimitOffsetPagination, GenerateLookupsMixin):
     """
     List all snippets, or create a new snippet.
@@ -265,6 +325,10 @@ class AcademyLeadView(APIView, HeaderLimitOffsetPagination, GenerateLookupsMixin
 
         items = items.filter(**lookup).order_by('-created_at')
 
+        export_format = get_export_format(request)
+        if export_format:
+            return export_response(items, LEAD_EXPORT_FIELDS, export_format, filename='leads')
+
         page = self.paginate_queryset(items, request)
         serializer = FormEntrySmallSerializer(page, many=True)
 
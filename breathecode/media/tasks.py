@@ -0,0 +1,13 @@
+import logging
+from celery import shared_task
+from breathecode.utils import HitCounter
+from .models import Media
+
+logger = logging.getLogger(__name__)
+media_hits = HitCounter(Media)
+
+
+@shared_task
+def flush_media_hits():
+    logger.debug("Starting flush_media_hits")
+    return media_hits.flush()
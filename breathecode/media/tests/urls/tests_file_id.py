@@ -1,7 +1,9 @@
 """
 Test /answer
 """
-from unittest.mock import patch
+import gzip
+from unittest.mock import patch, call, MagicMock
+from django.test import override_settings
 from django.urls.base import reverse_lazy
 from rest_framework import status
 from breathecode.tests.mocks import (
@@ -9,9 +11,10 @@ from breathecode.tests.mocks import (
     apply_google_cloud_client_mock,
     apply_google_cloud_bucket_mock,
     apply_google_cloud_blob_mock,
-    REQUESTS_PATH,
     apply_requests_get_mock,
 )
+from breathecode.tests.mocks.requests.response_mock import ResponseMock
+from breathecode.media.tasks import flush_media_hits
 from ..mixins import MediaTestCase
 
 class MediaTestSuite(MediaTestCase):
@@ -68,6 +71,9 @@ class MediaTestSuite(MediaTestCase):
 
         self.assertEqual(response.url, model['media'].url)
         self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(self.all_media_dict(), [self.model_to_dict(model, 'media')])
+
+        flush_media_hits()
         self.assertEqual(self.all_media_dict(), [{
             **self.model_to_dict(model, 'media'),
             'hits': model['media'].hits + 1,
@@ -76,7 +82,7 @@ class MediaTestSuite(MediaTestCase):
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
-    @patch(REQUESTS_PATH['get'], apply_requests_get_mock([(200, 'https://potato.io', 'ok')]))
+    @patch('breathecode.media.views.masking_client.get', apply_requests_get_mock([(200, 'https://potato.io', 'ok')]))
     def test_file_id_with_mask_true(self):
         """Test /answer without auth"""
         self.headers(academy=1)
@@ -89,7 +95,110 @@ class MediaTestSuite(MediaTestCase):
 
         self.assertEqual(response.getvalue().decode("utf-8"), 'ok')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.all_media_dict(), [self.model_to_dict(model, 'media')])
+
+        flush_media_hits()
         self.assertEqual(self.all_media_dict(), [{
             **self.model_to_dict(model, 'media'),
             'hits': model['media'].hits + 1,
         }])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_file_id_with_mask_true_forward_range(self):
+        """Test the conditional and range headers are forwarded to the upstream"""
+        mock = apply_requests_get_mock([(206, 'https://potato.io', 'ok')])
+        self.generate_models(media=True, media_kwargs={'url': 'https://potato.io'})
+        url = reverse_lazy('media:file_id', kwargs={'media_id': 1}) + '?mask=true'
+
+        with patch('breathecode.media.views.masking_client.get', mock):
+            response = self.client.get(url, HTTP_RANGE='bytes=0-1', HTTP_IF_NONE_MATCH='"etag"')
+
+        self.assertEqual(response.getvalue().decode("utf-8"), 'ok')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(mock.call_args_list, [call('https://potato.io', stream=True,
+            headers={'Range': 'bytes=0-1', 'If-None-Match': '"etag"'})])
+
+        flush_media_hits()
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_file_id_with_mask_true_gzip(self):
+        """Test the encoded content is forwarded without decode it"""
+        content = gzip.compress(b'ok')
+        upstream = ResponseMock(status_code=206, data=content, url='https://potato.io')
+        upstream.headers = {'Content-Encoding': 'gzip', 'Content-Length': str(len(content)),
+            'Content-Range': f'bytes 0-{len(content) - 1}/100', 'Connection': 'keep-alive'}
+
+        self.generate_models(media=True, media_kwargs={'url': 'https://potato.io'})
+        url = reverse_lazy('media:file_id', kwargs={'media_id': 1}) + '?mask=true'
+
+        with patch('breathecode.media.views.masking_client.get', MagicMock(return_value=upstream)):
+            response = self.client.get(url, HTTP_RANGE=f'bytes=0-{len(content) - 1}')
+
+        self.assertEqual(response.getvalue(), content)
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Length'], str(len(content)))
+        self.assertEqual(response['Content-Range'], f'bytes 0-{len(content) - 1}/100')
+        self.assertEqual(response.has_header('Connection'), False)
+
+        flush_media_hits()
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def test_file_id_with_mask_true_upstream_unavailable(self):
+        """Test the proxy answers the upstream errors without wait for retries"""
+        session = MagicMock()
+        session.request.return_value = ResponseMock(status_code=503, data='unavailable',
+            url='https://potato.io')
+
+        self.generate_models(media=True, media_kwargs={'url': 'https://potato.io'})
+        url = reverse_lazy('media:file_id', kwargs={'media_id': 1}) + '?mask=true'
+
+        with patch('breathecode.media.views.masking_client.session', MagicMock(return_value=session)):
+            response = self.client.get(url)
+
+        self.assertEqual(response.getvalue().decode('utf-8'), 'unavailable')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(session.request.call_count, 1)
+
+        flush_media_hits()
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @override_settings(MEDIA_MASKING_MODE='signed')
+    def test_file_id_with_mask_true_signed(self):
+        """Test the media of the bucket is redirected to a signed url"""
+        media_kwargs = {'url': 'https://storage.googleapis.com/media-breathecode/hash'}
+        self.generate_models(media=True, media_kwargs=media_kwargs)
+        url = reverse_lazy('media:file_id', kwargs={'media_id': 1}) + '?mask=true'
+
+        with patch('breathecode.media.views.masking_client.get') as mock:
+            response = self.client.get(url)
+            self.assertEqual(mock.call_count, 0)
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response.url,
+            'https://storage.googleapis.com/media-breathecode/hash?X-Goog-Signature=signature')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=450')
+
+        flush_media_hits()
+
+    @override_settings(MEDIA_MASKING_MODE='accel')
+    def test_file_id_with_mask_true_accel(self):
+        """Test the media is handed over to nginx"""
+        media_kwargs = {'url': 'https://potato.io/files/file.pdf'}
+        self.generate_models(media=True, media_kwargs=media_kwargs)
+        url = reverse_lazy('media:file_id', kwargs={'media_id': 1}) + '?mask=true'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], '/internal-media/potato.io/files/file.pdf')
+        self.assertEqual(response.content, b'')
+
+        flush_media_hits()
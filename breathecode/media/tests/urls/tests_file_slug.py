@@ -9,9 +9,9 @@ from breathecode.tests.mocks import (
     apply_google_cloud_client_mock,
     apply_google_cloud_bucket_mock,
     apply_google_cloud_blob_mock,
-    REQUESTS_PATH,
     apply_requests_get_mock,
 )
+from breathecode.media.tasks import flush_media_hits
 from ..mixins import MediaTestCase
 
 class MediaTestSuite(MediaTestCase):
@@ -68,6 +68,9 @@ class MediaTestSuite(MediaTestCase):
 
         self.assertEqual(response.url, model['media'].url)
         self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(self.all_media_dict(), [self.model_to_dict(model, 'media')])
+
+        flush_media_hits()
         self.assertEqual(self.all_media_dict(), [{
             **self.model_to_dict(model, 'media'),
             'hits': model['media'].hits + 1,
@@ -76,7 +79,7 @@ class MediaTestSuite(MediaTestCase):
     @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
     @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
     @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
-    @patch(REQUESTS_PATH['get'], apply_requests_get_mock([(200, 'https://potato.io', 'ok')]))
+    @patch('breathecode.media.views.masking_client.get', apply_requests_get_mock([(200, 'https://potato.io', 'ok')]))
     def test_file_slug_with_mask_true(self):
         """Test /answer without auth"""
         self.headers(academy=1)
@@ -89,6 +92,9 @@ class MediaTestSuite(MediaTestCase):
 
         self.assertEqual(response.getvalue().decode("utf-8"), 'ok')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.all_media_dict(), [self.model_to_dict(model, 'media')])
+
+        flush_media_hits()
         self.assertEqual(self.all_media_dict(), [{
             **self.model_to_dict(model, 'media'),
             'hits': model['media'].hits + 1,
@@ -12,6 +12,7 @@ from breathecode.tests.mocks import (
     apply_google_cloud_bucket_mock,
     apply_google_cloud_blob_mock,
 )
+from breathecode.services.google_cloud import Storage
 from ..mixins import MediaTestCase
 
 class FileMock():
@@ -20,7 +21,10 @@ class FileMock():
 
 file_mock = Mock(side_effect=FileMock)
 
-class StorageMock():
+class StorageMock(Storage):
+    def __init__(self):
+        pass
+
     def file(*args, **kwargs):
         return file_mock
 
@@ -28,6 +32,17 @@ storage_mock = Mock(side_effect=StorageMock)
 
 class MediaTestSuite(MediaTestCase):
     """Test /answer"""
+    def capture_uploads(self):
+        """The uploaded files are closed with the request, keep its content"""
+        uploads = []
+
+        def upload(content, public=False, content_type=None):
+            content.seek(0)
+            uploads.append((content.read(), content_type))
+
+        file_mock.upload.side_effect = upload
+        self.addCleanup(setattr, file_mock.upload, 'side_effect', None)
+        return uploads
 
     @patch('breathecode.services.google_cloud.Storage', storage_mock)
     def test_upload_without_auth(self):
@@ -321,6 +336,7 @@ class MediaTestSuite(MediaTestCase):
         storage_mock.call_args_list = []
         file_mock.delete.call_args_list = []
         file_mock.upload.call_args_list = []
+        uploads = self.capture_uploads()
 
         model = self.generate_models(authenticate=True, profile_academy=True,
             capability='crud_media', role='potato', category=True)
@@ -370,7 +386,7 @@ class MediaTestSuite(MediaTestCase):
             }])
 
             self.assertEqual(storage_mock.call_args_list, [call()])
-            self.assertEqual(file_mock.upload.call_args_list, [call(file_bytes)])
+            self.assertEqual(uploads, [(file_bytes, 'image/png')])
             self.assertEqual(file_mock.url.call_args_list, [call()])
 
     @patch('breathecode.services.google_cloud.Storage', storage_mock)
@@ -384,6 +400,7 @@ class MediaTestSuite(MediaTestCase):
         storage_mock.call_args_list = []
         file_mock.delete.call_args_list = []
         file_mock.upload.call_args_list = []
+        uploads = self.capture_uploads()
 
         model = self.generate_models(authenticate=True, profile_academy=True,
             capability='crud_media', role='potato', category=True)
@@ -458,6 +475,39 @@ class MediaTestSuite(MediaTestCase):
             'url': 'https://storage.cloud.google.com/media-breathecode/hardcoded_url'
         }])
 
-        self.assertEqual(storage_mock.call_args_list, [call(), call()])
-        self.assertEqual(file_mock.upload.call_args_list, [call(file_bytes1), call(file_bytes2)])
+        # the files are uploaded concurrently with the same client
+        self.assertEqual(storage_mock.call_args_list, [call()])
+        self.assertEqual(sorted(uploads), sorted([(file_bytes1, 'image/png'), (file_bytes2, 'image/png')]))
         self.assertEqual(file_mock.url.call_args_list, [call(), call()])
+
+    @patch('breathecode.services.google_cloud.Storage', storage_mock)
+    def test_upload_same_file_twice(self):
+        """Test the files with the same content are uploaded once"""
+        self.headers(academy=1)
+
+        storage_mock.call_args_list = []
+        file_mock.upload.call_args_list = []
+        file_mock.url.return_value = 'https://storage.cloud.google.com/media-breathecode/hardcoded_url'
+        uploads = self.capture_uploads()
+
+        self.generate_models(authenticate=True, profile_academy=True, capability='crud_media', role='potato')
+        url = reverse_lazy('media:upload')
+
+        file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+        file.write(os.urandom(1024))
+        file.close()
+
+        with open(file.name, 'rb') as data:
+            file_bytes = data.read()
+            hash = hashlib.sha256(file_bytes).hexdigest()
+
+        with open(file.name, 'rb') as file1, open(file.name, 'rb') as file2:
+            data = {'name': ['filename1.jpg', 'filename2.jpg'], 'file': [file1, file2]}
+            response = self.client.put(url, data, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(uploads, [(file_bytes, 'image/png')])
+        self.assertEqual([(x['slug'], x['hash'], x['url']) for x in self.all_media_dict()], [
+            ('filename1', hash, 'https://storage.cloud.google.com/media-breathecode/hardcoded_url'),
+            ('filename2', hash, 'https://storage.cloud.google.com/media-breathecode/hardcoded_url'),
+        ])
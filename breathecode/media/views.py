@@ -1,6 +1,11 @@
-import hashlib, requests
+import hashlib
+from datetime import timedelta
+from urllib.parse import urlsplit
+from django.conf import settings
 from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
 from breathecode.media.models import Media, Category
+from breathecode.media.tasks import media_hits
 from breathecode.utils import GenerateLookupsMixin
 from rest_framework.views import APIView
 from breathecode.utils import ValidationException, capable_of, HeaderLimitOffsetPagination
@@ -8,7 +13,8 @@ from rest_framework.response import Response
 from rest_framework.parsers import FileUploadParser, MultiPartParser
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from django.http import StreamingHttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from breathecode.services import http
 from django.db.models import Q
 from breathecode.media.serializers import (
     GetMediaSerializer,
@@ -20,6 +26,12 @@ from breathecode.media.serializers import (
 
 
 BUCKET_NAME = "media-breathecode"
+MASKING_CHUNK_SIZE = 64 * 1024
+MASKING_REQUEST_HEADERS = ['Range', 'If-Range', 'If-None-Match', 'If-Modified-Since']
+MASKING_EXCLUDED_HEADERS = ['transfer-encoding', 'keep-alive', 'connection']
+
+# a worker is not held sleeping between retries while a client waits, the upstream errors are forwarded
+masking_client = http.HttpClient(retries=0)
 # TODO: Mimes permitidos como una constante
 
 
@@ -180,6 +192,23 @@ class CategoryView(APIView, HeaderLimitOffsetPagination):
         return Response(None, status=status.HTTP_204_NO_CONTENT)
 
 
+def __hash_file__(file):
+    hash = hashlib.sha256()
+    for chunk in file.chunks():
+        hash.update(chunk)
+
+    return hash.hexdigest()
+
+
+def __upload_files__(files):
+    """Stream the files to the bucket concurrently, each blob is named after the hash of its file"""
+    from ..services.google_cloud import Storage
+    storage = Storage()
+
+    cloud_files = storage.upload_files(BUCKET_NAME, files)
+    return {hash: cloud_files[hash].url() for hash in cloud_files}
+
+
 class UploadView(APIView):
     parser_classes = [MultiPartParser, FileUploadParser]
     # permission_classes = [AllowAny]
@@ -187,8 +216,6 @@ class UploadView(APIView):
     # upload was separated because in one moment I think that the serializer
     # not should get many create and update operations together
     def upload(self, request, academy_id=None, update=False):
-        from ..services.google_cloud import Storage
-
         files = request.data.getlist('file')
         names = request.data.getlist('name')
         result = {
@@ -210,64 +237,68 @@ class UploadView(APIView):
         elif len(files) != len(names):
             raise ValidationException('numbers of files and names not match')
 
+        categories = []
+
+        # it is receive in url encoded
+        if 'categories' in request.data:
+            categories = request.data['categories'].split(',')
+        elif 'Categories' in request.headers:
+            categories = request.headers['Categories'].split(',')
+
+        items = []
         for index in range(0, len(files)):
             file = files[index]
             name = names[index] if len(names) else file.name
-            file_bytes = file.read()
-            hash = hashlib.sha256(file_bytes).hexdigest()
-            slug = name.split('.')[0]
+            items.append({
+                'file': file,
+                'hash': __hash_file__(file),
+                'slug': name.split('.')[0],
+                'name': name,
+            })
+
+        hashes = {x['hash'] for x in items}
+        slugs = {x['slug'] for x in items}
+        medias = list(Media.objects.filter(Q(hash__in=hashes) | Q(slug__in=slugs)).order_by('id')
+            .values('id', 'hash', 'slug', 'url', 'academy__id'))
 
-            if Media.objects.filter(slug=slug).exclude(hash=hash).count():
+        uploads = {}
+        for item in items:
+            hash = item['hash']
+            if [x for x in medias if x['slug'] == item['slug'] and x['hash'] != hash]:
                 raise ValidationException('slug already exists', code=400)
 
             data = {
                 'hash': hash,
-                'slug': slug,
-                'mime': file.content_type,
-                'name': name,
-                'categories': [],
+                'slug': item['slug'],
+                'mime': item['file'].content_type,
+                'name': item['name'],
+                'categories': list(categories),
                 'academy': academy_id,
             }
 
-            # it is receive in url encoded
-            if 'categories' in request.data:
-                data['categories'] = request.data['categories'].split(',')
-            elif 'Categories' in request.headers:
-                data['categories'] = request.headers['Categories'].split(',')
-
-            media = Media.objects.filter(hash=hash, academy__id=academy_id).first()
+            media = next((x for x in medias if x['hash'] == hash and str(x['academy__id']) == str(academy_id)),
+                None)
             if media:
-                data['id'] = media.id
+                data['id'] = media['id']
 
-                url = Media.objects.filter(hash=hash).values_list('url', flat=True).first()
-                if url:
-                    data['url'] = url
+            url = next((x['url'] for x in medias if x['hash'] == hash and x['url']), None)
+            if url:
+                data['url'] = url
 
-            else:
-                url = Media.objects.filter(hash=hash).values_list('url', flat=True).first()
-                if url:
-                    data['url'] = url
-
-                else:
-                    # upload file section
-                    storage = Storage()
-                    cloud_file = storage.file(BUCKET_NAME, hash)
-                    cloud_file.upload(file_bytes)
-                    data['url'] = cloud_file.url()
+            elif not media and hash not in uploads:
+                uploads[hash] = item['file']
 
             result['data'].append(data)
 
-        from django.db.models import Q
-        query = None
-        datas_with_id = [x for x in result['data'] if 'id' in x]
-        for x in datas_with_id:
-            if query:
-                query = query | Q(id=x['id'])
-            else:
-                query = Q(id=x['id'])
+        if uploads:
+            urls = __upload_files__(uploads)
+            for data in result['data']:
+                if 'url' not in data and data['hash'] in urls:
+                    data['url'] = urls[data['hash']]
 
-        if query:
-            result['instance'] = Media.objects.filter(query)
+        ids = [x['id'] for x in result['data'] if 'id' in x]
+        if ids:
+            result['instance'] = Media.objects.filter(id__in=ids)
 
         return result
 
@@ -281,6 +312,63 @@ class UploadView(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def __get_blob_name__(url):
+    path = urlsplit(url).path
+    prefix = f'/{BUCKET_NAME}/'
+
+    if path.startswith(prefix):
+        return path[len(prefix):]
+
+
+def __signed_redirect__(blob_name):
+    from ..services.google_cloud import Storage
+
+    expiration = timedelta(minutes=settings.MEDIA_SIGNED_URL_MINUTES)
+    storage = Storage()
+    cloud_file = storage.file(BUCKET_NAME, blob_name)
+
+    # the browser must ask again when the signature expires
+    response = redirect(cloud_file.signed_url(expiration))
+    patch_cache_control(response, private=True, max_age=int(expiration.total_seconds() / 2))
+    return response
+
+
+def __accel_redirect__(url):
+    parts = urlsplit(url)
+    response = HttpResponse()
+    response['X-Accel-Redirect'] = (f'{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{parts.netloc}{parts.path}' +
+        (f'?{parts.query}' if parts.query else ''))
+
+    # the content type is the one of the upstream
+    del response['Content-Type']
+    return response
+
+
+def __stream__(response):
+    # the bytes are forwarded as they come, like its Content-Encoding and Content-Range say
+    try:
+        for chunk in response.raw.stream(MASKING_CHUNK_SIZE, decode_content=False):
+            yield chunk
+    finally:
+        response.close()
+
+
+def __proxy__(request, url):
+    headers = {x: request.headers[x] for x in MASKING_REQUEST_HEADERS if x in request.headers}
+    response = masking_client.get(url, stream=True, headers=headers)
+
+    resource = StreamingHttpResponse(
+        __stream__(response),
+        status=response.status_code,
+        reason=response.reason,
+    )
+
+    for header in [x for x in response.headers.keys() if x.lower() not in MASKING_EXCLUDED_HEADERS]:
+        resource[header] = response.headers[header]
+
+    return resource
+
+
 class MaskingUrlView(APIView):
     parser_classes = [FileUploadParser]
     permission_classes = [AllowAny]
@@ -299,24 +387,17 @@ class MaskingUrlView(APIView):
         url = media.url
 
         # register click
-        media.hits = media.hits + 1
-        media.save()
+        media_hits.hit(media.id)
 
         if request.GET.get('mask') != 'true':
             return redirect(url, permanent=True)
 
-        response = requests.get(url, stream=True)
-        resource = StreamingHttpResponse(
-            response.raw,
-            status=response.status_code,
-            reason=response.reason,
-        )
+        blob_name = __get_blob_name__(url)
 
-        header_keys = [x for x in response.headers.keys() if x !=
-            'Transfer-Encoding' and x != 'Content-Encoding' and x !=
-            'Keep-Alive' and x != 'Connection']
+        if settings.MEDIA_MASKING_MODE == 'signed' and blob_name:
+            return __signed_redirect__(blob_name)
 
-        for header in header_keys:
-            resource[header] = response.headers[header]
+        if settings.MEDIA_MASKING_MODE == 'accel':
+            return __accel_redirect__(url)
 
-        return resource
+        return __proxy__(request, url)
@@ -6,7 +6,18 @@ import json
 import re
 import os
 import subprocess
+import signal
 import sys
+import io
+import time
+import contextlib
+import functools
+import threading
+import urllib.parse
+import billiard
+import billiard.connection
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
 from django.utils import timezone
 from breathecode.utils import ScriptNotification
 from .models import Endpoint
@@ -15,6 +26,15 @@ from breathecode.services.slack.actions.monitoring import render_snooze_text_end
 
 logger = logging.getLogger(__name__)
 USER_AGENT = "BreathecodeMonitoring/1.0"
+MAX_PROBE_WORKERS = 20
+MAX_PROBES_PER_HOST = 4
+SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'scripts')
+SCRIPT_TIMEOUT = 60
+SCRIPT_MEMORY_LIMIT = 512 * 1024 * 1024
+MAX_SCRIPT_PROCESSES = 4
+
+ENDPOINT_FIELDS = ['last_check', 'status', 'severity_level', 'status_text', 'response_text',
+                   'status_code']
 SCRIPT_HEADER = """
 # from django.conf import settings
 # import breathecode.settings as app_settings
@@ -26,15 +46,15 @@ SCRIPT_HEADER = """
 """
 
 
-def get_website_text(endp):
-    """Make a request to get the content of the given URL."""
-    import requests
-
+def probe_url(url, test_pattern=None):
+    """
+    Make a request to get the content of the given URL, it doesn't touch the
+    database so it can run in any thread.
+    """
     headers = {
         'User-Agent': USER_AGENT
     }
 
-    url = endp.url
     status_code = 404
     status_text = ""
     payload = None
@@ -49,7 +69,7 @@ def get_website_text(endp):
         # if status is one error, we should need see the status text
         payload = r.text
 
-        if (endp.test_pattern and not (status_code >= 200 and status_code <= 299)
+        if (test_pattern and not (status_code >= 200 and status_code <= 299)
                 and int(length) > 3000):
             status_code = 400
             status_text = ("Timeout: The payload of this request is too long "
@@ -63,7 +83,19 @@ def get_website_text(endp):
         status_text = "Connection Error"
 
     logger.debug(f"Tested {url} {status_code}")
-    endp.last_check = timezone.now()
+    return {
+        'status_code': status_code,
+        'status_text': status_text,
+        'payload': payload,
+    }
+
+
+def apply_probe(endp, probe, now=None):
+    """Set the status of the endpoint from the result of probe_url without save it."""
+    status_code = probe['status_code']
+    payload = probe['payload']
+
+    endp.last_check = now or timezone.now()
 
     if status_code > 399:
         endp.status = 'CRITICAL'
@@ -100,11 +132,107 @@ def get_website_text(endp):
         endp.response_text = None
 
     endp.status_code = status_code
+    return endp
+
+
+def get_website_text(endp):
+    """Make a request to get the content of the given URL."""
+    apply_probe(endp, probe_url(endp.url, endp.test_pattern))
     endp.save()
 
     return endp
 
 
+def probe_endpoints(endpoints, max_workers=MAX_PROBE_WORKERS, max_per_host=MAX_PROBES_PER_HOST):
+    """
+    Probe all the endpoints at the same time, limiting the requests that run
+    against the same host, the endpoints are updated but not saved.
+    """
+    endpoints = list(endpoints)
+    if not endpoints:
+        return endpoints
+
+    hosts = {}
+    for endpoint in endpoints:
+        host = urllib.parse.urlparse(endpoint.url).netloc
+        if host not in hosts:
+            hosts[host] = threading.BoundedSemaphore(max_per_host)
+
+    def probe(endpoint):
+        with hosts[urllib.parse.urlparse(endpoint.url).netloc]:
+            return probe_url(endpoint.url, endpoint.test_pattern)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(endpoints))) as executor:
+        probes = list(executor.map(probe, endpoints))
+
+    now = timezone.now()
+    for endpoint, result in zip(endpoints, probes):
+        apply_probe(endpoint, result, now)
+
+    return endpoints
+
+
+def save_endpoints(endpoints, fields=ENDPOINT_FIELDS):
+    """Write the endpoints back with one query, bulk_update doesn't handle auto_now."""
+    now = timezone.now()
+    for endpoint in endpoints:
+        endpoint.updated_at = now
+
+    Endpoint.objects.bulk_update(endpoints, [*fields, 'updated_at'])
+
+
+def get_endpoint_ignore_reason(endpoint, now):
+    if (endpoint.last_check and endpoint.last_check > now -
+            timezone.timedelta(minutes=endpoint.frequency_in_minutes)):
+        logger.debug(
+            f"Ignoring {endpoint.url} because frequency hast not been met")
+        return "Ignored because its paused"
+
+    if endpoint.paused_until and endpoint.paused_until > now:
+        logger.debug(
+            f"Ignoring endpoint:{endpoint.url} monitor because its paused")
+        return "Ignored because its paused"
+
+    return None
+
+
+def get_endpoint_results(endpoint):
+    """Build the report of one endpoint already probed, response_text is updated."""
+    results = {
+        "severity_level": 0,
+        "details": ""
+    }
+
+    results['details'] = endpoint.response_text
+    if endpoint.status != 'OPERATIONAL':
+        if endpoint.severity_level > results["severity_level"]:
+            results["severity_level"] = endpoint.severity_level
+        if endpoint.special_status_text:
+            results["details"] += endpoint.special_status_text
+        if endpoint.status not in results:
+            results[endpoint.status] = []
+        results[endpoint.status].append(endpoint.url)
+
+    if results["severity_level"] == 0:
+        results["status"] = 'OPERATIONAL'
+    elif results["severity_level"] > 10:
+        results["status"] = 'CRITICAL'
+    else:
+        results["status"] = 'MINOR'
+
+    results["text"] = json.dumps(results, indent=4)
+    results["slack_payload"] = render_snooze_text_endpoint(
+        [endpoint])  # converting to json to send to slack
+
+    if results["details"] != "":
+        endpoint.response_text = results["details"]
+    else:
+        results["details"] = results["text"]
+        endpoint.response_text = results["text"]
+
+    return results
+
+
 def run_app_diagnostic(app, report=False):
 
     failed_endpoints = []  # data to be send to slack
@@ -114,28 +242,18 @@ def run_app_diagnostic(app, report=False):
     }
     logger.debug(f"Testing application {app.title}")
     now = timezone.now()
-    _endpoints = app.endpoint_set.all()
-    for endpoint in _endpoints:
-        if endpoint.last_check is not None and endpoint.last_check > now - timezone.timedelta(minutes=endpoint.frequency_in_minutes):
-            logger.debug(
-                f"Ignoring {endpoint.url} because frequency hast not been met")
-            endpoint.status_text = "Ignored because its paused"
-            endpoint.save()
-            continue
-
-        if endpoint.paused_until is not None and endpoint.paused_until > now:
-            logger.debug(
-                f"Ignoring endpoint:{endpoint.url} monitor because its paused")
-            endpoint.status_text = "Ignored because its paused"
-            endpoint.save()
-            continue
-
-        # Starting the test
-        logger.debug(f"Testing endpoint: {endpoint.url}")
-        endpoint.status = 'LOADING'
-        endpoint.save()
 
-        e = get_website_text(endpoint)
+    ignored = []
+    due = []
+    for endpoint in app.endpoint_set.all():
+        reason = get_endpoint_ignore_reason(endpoint, now)
+        if reason:
+            endpoint.status_text = reason
+            ignored.append(endpoint)
+        else:
+            due.append(endpoint)
+
+    for e in probe_endpoints(due):
         if e.status != 'OPERATIONAL':
             if e.severity_level > results["severity_level"]:
                 results["severity_level"] = e.severity_level
@@ -146,6 +264,8 @@ def run_app_diagnostic(app, report=False):
             results[e.status].append(e.url)
             failed_endpoints.append(e)
 
+    save_endpoints(due + ignored)
+
     if results["severity_level"] == 0:
         results["status"] = 'OPERATIONAL'
     elif results["severity_level"] > 10:
@@ -174,130 +294,238 @@ def run_app_diagnostic(app, report=False):
 
 def run_endpoint_diagnostic(endpoint_id):
     endpoint = Endpoint.objects.get(id=endpoint_id)
-    results = {
-        "severity_level": 0,
-        "details": ""
-    }
 
     logger.debug(f"Testing endpoint {endpoint.url}")
-    now = timezone.now()
-
-    if (endpoint.last_check and endpoint.last_check > now -
-            timezone.timedelta(minutes=endpoint.frequency_in_minutes)):
-        logger.debug(
-            f"Ignoring {endpoint.url} because frequency hast not been met")
-        endpoint.status_text = "Ignored because its paused"
-        endpoint.save()
-        return
-
-    if endpoint.paused_until and endpoint.paused_until > now:
-        logger.debug(
-            f"Ignoring endpoint:{endpoint.url} monitor because its paused")
-        endpoint.status_text = "Ignored because its paused"
+    reason = get_endpoint_ignore_reason(endpoint, timezone.now())
+    if reason:
+        endpoint.status_text = reason
         endpoint.save()
         return
 
     # Starting the test
     logger.debug(f"Testing endpoint: {endpoint.url}")
-    endpoint.status = 'LOADING'
+    apply_probe(endpoint, probe_url(endpoint.url, endpoint.test_pattern))
+
+    results = get_endpoint_results(endpoint)
     endpoint.save()
+    return results
 
-    e = get_website_text(endpoint)
-    results['details'] = e.response_text
-    if e.status != 'OPERATIONAL':
-        if e.severity_level > results["severity_level"]:
-            results["severity_level"] = e.severity_level
-        if e.special_status_text:
-            results["details"] += e.special_status_text
-        if e.status not in results:
-            results[e.status] = []
-        results[e.status].append(e.url)
 
-    if results["severity_level"] == 0:
-        results["status"] = 'OPERATIONAL'
-    elif results["severity_level"] > 10:
-        results["status"] = 'CRITICAL'
-    else:
-        results["status"] = 'MINOR'
+def run_endpoints_diagnostic(endpoints):
+    """
+    Probe concurrently all the endpoints that are due, the paused ones and the
+    ones that were checked recently only get the reason in its status_text.
+    Return the results of each endpoint probed by its id.
+    """
+    now = timezone.now()
 
-    results["text"] = json.dumps(results, indent=4)
-    results["slack_payload"] = render_snooze_text_endpoint(
-        [endpoint])  # converting to json to send to slack
+    ignored = []
+    due = []
+    for endpoint in endpoints:
+        reason = get_endpoint_ignore_reason(endpoint, now)
+        if reason:
+            endpoint.status_text = reason
+            ignored.append(endpoint)
+        else:
+            due.append(endpoint)
 
-    if results["details"] != "":
-        endpoint.response_text = results["details"]
-    else:
-        results["details"] = results["text"]
-        endpoint.response_text = results["text"]
+    results = {}
+    for endpoint in probe_endpoints(due):
+        results[endpoint.id] = get_endpoint_results(endpoint)
+
+    if due or ignored:
+        save_endpoints(due + ignored)
 
-    endpoint.save()
     return results
 
 
-def run_script(script):
+@functools.lru_cache(maxsize=64)
+def __compile_script__(source, filename):
+    return compile(source, filename, 'exec')
+
+
+def get_script_code(script):
+    """
+    Return the compiled code of the script, the same source is compiled once
+    per process.
+    """
+    if script.script_slug and script.script_slug != "other":
+        path = os.path.join(SCRIPTS_PATH, f'{script.script_slug}.py')
+        with open(path) as f:
+            return __compile_script__(SCRIPT_HEADER + f.read(), path)
+
+    if script.script_body:
+        return __compile_script__(script.script_body, '<script_body>')
+
+    raise Exception(
+        f"Script not found or its body is empty: {script.script_slug}")
+
+
+def __execute_code__(code, academy):
+    outcome = {
+        'status_code': 0,
+        'status': 'OPERATIONAL',
+        'severity_level': 5,
+    }
+
+    local = {"result": { "status": "OPERATIONAL"}}
+    with contextlib.redirect_stdout(io.StringIO()) as s:
+        try:
+            exec(code, {"academy": academy}, local)
+
+        except ScriptNotification as e:
+            outcome['status_code'] = 1
+            if e.status is not None:
+                outcome['status'] = e.status
+                outcome['severity_level'] = 5 if e.status != 'CRITICAL' else 100
+            else:
+                outcome['status'] = 'MINOR'
+                outcome['severity_level'] = 5
+            outcome['error_slug'] = e.slug
+            print(e)
+
+        except Exception as e:
+            outcome = __critical_outcome__("uknown", str(e))
+            print(e)
+
+    outcome['stdout'] = s.getvalue()
+    return outcome
+
+
+def __critical_outcome__(error_slug, stdout=''):
+    return {
+        'status_code': 1,
+        'status': 'CRITICAL',
+        'severity_level': 100,
+        'error_slug': error_slug,
+        'stdout': stdout,
+    }
+
+
+def __limit_memory__(limit):
+    # the forked process already uses the memory of the worker, the limit is
+    # the memory that the script can use on top of it
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            used = int(f.read().split()[0]) * resource.getpagesize()
+
+        resource.setrlimit(resource.RLIMIT_AS, (used + limit, used + limit))
+
+    except (ImportError, OSError, ValueError):
+        logger.debug('The memory of the script could not be limited')
+
+
+def __script_process__(writer, code, academy, memory_limit):
+    __limit_memory__(memory_limit)
+
+    try:
+        outcome = __execute_code__(code, academy)
+    except MemoryError:
+        outcome = __critical_outcome__("memory-limit", 'The script exceeded the memory limit')
+
+    writer.send(outcome)
+    writer.close()
+
+
+def __apply_outcome__(script, outcome):
     results = {
-        "severity_level": 0,
+        "severity_level": outcome['severity_level'],
     }
 
-    from io import StringIO
-    import contextlib
+    if 'error_slug' in outcome:
+        results['error_slug'] = outcome['error_slug']
 
-    @contextlib.contextmanager
-    def stdoutIO(stdout=None):
-        old = sys.stdout
-        if stdout is None:
-            stdout = StringIO()
-        sys.stdout = stdout
-        yield stdout
-        sys.stdout = old
+    script.status_code = outcome['status_code']
+    script.status = outcome['status']
+    script.last_run = timezone.now()
+    script.response_text = outcome['stdout']
+    script.save()
 
-    content = None
-    if script.script_slug and script.script_slug != "other":
-        dir_path = os.path.dirname(os.path.realpath(__file__))
-        header = SCRIPT_HEADER
-        content = header + \
-            open(f"{dir_path}/scripts/{script.script_slug}.py").read()
-    elif script.script_body:
-        content = script.script_body
-    else:
-        raise Exception(
-            f"Script not found or its body is empty: {script.script_slug}")
+    results['status'] = script.status
+    results["text"] = script.response_text
+    results["slack_payload"] = render_snooze_script(
+        [script])  # converting to json to send to slack
+
+    return results
+
+
+def run_scripts(scripts, timeout=SCRIPT_TIMEOUT, memory_limit=SCRIPT_MEMORY_LIMIT,
+                max_processes=MAX_SCRIPT_PROCESSES):
+    """
+    Run the scripts at the same time, each one in its own process with a limit
+    of time and memory, a script that hangs is killed without stall the worker.
+    Return the results of each script by its id.
+    """
+    scripts = list(scripts)
+    codes = {}
+    results = {}
+
+    for script in scripts:
+        try:
+            codes[script.id] = get_script_code(script)
+
+        except Exception as e:
+            logger.error(str(e))
+            results[script.id] = __apply_outcome__(script, __critical_outcome__("uknown", f'{e}\n'))
 
-    if content:
-        local = {"result": { "status": "OPERATIONAL"}}
-        with stdoutIO() as s:
+    pending = [x for x in scripts if x.id in codes]
+
+    # the workers of celery are daemonic processes, billiard allows them to have children
+    context = billiard.get_context('fork')
+    running = {}
+
+    while pending or running:
+        while pending and len(running) < max_processes:
+            script = pending.pop(0)
+
+            # a forked process that closes the socket it shares with the worker
+            # would close the session of the worker, each one opens its own
+            connections.close_all()
+
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=__script_process__, args=(writer, codes[script.id],
+                script.application.academy, memory_limit))
+
+            process.start()
+            writer.close()
+            running[reader] = (script, process, time.monotonic() + timeout)
+
+        next_deadline = min(x[2] for x in running.values())
+        ready = billiard.connection.wait(list(running),
+            timeout=max(0, next_deadline - time.monotonic()))
+
+        for reader in ready:
+            script, process, _ = running.pop(reader)
             try:
-                exec(content, {"academy": script.application.academy}, local)
-                script.status_code = 0
-                script.status = 'OPERATIONAL'
-                results['severity_level'] = 5
-
-            except ScriptNotification as e:
-                script.status_code = 1
-                if e.status is not None:
-                    script.status = e.status
-                    results['severity_level'] = 5 if e.status != 'CRITICAL' else 100
-                else:
-                    script.status = 'MINOR'
-                    results['severity_level'] = 5
-                results['error_slug'] = e.slug
-                print(e)
-            except Exception as e:
-                script.status_code = 1
-                script.status = 'CRITICAL'
-                results['error_slug'] = "uknown"
-                results['severity_level'] = 100
-                print(e)
-
-        script.last_run = timezone.now()
-        script.response_text = s.getvalue()
-        script.save()
-
-        results['status'] = script.status
-        results["text"] = script.response_text
-        results["slack_payload"] = render_snooze_script(
-            [script])  # converting to json to send to slack
-
-        return results
-
-    return content is not None and script.status_code == 0
+                outcome = reader.recv()
+
+            # the process died before send anything, like when it is killed by the system
+            except EOFError:
+                outcome = __critical_outcome__("uknown", 'The script process ended unexpectedly')
+
+            reader.close()
+            process.join()
+            results[script.id] = __apply_outcome__(script, outcome)
+
+        now = time.monotonic()
+        for reader in [x for x in running if running[x][2] <= now]:
+            script, process, _ = running.pop(reader)
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+            reader.close()
+
+            outcome = __critical_outcome__("timeout", f'The script timed out after {timeout} seconds')
+            results[script.id] = __apply_outcome__(script, outcome)
+
+    return results
+
+
+def run_script(script):
+    # a missing script raises, a script with a syntax error is reported as critical
+    try:
+        get_script_code(script)
+    except SyntaxError:
+        pass
+
+    return run_scripts([script])[script.id]
@@ -0,0 +1,121 @@
+import logging
+from abc import ABC, abstractmethod
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from breathecode.admissions.models import Academy, Cohort, CohortUser
+from breathecode.marketing.models import FormEntry
+
+logger = logging.getLogger(__name__)
+
+
+class MonitoringCheck(ABC):
+    """
+    Declared aggregate over one queryset, the rows are counted for all the
+    academies in one grouped query and only a capped sample of the academies
+    with rows is loaded, the report of a sweep is cached to be shared by the
+    scripts of every academy.
+    """
+    slug: str
+
+    # the lookup of each group related to one attribute of Academy, one row
+    # belongs to each academy that matches any of them
+    academy_fields = {'academy__id': 'id'}
+    sample_fields = ['id']
+    sample_size = 10
+    cache_seconds = 60
+
+    @abstractmethod
+    def get_queryset(self):
+        pass
+
+    def __cache_key__(self):
+        return f'MonitoringCheck__{self.slug}'
+
+    def __belongs__(self, row, academy):
+        return any(row[lookup] is not None and row[lookup] == academy[attr]
+                   for lookup, attr in self.academy_fields.items())
+
+    def __sample__(self):
+        """
+        Rows of the sample of all the academies in one query, the rows are numbered
+        inside its group by a window and only the first ones of each group are loaded
+        """
+        queryset = self.get_queryset().order_by()
+        ops = connections[queryset.db].ops
+
+        ranks = {f'sample_rank_{index}': Window(RowNumber(), partition_by=[F(lookup)], order_by=F('pk').asc())
+                 for index, lookup in enumerate(self.academy_fields)}
+
+        # django can't filter by a window, the ranked rows are filtered in an outer select
+        sql, params = queryset.annotate(**ranks).values('pk', *ranks).query.sql_with_params()
+        pk = ops.quote_name(queryset.model._meta.pk.column)
+        where = ' OR '.join(f'{ops.quote_name(x)} <= %s' for x in ranks)
+        capped = RawSQL(f'SELECT {pk} FROM ({sql}) sample WHERE {where}',
+                        (*params, *[self.sample_size] * len(ranks)))
+
+        fields = dict.fromkeys([*self.sample_fields, *self.academy_fields])
+        return list(self.get_queryset().filter(pk__in=capped).order_by('pk').values(*fields))
+
+    def run(self):
+        """Return the count and the sample of the rows of each academy that has rows."""
+        lookups = list(self.academy_fields)
+        groups = list(self.get_queryset().order_by().values(*lookups).annotate(total=Count('pk')))
+
+        if not groups:
+            return {}
+
+        rows = self.__sample__()
+
+        report = {}
+        for academy in Academy.objects.values('id', *set(self.academy_fields.values())):
+            total = sum(x['total'] for x in groups if self.__belongs__(x, academy))
+
+            if not total:
+                continue
+
+            sample = [x for x in rows if self.__belongs__(x, academy)][:self.sample_size]
+
+            report[academy['id']] = {
+                'count': total,
+                'sample': [{field: x[field] for field in self.sample_fields} for x in sample],
+            }
+
+        return report
+
+    def for_academy(self, academy):
+        report = cache.get(self.__cache_key__())
+        if report is None:
+            report = self.run()
+            cache.set(self.__cache_key__(), report, self.cache_seconds)
+
+        return report.get(academy.id, {'count': 0, 'sample': []})
+
+
+class PendingLeadsCheck(MonitoringCheck):
+    slug = 'pending_leads'
+    academy_fields = {'academy__id': 'id', 'location': 'slug'}
+    sample_fields = ['id', 'first_name', 'last_name', 'email']
+
+    def get_queryset(self):
+        return FormEntry.objects.filter(storage_status="PENDING")
+
+
+class EndedCohortsNotMarkedCheck(MonitoringCheck):
+    slug = 'ended_cohorts_not_marked'
+    sample_fields = ['name']
+
+    def get_queryset(self):
+        return Cohort.objects.filter(ending_date__lt=timezone.now()).exclude(stage='ENDED')
+
+
+class ActiveUsersOnEndedCohortsCheck(MonitoringCheck):
+    slug = 'active_users_on_ended_cohorts'
+    academy_fields = {'cohort__academy__id': 'id'}
+    sample_fields = ['user__first_name', 'user__last_name', 'user__email', 'cohort__name']
+
+    def get_queryset(self):
+        return CohortUser.objects.filter(cohort__stage="ENDED", educational_status="ACTIVE")
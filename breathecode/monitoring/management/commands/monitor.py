@@ -4,8 +4,8 @@ from django.db.models.expressions import RawSQL
 from django.core.management.base import BaseCommand, CommandError
 from django.db import models as DM
 from django.db.models import Q, F
-from ...models import Application, MonitorScript
-from ...tasks import monitor_app, execute_scripts
+from ...models import Application, Endpoint, MonitorScript
+from ...tasks import monitor_app, monitor_endpoints, execute_academy_scripts
 from ...actions import run_script
 
 
@@ -63,14 +63,29 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"Enqueued {len(apps)} apps for diagnostic"))
 
+    def endpoints(self, options):
+        now = timezone.now()
+        endpoints = Endpoint.objects\
+                    .exclude(application__paused_until__isnull=False, application__paused_until__gte=now)
+
+        # all the applications in one sweep, it takes the time of the slowest endpoint
+        results = monitor_endpoints(endpoints)
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {len(results)} endpoints"))
+
     def scripts(self, options):
         now = timezone.now()
         scripts = MonitorScript.objects\
                     .filter(Q(last_run__isnull=True) | Q(last_run__lte= now - F('frequency_delta')))\
                     .exclude(application__paused_until__isnull=False, application__paused_until__gte=now)\
-                    .exclude(paused_until__isnull=False, paused_until__gte=now).values_list('id', flat=True)
+                    .exclude(paused_until__isnull=False, paused_until__gte=now)\
+                    .values_list('id', 'application__academy__id')
+
+        academies = {}
+        for script_id, academy_id in scripts:
+            academies.setdefault(academy_id, []).append(script_id)
 
-        for script_id in scripts:
-            execute_scripts.delay(script_id)
+        for script_ids in academies.values():
+            execute_academy_scripts.delay(script_ids)
 
         self.stdout.write(self.style.SUCCESS(f"Enqueued {len(scripts)} scripts for execution"))
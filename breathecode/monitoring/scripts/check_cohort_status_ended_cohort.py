@@ -3,14 +3,18 @@
 Checks if ending date has passed and cohort status is not ended
 """
 from breathecode.utils import ScriptNotification
-from breathecode.admissions.models import Cohort
-from django.utils import timezone
+from breathecode.monitoring.checks import EndedCohortsNotMarkedCheck
 
-to_fix_cohort_stage = Cohort.objects.filter(ending_date__lt=timezone.now(), academy__id=academy.id)\
-    .exclude(stage='ENDED').values_list('name', flat=True)
+to_fix_cohort_stage = EndedCohortsNotMarkedCheck().for_academy(academy)
 
-if len(to_fix_cohort_stage) > 0:
-    to_fix_cohort_name = ("\n").join(["- "+cohort_name for cohort_name in to_fix_cohort_stage])
+if to_fix_cohort_stage['count'] > 0:
+    to_fix_cohort_names = ["- "+cohort['name'] for cohort in to_fix_cohort_stage['sample']]
+
+    # the check only loads a sample of the cohorts
+    if to_fix_cohort_stage['count'] > len(to_fix_cohort_names):
+        to_fix_cohort_names.append(f"- and {to_fix_cohort_stage['count'] - len(to_fix_cohort_names)} more")
+
+    to_fix_cohort_name = ("\n").join(to_fix_cohort_names)
 
     raise ScriptNotification(
         f"These cohorts ended but their stage is different that ENDED: \n {to_fix_cohort_name}", status='MINOR')
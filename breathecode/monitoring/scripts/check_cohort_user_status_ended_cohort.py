@@ -3,19 +3,23 @@
 Checks for cohort users with status active on ended cohort
 """
 from breathecode.utils import ScriptNotification
-from breathecode.admissions.models import CohortUser
-from django.utils import timezone
+from breathecode.monitoring.checks import ActiveUsersOnEndedCohortsCheck
 
-active_user_on_ended_cohort = CohortUser.objects.filter(
-    cohort__stage="ENDED", educational_status="ACTIVE", cohort__academy__id=academy.id)
+active_user_on_ended_cohort = ActiveUsersOnEndedCohortsCheck().for_academy(academy)
 
 active_user_on_ended_cohort_list = [
-    "- " + item.user.first_name + " " + item.user.last_name + " (" +item.user.email + ") => " + item.cohort.name for item in active_user_on_ended_cohort]
+    "- " + item['user__first_name'] + " " + item['user__last_name'] + " (" + item['user__email'] + ") => " +
+    item['cohort__name'] for item in active_user_on_ended_cohort['sample']]
+
+# the check only loads a sample of the users
+if active_user_on_ended_cohort['count'] > len(active_user_on_ended_cohort_list):
+    active_user_on_ended_cohort_list.append(
+        f"- and {active_user_on_ended_cohort['count'] - len(active_user_on_ended_cohort_list)} more")
 
 active_user_on_ended_cohort_list_names = (
     "\n").join(active_user_on_ended_cohort_list)
 
-if len(active_user_on_ended_cohort_list):
+if active_user_on_ended_cohort['count']:
     raise ScriptNotification(
         f"This users: {active_user_on_ended_cohort_list_names} are active on ended cohorts")
 
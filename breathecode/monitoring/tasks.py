@@ -1,6 +1,7 @@
 from django.utils import timezone
 from celery import shared_task, Task
-from .actions import run_app_diagnostic, run_script, run_endpoint_diagnostic
+from .actions import (run_app_diagnostic, run_script, run_scripts, run_endpoint_diagnostic,
+    run_endpoints_diagnostic)
 from .models import Application, MonitorScript, Endpoint
 from breathecode.notify.actions import send_email_message, send_slack_raw
 import logging
@@ -49,6 +50,40 @@ class BaseTaskWithRetry(Task):
 
 #     return True
 
+def notify_endpoint_result(endpoint, result):
+    application = endpoint.application
+    if application.notify_email:
+        send_email_message("diagnostic", application.notify_email, {
+            "subject": f"Errors have been found on {application.title} diagnostic",
+            "details": result["details"]
+        })
+
+    if (application.notify_slack_channel and application.academy and
+            hasattr(application.academy, 'slackteam') and
+            hasattr(application.academy.slackteam.owner, 'credentialsslack')):
+        send_slack_raw(
+            "diagnostic",
+            application.academy.slackteam.owner.credentialsslack.token,
+            application.notify_slack_channel.slack_id, {
+                "subject": f"Errors have been found on {application.title} diagnostic",
+                **result,
+            }
+        )
+
+
+def monitor_endpoints(endpoints):
+    """Probe all the endpoints at once and notify the ones that are failing."""
+    endpoints = list(endpoints.select_related('application'))
+    results = run_endpoints_diagnostic(endpoints)
+
+    for endpoint in endpoints:
+        result = results.get(endpoint.id)
+        if result and result["status"] != "OPERATIONAL":
+            notify_endpoint_result(endpoint, result)
+
+    return results
+
+
 @shared_task(bind=True, base=BaseTaskWithRetry)
 def test_endpoint(self, endpoint_id):
     logger.debug("Starting monitor_app")
@@ -61,38 +96,43 @@ def test_endpoint(self, endpoint_id):
 
     logger.debug(f"Running diagnostic for: {endpoint.url} ")
     result = run_endpoint_diagnostic(endpoint.id)
-    if result["status"] != "OPERATIONAL":
-        if endpoint.application.notify_email:
-            send_email_message("diagnostic", endpoint.application.notify_email, {
-                "subject": f"Errors have been found on {endpoint.application.title} diagnostic",
-                "details": result["details"]
-            })
-
-        if (endpoint.application.notify_slack_channel and endpoint.application.academy and
-                hasattr(endpoint.application.academy, 'slackteam') and
-                hasattr(endpoint.application.academy.slackteam.owner, 'credentialsslack')):
+    if result and result["status"] != "OPERATIONAL":
+        notify_endpoint_result(endpoint, result)
+
+@shared_task(bind=True, base=BaseTaskWithRetry)
+def monitor_app(self, app_id):
+    logger.debug("Starting monitor_app")
+    monitor_endpoints(Endpoint.objects.filter(application__id=app_id))
+
+def notify_script_result(script, result):
+    app = script.application
+    if app.notify_email:
+        send_email_message("diagnostic", app.notify_email, {
+            "subject": f"Errors have been found on {app.title} script {script.id} (slug: {script.script_slug})",
+            "details": result["text"]
+        })
+    if (app.notify_slack_channel and app.academy and
+            hasattr(app.academy, 'slackteam') and
+            hasattr(app.academy.slackteam.owner, 'credentialsslack')):
+        try:
             send_slack_raw(
                 "diagnostic",
-                endpoint.application.academy.slackteam.owner.credentialsslack.token,
-                endpoint.application.notify_slack_channel.slack_id, {
-                    "subject": f"Errors have been found on {endpoint.application.title} diagnostic",
+                app.academy.slackteam.owner.credentialsslack.token,
+                app.notify_slack_channel.slack_id, {
+                    "subject": f"Errors have been found on {app.title} script {script.id} (slug: {script.script_slug})",
                     **result,
                 }
             )
+        except Exception:
+            return False
 
-@shared_task(bind=True, base=BaseTaskWithRetry)
-def monitor_app(self, app_id):
-    logger.debug("Starting monitor_app")
-    endpoints = Endpoint.objects.filter(application__id=app_id).values_list('id', flat=True)
+    return True
 
-    for endpoint_id in endpoints:
-        test_endpoint.delay(endpoint_id)
 
 @shared_task(bind=True, base=BaseTaskWithRetry)
 def execute_scripts(self, script_id):
     logger.debug("Starting execute_scripts")
     script = MonitorScript.objects.get(id=script_id)
-    app = script.application
 
     now = timezone.now()
     if script.paused_until is not None and script.paused_until > now:
@@ -101,25 +141,23 @@ def execute_scripts(self, script_id):
 
     result = run_script(script)
     if result["status"] != "OPERATIONAL":
-        if app.notify_email:
-            send_email_message("diagnostic", app.notify_email, {
-                "subject": f"Errors have been found on {app.title} script {script.id} (slug: {script.script_slug})",
-                "details": result["text"]
-            })
-        if (app.notify_slack_channel and app.academy and
-                hasattr(app.academy, 'slackteam') and
-                hasattr(app.academy.slackteam.owner, 'credentialsslack')):
-            try:
-                send_slack_raw(
-                    "diagnostic",
-                    app.academy.slackteam.owner.credentialsslack.token,
-                    app.notify_slack_channel.slack_id, {
-                        "subject": f"Errors have been found on {app.title} script {script.id} (slug: {script.script_slug})",
-                        **result,
-                    }
-                )
-            except Exception:
-                return False
+        notify_script_result(script, result)
         return False
 
     return True
+
+
+@shared_task(bind=True, base=BaseTaskWithRetry)
+def execute_academy_scripts(self, script_ids):
+    logger.debug("Starting execute_academy_scripts")
+    scripts = list(MonitorScript.objects.filter(id__in=script_ids).select_related('application__academy'))
+
+    # all the scripts of the academy run at the same time, each one in its own process
+    results = run_scripts(scripts)
+
+    for script in scripts:
+        result = results.get(script.id)
+        if result and result["status"] != "OPERATIONAL":
+            notify_script_result(script, result)
+
+    return all(x["status"] == "OPERATIONAL" for x in results.values())
@@ -0,0 +1,23 @@
+"""
+Test run_endpoints_diagnostic
+"""
+from datetime import timedelta
+from unittest.mock import patch
+from django.utils import timezone
+from ..mixins import MonitoringTestCase
+from breathecode.monitoring.actions import run_endpoints_diagnostic
+from breathecode.monitoring.models import Endpoint
+
+
+class RunEndpointsDiagnosticTestSuite(MonitoringTestCase):
+    @patch('breathecode.monitoring.actions.probe_url')
+    def tests_run_endpoints_diagnostic_with_paused_endpoint(self, probe_url):
+        """Test the ignored endpoints are saved with the reason, like in run_app_diagnostic"""
+        model = self.generate_models(application=True, endpoint=True, endpoint_kwargs={
+            'status_text': 'Status withing the 2xx range',
+            'paused_until': timezone.now() + timedelta(days=1),
+        })
+
+        self.assertEqual(run_endpoints_diagnostic([model.endpoint]), {})
+        self.assertEqual(probe_url.call_count, 0)
+        self.assertEqual(Endpoint.objects.get(id=model.endpoint.id).status_text, 'Ignored because its paused')
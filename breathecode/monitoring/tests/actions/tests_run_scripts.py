@@ -0,0 +1,130 @@
+"""
+Test run_scripts in its own processes
+"""
+import billiard
+from ..mixins import MonitoringTestCase
+from breathecode.monitoring.actions import run_scripts
+
+
+def run_scripts_in_daemon(writer, scripts):
+    results = run_scripts(scripts)
+    writer.send({key: (value['status'], value['text']) for key, value in results.items()})
+    writer.close()
+
+
+class RunScriptsTestSuite(MonitoringTestCase):
+    def tests_run_scripts_in_processes(self):
+        scripts = [
+            self.generate_models(monitor_script=True, monitor_script_kwargs={
+                'script_body': 'print("Everything up to date")'
+            }),
+            self.generate_models(monitor_script=True, monitor_script_kwargs={
+                'script_body': '\n'.join([
+                    "from breathecode.utils import ScriptNotification",
+                    "raise ScriptNotification('thus spoke kishibe rohan', status='MINOR', slug='rohan')"
+                ])
+            }),
+        ]
+
+        results = run_scripts([x.monitor_script for x in scripts])
+        for result in results.values():
+            del result['slack_payload']
+
+        self.assertEqual(results, {
+            1: {
+                'severity_level': 5,
+                'status': 'OPERATIONAL',
+                'text': 'Everything up to date\n',
+            },
+            2: {
+                'severity_level': 5,
+                'status': 'MINOR',
+                'error_slug': 'rohan',
+                'text': 'thus spoke kishibe rohan\n',
+            },
+        })
+
+        monitor_scripts = [{**x, 'last_run': None} for x in
+                           self.all_monitor_script_dict() if self.assertDatetime(x['last_run'])]
+        self.assertEqual(monitor_scripts, [{
+            **self.model_to_dict(scripts[0], 'monitor_script'),
+            'last_run': None,
+            'response_text': 'Everything up to date\n',
+            'status': 'OPERATIONAL',
+            'status_code': 0,
+        }, {
+            **self.model_to_dict(scripts[1], 'monitor_script'),
+            'last_run': None,
+            'response_text': 'thus spoke kishibe rohan\n',
+            'status': 'MINOR',
+            'status_code': 1,
+        }])
+
+    def tests_run_scripts_with_timeout(self):
+        model = self.generate_models(monitor_script=True, monitor_script_kwargs={
+            'script_body': 'while True: pass'
+        })
+
+        results = run_scripts([model.monitor_script], timeout=1)
+        del results[1]['slack_payload']
+
+        self.assertEqual(results, {
+            1: {
+                'severity_level': 100,
+                'status': 'CRITICAL',
+                'error_slug': 'timeout',
+                'text': 'The script timed out after 1 seconds',
+            },
+        })
+
+        monitor_scripts = [{**x, 'last_run': None} for x in
+                           self.all_monitor_script_dict() if self.assertDatetime(x['last_run'])]
+        self.assertEqual(monitor_scripts, [{
+            **self.model_to_dict(model, 'monitor_script'),
+            'last_run': None,
+            'response_text': 'The script timed out after 1 seconds',
+            'status': 'CRITICAL',
+            'status_code': 1,
+        }])
+
+    def tests_run_scripts_without_code(self):
+        model = self.generate_models(monitor_script=True, monitor_script_kwargs={
+            'script_slug': 'they-killed-kenny',
+        })
+
+        results = run_scripts([model.monitor_script])
+        del results[1]['slack_payload']
+
+        self.assertEqual(results[1]['status'], 'CRITICAL')
+        self.assertEqual(results[1]['error_slug'], 'uknown')
+        self.assertIn('they-killed-kenny.py', results[1]['text'])
+
+        monitor_scripts = [{**x, 'last_run': None} for x in
+                           self.all_monitor_script_dict() if self.assertDatetime(x['last_run'])]
+        self.assertEqual(monitor_scripts, [{
+            **self.model_to_dict(model, 'monitor_script'),
+            'last_run': None,
+            'response_text': results[1]['text'],
+            'status': 'CRITICAL',
+            'status_code': 1,
+        }])
+
+    def tests_run_scripts_in_a_daemonic_process(self):
+        """Test run_scripts inside a worker of the prefork pool of celery"""
+        model = self.generate_models(monitor_script=True, monitor_script_kwargs={
+            'script_body': 'print("Everything up to date")'
+        })
+
+        context = billiard.get_context('fork')
+        reader, writer = context.Pipe(duplex=False)
+        process = context.Process(target=run_scripts_in_daemon, args=(writer, [model.monitor_script]),
+            daemon=True)
+
+        process.start()
+        writer.close()
+
+        self.assertTrue(reader.poll(30))
+        self.assertEqual(reader.recv(), {1: ('OPERATIONAL', 'Everything up to date\n')})
+
+        reader.close()
+        process.join()
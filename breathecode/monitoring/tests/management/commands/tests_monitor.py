@@ -194,7 +194,7 @@ class AcademyCohortTestSuite(MonitoringTestCase):
             **self.model_to_dict(model, 'endpoint'),
             'frequency_in_minutes': 30.0,
             'severity_level': 0,
-            'status_text': None,
+            'status_text': 'Ignored because its paused',
         }])
 
         import requests
@@ -291,6 +291,7 @@ class AcademyCohortTestSuite(MonitoringTestCase):
             **self.model_to_dict(model, 'endpoint'),
             'frequency_in_minutes': 30.0,
             'severity_level': 0,
+            'status_text': 'Ignored because its paused',
         }])
 
         import requests
@@ -753,7 +754,8 @@ class AcademyCohortTestSuite(MonitoringTestCase):
         command.stdout.write = MagicMock()
         command.stderr.write = MagicMock()
 
-        self.assertEqual(command.handle(entity='apps'), None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(command.handle(entity='apps'), None)
         self.assertEqual(command.stdout.write.call_args_list, [
                          call('Enqueued 1 apps for diagnostic')])
         self.assertEqual(command.stderr.write.call_args_list, [])
@@ -962,6 +964,79 @@ class AcademyCohortTestSuite(MonitoringTestCase):
             timeout=2
         )])
 
+    """
+    🔽🔽🔽 Endpoints entity 🔽🔽🔽
+    """
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    @patch(MAILGUN_PATH['post'], apply_mailgun_requests_post_mock())
+    @patch(SLACK_PATH['request'], apply_slack_requests_request_mock())
+    @patch(REQUESTS_PATH['get'], apply_requests_get_mock([(200, 'https://potato.io', {})]))
+    def tests_monitor_with_entity_endpoints_of_many_applications(self):
+        mock_mailgun = MAILGUN_INSTANCES['post']
+        mock_mailgun.call_args_list = []
+
+        mock_slack = SLACK_INSTANCES['request']
+        mock_slack.call_args_list = []
+
+        endpoint_kwargs = {
+            'url': 'https://potato.io'
+        }
+
+        paused_endpoint_kwargs = {
+            'url': 'https://potato.io',
+            'paused_until': timezone.now() + timedelta(minutes=2),
+        }
+
+        models = [self.generate_models(application=True, endpoint=True,
+                                       endpoint_kwargs=endpoint_kwargs) for _ in range(0, 3)]
+
+        paused_model = self.generate_models(application=True, endpoint=True,
+                                            endpoint_kwargs=paused_endpoint_kwargs)
+
+        command = Command()
+        command.stdout.write = MagicMock()
+        command.stderr.write = MagicMock()
+
+        self.assertEqual(command.handle(entity='endpoints'), None)
+        self.assertEqual(command.stdout.write.call_args_list, [
+                         call('Checked 3 endpoints')])
+        self.assertEqual(command.stderr.write.call_args_list, [])
+
+        endpoints = [{**endpoint, 'last_check': None} for endpoint in
+                     self.all_endpoint_dict() if endpoint['paused_until'] is None and
+                     self.assertDatetime(endpoint['last_check'])]
+        self.assertEqual(endpoints, [{
+            **self.model_to_dict(model, 'endpoint'),
+            'frequency_in_minutes': 30.0,
+            'response_text': None,
+            'severity_level': 5,
+            'status_text': 'Status withing the 2xx range',
+        } for model in models])
+
+        paused_endpoints = [x for x in self.all_endpoint_dict() if x['paused_until'] is not None]
+        self.assertEqual(paused_endpoints, [{
+            **self.model_to_dict(paused_model, 'endpoint'),
+            'frequency_in_minutes': 30.0,
+            'severity_level': 0,
+            'status_text': 'Ignored because its paused',
+        }])
+
+        import requests
+        mock_breathecode = requests.get
+
+        self.assertEqual(mock_mailgun.call_args_list, [])
+        self.assertEqual(mock_slack.call_args_list, [])
+        self.assertEqual(mock_breathecode.call_args_list, [call(
+            'https://potato.io',
+            headers={
+                'User-Agent': 'BreathecodeMonitoring/1.0'
+            },
+            timeout=2
+        ) for _ in models])
+
     """
     🔽🔽🔽 Scripts entity 🔽🔽🔽
     """
@@ -1013,8 +1088,16 @@ class AcademyCohortTestSuite(MonitoringTestCase):
         self.assertEqual(command.stdout.write.call_args_list, [
                          call('Enqueued 1 scripts for execution')])
         self.assertEqual(command.stderr.write.call_args_list, [])
-        self.assertEqual(self.all_monitor_script_dict(), [{
+
+        # the script that can't be loaded is recorded as critical
+        monitor_scripts = [{**x, 'last_run': None} for x in
+                           self.all_monitor_script_dict() if self.assertDatetime(x['last_run'])]
+        self.assertEqual(monitor_scripts, [{
             **self.model_to_dict(model, 'monitor_script'),
+            'last_run': None,
+            'response_text': 'Script not found or its body is empty: None\n',
+            'status': 'CRITICAL',
+            'status_code': 1,
         }])
 
         self.assertEqual(mock_mailgun.call_args_list, [])
@@ -1307,7 +1390,8 @@ class AcademyCohortTestSuite(MonitoringTestCase):
         command.stdout.write = MagicMock()
         command.stderr.write = MagicMock()
 
-        self.assertEqual(command.handle(entity='scripts'), None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(command.handle(entity='scripts'), None)
         self.assertEqual(command.stdout.write.call_args_list, [
                          call('Enqueued 1 scripts for execution')])
         self.assertEqual(command.stderr.write.call_args_list, [])
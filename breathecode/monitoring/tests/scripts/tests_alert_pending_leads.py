@@ -0,0 +1,36 @@
+from unittest.mock import patch
+from breathecode.tests.mocks import (
+    GOOGLE_CLOUD_PATH,
+    apply_google_cloud_client_mock,
+    apply_google_cloud_bucket_mock,
+    apply_google_cloud_blob_mock,
+)
+from ..mixins import MonitoringTestCase
+from breathecode.monitoring.checks import PendingLeadsCheck
+
+
+class AlertPendingLeadsTestSuite(MonitoringTestCase):
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def tests_pending_leads_sample_of_many_lookups(self):
+        base = self.generate_models(academy=True)
+        academy = base['academy']
+
+        by_id = [self.generate_models(form_entry=True, models=base, form_entry_kwargs={
+            'storage_status': 'PENDING', 'location': None}) for _ in range(0, 3)]
+        by_location = [self.generate_models(form_entry=True, form_entry_kwargs={
+            'storage_status': 'PENDING', 'location': academy.slug, 'academy': None}) for _ in range(0, 3)]
+
+        class Check(PendingLeadsCheck):
+            slug = 'pending_leads_capped'
+            sample_size = 2
+
+        with self.assertNumQueries(3):
+            report = Check().for_academy(academy)
+
+        self.assertEqual(report['count'], 6)
+
+        # each lookup is capped on its own, the first rows are kept
+        self.assertEqual([x['id'] for x in report['sample']],
+                         [x['form_entry'].id for x in by_id[:2]])
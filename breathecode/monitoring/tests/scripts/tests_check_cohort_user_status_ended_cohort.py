@@ -21,6 +21,7 @@ from breathecode.tests.mocks import (
 )
 from ..mixins import MonitoringTestCase
 from breathecode.monitoring.actions import run_script
+from breathecode.monitoring.checks import ActiveUsersOnEndedCohortsCheck
 from breathecode.admissions.models import Cohort, Academy
 
 
@@ -214,3 +215,60 @@ class AcademyCohortTestSuite(MonitoringTestCase):
         self.assertEqual(self.all_monitor_script_dict(), [{
             **self.model_to_dict(model, 'monitor_script'),
         }])
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def tests_check_user_status_active_ended_cohort_of_many_academies(self):
+
+        monitor_script_kwargs = {
+            "script_slug": "check_cohort_user_status_ended_cohort"}
+
+        models = [self.generate_models(cohort_user=True, cohort=True, academy=True, monitor_script=True,
+                                       monitor_script_kwargs=monitor_script_kwargs,
+                                       cohort_user_kwargs={
+                                           'educational_status': "ACTIVE"},
+                                       cohort_kwargs={'stage': "ENDED"}
+                                       ) for _ in range(0, 3)]
+
+        scripts = [model.monitor_script for model in models]
+        for script in scripts:
+            script.application.academy
+
+        # the scripts run in other processes, the check that they share is
+        # measured here: the counts of all the academies, the sample of all the
+        # academies and the academies
+        with self.assertNumQueries(3):
+            for script in scripts:
+                ActiveUsersOnEndedCohortsCheck().for_academy(script.application.academy)
+
+        results = [run_script(script) for script in scripts]
+
+        for model, result in zip(models, results):
+            self.assertEqual(result['status'], 'MINOR')
+            self.assertEqual(result['text'], (
+                f"This users: - {model.user.first_name} {model.user.last_name} ({model.user.email}) "
+                f"=> {model.cohort.name} are active on ended cohorts\n"))
+
+    @patch(GOOGLE_CLOUD_PATH['client'], apply_google_cloud_client_mock())
+    @patch(GOOGLE_CLOUD_PATH['bucket'], apply_google_cloud_bucket_mock())
+    @patch(GOOGLE_CLOUD_PATH['blob'], apply_google_cloud_blob_mock())
+    def tests_check_user_status_active_ended_cohort_sample_is_capped(self):
+        base = self.generate_models(cohort=True, academy=True, cohort_kwargs={'stage': "ENDED"})
+        models = [self.generate_models(cohort_user=True, user=True, models=base,
+                                       cohort_user_kwargs={'educational_status': "ACTIVE"})
+                  for _ in range(0, 3)]
+
+        class Check(ActiveUsersOnEndedCohortsCheck):
+            slug = 'active_users_on_ended_cohorts_capped'
+            sample_size = 2
+
+        report = Check().for_academy(base.academy)
+
+        self.assertEqual(report['count'], 3)
+        self.assertEqual(report['sample'], [{
+            'user__first_name': model.user.first_name,
+            'user__last_name': model.user.last_name,
+            'user__email': model.user.email,
+            'cohort__name': base.cohort.name,
+        } for model in models[:2]])
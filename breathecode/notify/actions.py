@@ -1,6 +1,9 @@
 from django.core.mail import EmailMultiAlternatives
 from rest_framework.exceptions import APIException
-import os, logging, json
+import os, logging, json, hashlib
+from datetime import timedelta
+from django.db import DatabaseError, transaction
+from django.db.models import Q, F
 from django.template.loader import get_template
 from django.contrib.auth.models import User
 from django.template import Context
@@ -9,9 +12,9 @@ from pyfcm import FCMNotification
 from breathecode.authenticate.models import CredentialsSlack
 from breathecode.services.slack import client
 from breathecode.admissions.models import Cohort, CohortUser
-from .models import Device, SlackChannel, SlackTeam, SlackUser, SlackUserTeam
+from .models import Device, SlackChannel, SlackTeam, SlackUser, SlackUserTeam, OutboundEmail
 from django.conf import settings
-import requests
+from breathecode.services import http
 from twilio.rest import Client
 
 push_service = None
@@ -21,33 +24,184 @@ if FIREBASE_KEY is not None and FIREBASE_KEY != '':
 
 logger = logging.getLogger(__name__)
 
+MAILGUN_BATCH_SIZE = 1000
+OUTBOUND_EMAIL_MAX_ATTEMPTS = 5
+OUTBOUND_EMAIL_BACKOFF = timedelta(minutes=1)
+
+# a worker that dies while sending leaves its messages to be taken again after this time
+OUTBOUND_EMAIL_LEASE = timedelta(minutes=10)
+
+def __send_mailgun__(to, template):
+    data = {
+        "from": f"BreatheCode <mailgun@{os.environ.get('MAILGUN_DOMAIN')}>",
+        "to": to,
+        "subject": template['subject'],
+        "text": template['text'],
+        "html": template['html']}
+
+    # with recipient-variables mailgun sends a separate message to each recipient
+    if isinstance(to, list):
+        data["recipient-variables"] = json.dumps({x: {} for x in to})
+
+    return http.post(
+        f"https://api.mailgun.net/v3/{os.environ.get('MAILGUN_DOMAIN')}/messages",
+        auth=(
+            "api",
+            os.environ.get('MAILGUN_API_KEY', "")),
+        data=data)
+
+def queue_email_messages(template_slug, messages):
+    """
+    Save the rendered emails, `messages` is a list of (to, template), and
+    schedule the delivery, they are sent by send_outbound_emails. Return the
+    number of emails queued
+    """
+    from .tasks import async_send_outbound_emails
+
+    emails = []
+    for to, template in messages:
+        content = json.dumps([template['subject'], template['text'], template['html']])
+        emails.append(OutboundEmail(template_slug=template_slug, to=to, subject=template['subject'],
+            text=template['text'], html=template['html'],
+            content_hash=hashlib.md5(content.encode('utf-8')).hexdigest()))
+
+    try:
+        # a failed insert must not break the transaction of the caller
+        with transaction.atomic():
+            OutboundEmail.objects.bulk_create(emails, batch_size=500)
+
+    except DatabaseError as e:
+        logger.error(f"Error queuing the email {template_slug}: {str(e)}")
+        return 0
+
+    # the worker must not look for the emails before they are committed
+    transaction.on_commit(lambda: async_send_outbound_emails.delay())
+    return len(emails)
+
+def __take_outbound_emails__(limit):
+    now = timezone.now()
+
+    with transaction.atomic():
+        emails = list(OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now), status='PENDING')
+            .order_by('id')[:limit])
+
+        OutboundEmail.objects.filter(id__in=[x.id for x in emails]).update(next_attempt_at=now + OUTBOUND_EMAIL_LEASE,
+            attempts=F('attempts') + 1)
+
+    for email in emails:
+        email.attempts += 1
+
+    return emails
+
+def __get_mailgun_id__(result):
+    try:
+        return result.json()['id']
+    except Exception:
+        return None
+
+def __is_permanent_error__(status_code):
+    # the rate limit and the errors of mailgun can be retried, a bad request can't
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+def __send_outbound_batch__(batch):
+    """Send emails with the same content in one request, return the result, the error and its status code"""
+    first = batch[0]
+    template = {'subject': first.subject, 'text': first.text, 'html': first.html}
+    to = first.to if len(batch) == 1 else [x.to for x in batch]
+
+    try:
+        result = __send_mailgun__(to, template)
+        status_code = result.status_code
+        error = None if status_code == 200 else f"Mailgun status code: {status_code}"
+    except Exception as e:
+        result = None
+        status_code = None
+        error = str(e)
+
+    return result, error, status_code
+
+def __save_outbound_batch__(batch, result, error, status_code, now):
+    first = batch[0]
+    ids = [x.id for x in batch]
+
+    if error is None:
+        logger.debug(f'Email notification {first.template_slug} sent to {len(batch)} recipients')
+        OutboundEmail.objects.filter(id__in=ids).update(status='SENT', status_text=None, sent_at=now,
+            next_attempt_at=None, mailgun_id=__get_mailgun_id__(result), updated_at=now)
+        return len(batch)
+
+    logger.error(f"Error sending email {first.template_slug}: {error}")
+
+    # the emails of a batch always have the same attempts
+    if __is_permanent_error__(status_code) or first.attempts >= OUTBOUND_EMAIL_MAX_ATTEMPTS:
+        OutboundEmail.objects.filter(id__in=ids).update(status='ERROR', status_text=error[:255],
+            next_attempt_at=None, updated_at=now)
+    else:
+        next_attempt_at = now + OUTBOUND_EMAIL_BACKOFF * 2 ** (first.attempts - 1)
+        OutboundEmail.objects.filter(id__in=ids).update(status_text=error[:255],
+            next_attempt_at=next_attempt_at, updated_at=now)
+
+    return 0
+
+def send_outbound_emails(limit=5000):
+    """
+    Send the pending emails, the ones with the same content go in one mailgun
+    request, the failed ones are retried with an exponential backoff
+    """
+    emails = __take_outbound_emails__(limit)
+
+    groups = {}
+    for email in emails:
+        groups.setdefault(email.content_hash, []).append(email)
+
+    now = timezone.now()
+    sent = 0
+    for group in groups.values():
+        for index in range(0, len(group), MAILGUN_BATCH_SIZE):
+            batch = group[index:index + MAILGUN_BATCH_SIZE]
+            result, error, status_code = __send_outbound_batch__(batch)
+
+            # one bad recipient fails the whole request, each email is sent alone
+            # within the same attempt, a rate limit is not split to not make it worse
+            if error is not None and len(batch) > 1 and status_code != 429:
+                logger.warning(f"Error sending email {batch[0].template_slug} to {len(batch)} recipients, "
+                    f"sending them one by one: {error}")
+
+                for email in batch:
+                    sent += __save_outbound_batch__([email], *__send_outbound_batch__([email]), now)
+
+                continue
+
+            sent += __save_outbound_batch__(batch, result, error, status_code, now)
+
+    return sent
+
 def send_email_message(template_slug, to, data={}):
     if os.getenv('EMAIL_NOTIFICATIONS_ENABLED', False) == 'TRUE':
         template = get_template_content(template_slug, data, ["email"])
-
-        result = requests.post(
-            f"https://api.mailgun.net/v3/{os.environ.get('MAILGUN_DOMAIN')}/messages",
-            auth=(
-                "api",
-                os.environ.get('MAILGUN_API_KEY', "")),
-            data={
-                "from": f"BreatheCode <mailgun@{os.environ.get('MAILGUN_DOMAIN')}>",
-                "to": to,
-                "subject": template['subject'],
-                "text": template['text'],
-                "html": template['html']})
-
-        if result.status_code != 200:
-            logger.error(f"Error sending email, mailgun status code: {str(result.status_code)}")
-            logger.error(result.text)
-        else:
-            logger.debug('Email notification  '+template_slug+' sent')
-
-        return result.status_code == 200
+        return queue_email_messages(template_slug, [(to, template)]) == 1
     else:
         logger.warning('Email not sent because EMAIL_NOTIFICATIONS_ENABLED != TRUE')
         return True
 
+def send_email_messages(template_slug, messages, shared={}):
+    """
+    Send one template to many recipients, `messages` is a list of (to, data),
+    the whole batch is rendered at once and queued
+    """
+    if os.getenv('EMAIL_NOTIFICATIONS_ENABLED', False) != 'TRUE':
+        logger.warning('Email not sent because EMAIL_NOTIFICATIONS_ENABLED != TRUE')
+        return [True for _ in messages]
+
+    if not messages:
+        return []
+
+    templates = render_template_batch(template_slug, [data for _, data in messages], ["email"], shared)
+    queued = queue_email_messages(template_slug, [(to, template) for (to, _), template in
+        zip(messages, templates)]) == len(messages)
+    return [queued for _ in messages]
+
 def send_sms(slug, phone_number, data={}):
 
     template = get_template_content(slug, data, ["sms"])
@@ -111,9 +265,7 @@ def send_slack_raw(slug, token, channel_id, data={}):
             payload = data["slack_payload"]
         else:
             template = get_template_content(slug, data, ["slack"])
-            payload = json.loads(template['slack'])
-            if "blocks" in payload:
-                payload = payload["blocks"]
+            payload = get_slack_payload(template)
 
         # for modals mainly
         meta = ""
@@ -136,6 +288,31 @@ def send_slack_raw(slug, token, channel_id, data={}):
         return False
 
 
+def get_slack_payload(template):
+    payload = json.loads(template['slack'])
+    if "blocks" in payload:
+        payload = payload["blocks"]
+
+    return payload
+
+def send_slack_messages(slug, messages, shared={}):
+    """
+    Send one template to many slack users, `messages` is a list of
+    (slackuser, team, data), the whole batch is rendered at once
+    """
+    templates = render_template_batch(slug, [data for _, _, data in messages], ["slack"], shared)
+
+    result = []
+    for (slackuser, team, _), template in zip(messages, templates):
+        try:
+            result.append(send_slack(slug, slackuser, team, data={"slack_payload": get_slack_payload(template)}))
+        except Exception:
+            logger.exception(f"Error sending slack message to {slackuser.slack_id}")
+            result.append(False)
+
+    return result
+
+
 def send_fcm(slug, registration_ids, data={}):
     if(len(registration_ids) > 0 and push_service):
         template = get_template_content(slug, data, ["email", "fms"])
@@ -177,9 +354,8 @@ def notify_all(slug, user, data):
     send_slack("nps", user.slackuser, data)
 
 
-def get_template_content(slug, data={}, formats=None):
-    #d = Context({ 'username': username })
-    con = {
+def __get_base_context__():
+    return {
         'API_URL': os.environ.get('API_URL'),
         'COMPANY_NAME': 'BreatheCode',
         'COMPANY_LEGAL_NAME': 'BreatheCode LLC',
@@ -188,45 +364,54 @@ def get_template_content(slug, data={}, formats=None):
         'style__danger': '#ffcccc',
         'style__secondary': '#ededed',
     }
-    z = con.copy()   # start with x's keys and values
-    z.update(data)
 
-    templates = {}
+def __get_extensions__(formats):
+    extensions = []
 
     if formats is None or "email" in formats:
-        if 'SUBJECT' in z:
-            templates["SUBJECT"] = z['SUBJECT']
-            templates["subject"] = z['SUBJECT']
-        elif 'subject' in z:
-            templates["SUBJECT"] = z['subject']
-            templates["subject"] = z['subject']
-        else:
-            templates["SUBJECT"] = 'No subject specified',
-            templates["subject"] = 'No subject specified'
+        extensions += ['txt', 'html']
 
-        plaintext = get_template( slug + '.txt')
-        html = get_template(slug + '.html')
-        templates["text"] = plaintext.render(z)
-        templates["html"] = html.render(z)
+    for extension in ['slack', 'fms', 'sms']:
+        if formats is not None and extension in formats:
+            extensions.append(extension)
 
-    if formats is not None and "slack" in formats:
-        fms = get_template(slug + '.slack')
-        templates["slack"] = fms.render(z)
+    return extensions
 
-    if formats is not None and "fms" in formats:
-        fms = get_template(slug + '.fms')
-        templates["fms"] = fms.render(z)
+def render_template_batch(slug, contexts, formats=None, shared={}):
+    """
+    Render the template `slug` once per context, the templates are compiled
+    once and the base context and `shared` are built once for the whole batch
+    """
+    if not contexts:
+        return []
 
-    if formats is not None and "sms" in formats:
-        sms = get_template(slug + '.sms')
-        templates["sms"] = sms.render(z)
+    base = {**__get_base_context__(), **shared}
+    templates = {x: get_template(f'{slug}.{x}') for x in __get_extensions__(formats)}
 
-    return templates
+    result = []
+    for data in contexts:
+        z = {**base, **data}
+        content = {}
 
-def sync_slack_team_channel(team_id):
+        if 'txt' in templates:
+            subject = z.get('SUBJECT', z.get('subject', 'No subject specified'))
+            content["SUBJECT"] = subject
+            content["subject"] = subject
+            content["text"] = templates['txt'].render(z)
+            content["html"] = templates['html'].render(z)
 
-    logger.debug(f"Sync slack team {team_id}: looking for channels")
+        for extension in ['slack', 'fms', 'sms']:
+            if extension in templates:
+                content[extension] = templates[extension].render(z)
+
+        result.append(content)
 
+    return result
+
+def get_template_content(slug, data={}, formats=None):
+    return render_template_batch(slug, [data], formats)[0]
+
+def __get_slack_team__(team_id):
     team = SlackTeam.objects.filter(id=team_id).first()
     if team is None:
         raise Exception("Invalid team id: "+str(team_id))
@@ -240,76 +425,214 @@ def sync_slack_team_channel(team_id):
     team.synqued_at = timezone.now()
     team.save()
 
-    api = client.Slack(credentials.token)
-    data = api.get("conversations.list", {
-        "types": "public_channel,private_channel",
-        "limit": 300,
-    })
-
-    channels = data['channels']
-    while 'response_metadata' in data and 'next_cursor' in data['response_metadata'] and data['response_metadata']['next_cursor'] != "":
-        print("Next cursor: ", data['response_metadata']['next_cursor'])
-        data = api.get("conversations.list", {
-            "limit": 300,
-            "cursor": data['response_metadata']['next_cursor'],
-            "types": "public_channel,private_channel",
-        })
-        channels = channels + data['channels']
+    return team, client.Slack(credentials.token)
 
-    logger.debug(f"Found {str(len(channels))} channels, starting to sync")
-    for channel in channels:
 
-        # only sync channels
-        if channel["is_channel"] == False and channel['is_group'] == False and channel['is_general'] == False:
-            continue
+def __get_slack_text__(value):
+    # conversations.list return the topic and the purpose as objects
+    return value['value'] if isinstance(value, dict) else value
+
+
+def __sync_slack_channels_page__(channels, team):
+    """
+    Reconcile one page of conversations.list, the existing channels and the
+    cohorts of the new ones are fetched in one query each
+    """
+    now = timezone.now()
 
-        # will raise exception if it fails
-        sync_slack_channel(channel, team)
+    # only sync channels
+    channels = [x for x in channels if x['is_channel'] or x['is_group'] or x['is_general']]
+    slack_channels = {x.slack_id: x for x in SlackChannel.objects.filter(slack_id__in=[x['id'] for x in channels])}
+
+    names = [x['name_normalized'] for x in channels if x['id'] not in slack_channels]
+    cohorts = {x.slug: x for x in Cohort.objects.filter(slug__in=names)} if names else {}
+
+    to_create = []
+    to_update = []
+    for payload in channels:
+        slack_channel = slack_channels.get(payload['id'])
+
+        if slack_channel is None:
+            cohort = cohorts.get(payload['name_normalized'])
+            if cohort is None:
+                logger.warning(f"Slack channel {payload['name_normalized']} has no corresponding cohort in breathecode")
+
+            slack_channel = SlackChannel(slack_id=payload['id'], team=team, cohort=cohort)
+            to_create.append(slack_channel)
+        else:
+            to_update.append(slack_channel)
+
+        slack_channel.name = payload['name_normalized']
+        slack_channel.topic = __get_slack_text__(payload['topic'])
+        slack_channel.purpose = __get_slack_text__(payload['purpose'])
+        slack_channel.synqued_at = now
+        slack_channel.sync_status = 'COMPLETED'
+        slack_channel.updated_at = now
+
+    SlackChannel.objects.bulk_create(to_create, batch_size=500)
+    SlackChannel.objects.bulk_update(to_update, ['name', 'topic', 'purpose', 'synqued_at', 'sync_status',
+        'updated_at'], batch_size=500)
+
+    return len(to_create), len(to_update)
+
+
+def sync_slack_team_channel(team_id):
+
+    logger.debug(f"Sync slack team {team_id}: looking for channels")
+    team, api = __get_slack_team__(team_id)
+
+    created = 0
+    updated = 0
+
+    # each page is reconciled before request the next one
+    for page in api.paginate("conversations.list", "channels", {
+        "types": "public_channel,private_channel",
+        "limit": 300,
+    }):
+        page_created, page_updated = __sync_slack_channels_page__(page, team)
+        created += page_created
+        updated += page_updated
+
+    logger.debug(f"Synced {created + updated} channels of team {team_id}")
 
     # finished sync, status back to normal
     team.sync_status = 'COMPLETED'
+    team.sync_message = f"{created + updated} channels: {created} created and {updated} updated"
     team.save()
 
     return True
 
-def sync_slack_team_users(team_id):
 
-    logger.debug(f"Sync slack team {team_id}: looking for users")
+def __sync_slack_users_page__(members, team):
+    """
+    Reconcile one page of users.list, the slack users, the cohort users by
+    email and the team memberships are fetched in one query each and the
+    differences are written in bulk
+    """
+    now = timezone.now()
 
-    team = SlackTeam.objects.filter(id=team_id).first()
-    if team is None:
-        raise Exception("Invalid team id: "+str(team_id))
+    # ignore bots
+    members = [x for x in members if not x['is_bot'] and x['name'] != 'slackbot']
 
-    credentials = CredentialsSlack.objects.filter(team_id=team.slack_id).first()
-    if credentials is None:
-        raise Exception(f"No credentials found for this team {team_id}")
+    slack_users = {x.slack_id: x for x in SlackUser.objects.filter(slack_id__in=[x['id'] for x in members])}
 
-    # Starting to sync, I need to reset the status
-    team.sync_status = 'INCOMPLETED'
-    team.synqued_at = timezone.now()
-    team.save()
+    new_members = []
+    for member in members:
+        if member['id'] in slack_users:
+            continue
+
+        if 'email' not in member['profile']:
+            logger.error(f"Slack user {member['id']} without email, the API must return the emails")
+            continue
+
+        new_members.append(member)
+
+    new_ids = {x['id'] for x in new_members}
+    if new_members:
+        SlackUser.objects.bulk_create([SlackUser(slack_id=x['id']) for x in new_members], batch_size=500)
+
+        # not every database return the primary keys of the rows created in bulk
+        slack_users.update({x.slack_id: x for x in SlackUser.objects.filter(slack_id__in=[x['id'] for x in new_members])})
+
+    members = [x for x in members if x['id'] in slack_users and 'email' in x['profile']]
 
-    api = client.Slack(credentials.token)
-    data = api.get("users.list", { "limit": 300 })
+    users = {}
+    for cohort_user in CohortUser.objects.filter(user__email__in=[x['profile']['email'] for x in members],
+            cohort__academy__id=team.academy_id).select_related('user'):
+        users.setdefault(cohort_user.user.email, cohort_user.user)
 
-    members = data['members']
-    while 'response_metadata' in data and 'next_cursor' in data['response_metadata'] and data['response_metadata']['next_cursor'] != "":
-        print("Next cursor: ", data['response_metadata']['next_cursor'])
-        data = api.get("users.list", { "limit": 300, "cursor": data['response_metadata']['next_cursor'] })
-        members = members + data['members']
+    # a user can be linked to just one slack user
+    linked = dict(SlackUser.objects.filter(user__id__in=[x.id for x in users.values()])
+        .values_list('user__id', 'slack_id'))
 
-    logger.debug(f"Found {str(len(members))} members, starting to sync")
+    user_teams = {x[0]: x[1:] for x in SlackUserTeam.objects.filter(slack_team=team,
+        slack_user__slack_id__in=[x['id'] for x in members]).values_list('slack_user__slack_id', 'id', 'sync_status')}
+
+    created = 0
+    updated = 0
+    to_update = []
+    fields = set()
+    teams_to_create = []
+    teams_to_complete = []
     for member in members:
+        email = member['profile']['email']
+        user = users.get(email)
+
+        if user is None:
+            logger.warning(f"Skipping user {email} because its not a member of any cohort in {team.academy.name}")
+            continue
 
-        # ignore bots
-        if member["is_bot"] or member["name"] == "slackbot":
+        slack_user = slack_users[member['id']]
+        if linked.get(user.id, slack_user.slack_id) != slack_user.slack_id:
+            logger.warning(f"Skipping user {email} because it is linked to the slack user {linked[user.id]}")
             continue
 
-        # will raise exception if it fails
-        sync_slack_user(member, team)
+        linked[user.id] = slack_user.slack_id
+        if member['id'] not in user_teams:
+            teams_to_create.append(SlackUserTeam(slack_team=team, slack_user=slack_user, sync_status='COMPLETED'))
+
+        elif user_teams[member['id']][1] != 'COMPLETED':
+            teams_to_complete.append(user_teams[member['id']][0])
+
+        values = {
+            'status_text': member['profile']['status_text'],
+            'status_emoji': member['profile']['status_emoji'],
+            'display_name': member['name'],
+            'user_id': user.id,
+            'email': email,
+        }
+
+        if 'real_name' in member:
+            values['real_name'] = member['real_name']
+
+        changed = [key for key, value in values.items() if getattr(slack_user, key) != value]
+        if changed:
+            for key in changed:
+                setattr(slack_user, key, values[key])
+
+            # bulk_update doesn't set the auto_now fields
+            slack_user.updated_at = now
+            fields.update(changed)
+
+        # only the slack users linked to a user are counted
+        if member['id'] in new_ids:
+            created += 1
+
+        elif changed:
+            updated += 1
+
+        slack_user.synqued_at = now
+        to_update.append(slack_user)
+
+    SlackUserTeam.objects.bulk_create(teams_to_create, batch_size=500)
+    if teams_to_complete:
+        SlackUserTeam.objects.filter(id__in=teams_to_complete).update(sync_status='COMPLETED', updated_at=now)
+
+    if to_update:
+        SlackUser.objects.bulk_update(to_update, [*fields, 'synqued_at', 'updated_at'], batch_size=500)
+
+    return created, updated
+
+
+def sync_slack_team_users(team_id):
+
+    logger.debug(f"Sync slack team {team_id}: looking for users")
+    team, api = __get_slack_team__(team_id)
+
+    created = 0
+    updated = 0
+
+    # each page is reconciled before request the next one
+    for page in api.paginate("users.list", "members", {"limit": 300}):
+        page_created, page_updated = __sync_slack_users_page__(page, team)
+        created += page_created
+        updated += page_updated
+
+    logger.debug(f"Synced the users of team {team_id}: {created} created and {updated} updated")
 
     # finished sync, status back to normal
     team.sync_status = 'COMPLETED'
+    team.sync_message = f"Users: {created} created and {updated} updated"
     team.save()
 
     return True
@@ -2,9 +2,10 @@ import logging
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import Device, SlackTeam, SlackChannel, SlackUser, UserProxy, CohortProxy, SlackTeam, SlackUserTeam
+from .models import (Device, SlackTeam, SlackChannel, SlackUser, UserProxy, CohortProxy, SlackTeam, SlackUserTeam,
+    OutboundEmail)
 from .actions import sync_slack_team_users, sync_slack_team_channel, send_slack
-from .tasks import async_slack_team_users
+from .tasks import async_slack_team_users, async_send_outbound_emails
 from breathecode.admissions.admin import CohortAdmin
 from django.utils.html import format_html
 from django.template.defaultfilters import escape
@@ -100,4 +101,17 @@ test_cohort_notification.short_description = "💬 Send slack test notification"
 @admin.register(CohortProxy)
 class CohortAdmin(CohortAdmin):
     list_display = ('slug', 'name', 'stage')
-    actions = [test_cohort_notification]
\ No newline at end of file
+    actions = [test_cohort_notification]
+
+def retry_outbound_emails(modeladmin, request, queryset):
+    queryset.exclude(status='SENT').update(status='PENDING', attempts=0, next_attempt_at=None)
+    async_send_outbound_emails.delay()
+
+retry_outbound_emails.short_description = "Retry the emails not sent"
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    search_fields = ['to', 'subject', 'template_slug']
+    list_display = ('to', 'template_slug', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ['status', 'template_slug']
+    actions = [retry_outbound_emails]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0008_remove_slackteam_credentials'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_slug', models.CharField(max_length=100)),
+                ('to', models.CharField(max_length=150)),
+                ('subject', models.CharField(max_length=255)),
+                ('text', models.TextField()),
+                ('html', models.TextField()),
+                ('content_hash', models.CharField(db_index=True, max_length=32)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('ERROR', 'Error')], db_index=True, default='PENDING', max_length=15)),
+                ('status_text', models.CharField(blank=True, default=None, max_length=255, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(blank=True, db_index=True, default=None, help_text='The message is not sent before this date', null=True)),
+                ('mailgun_id', models.CharField(blank=True, default=None, max_length=255, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
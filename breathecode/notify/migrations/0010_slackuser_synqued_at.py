@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0009_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slackuser',
+            name='synqued_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+    ]
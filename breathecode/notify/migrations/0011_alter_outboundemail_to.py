@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0010_slackuser_synqued_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='to',
+            field=models.CharField(max_length=255),
+        ),
+    ]
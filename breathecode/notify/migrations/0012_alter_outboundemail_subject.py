@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0011_alter_outboundemail_to'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='subject',
+            field=models.TextField(),
+        ),
+    ]
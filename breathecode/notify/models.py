@@ -56,6 +56,7 @@ class SlackUser(models.Model):
     real_name = models.CharField(max_length=100, blank=True, null=True)
     display_name = models.CharField(max_length=100, blank=True, null=True)
     email = models.CharField(max_length=100, blank=True, null=True)
+    synqued_at = models.DateTimeField(default=None, blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
@@ -95,4 +96,37 @@ class SlackChannel(models.Model):
 
     def __str__(self):
         name = self.name if self.name else 'Unknown'
-        return f'{name}({self.slack_id})'
\ No newline at end of file
+        return f'{name}({self.slack_id})'
+
+PENDING = 'PENDING'
+SENT = 'SENT'
+ERROR = 'ERROR'
+OUTBOUND_EMAIL_STATUS = (
+    (PENDING, 'Pending'),
+    (SENT, 'Sent'),
+    (ERROR, 'Error'),
+)
+class OutboundEmail(models.Model):
+    template_slug = models.CharField(max_length=100)
+    to = models.CharField(max_length=255)
+
+    subject = models.TextField()
+    text = models.TextField()
+    html = models.TextField()
+
+    # the messages with the same content are sent together
+    content_hash = models.CharField(max_length=32, db_index=True)
+
+    status = models.CharField(max_length=15, choices=OUTBOUND_EMAIL_STATUS, default=PENDING, db_index=True)
+    status_text = models.CharField(max_length=255, blank=True, null=True, default=None)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=None, blank=True, null=True, db_index=True,
+        help_text="The message is not sent before this date")
+    mailgun_id = models.CharField(max_length=255, blank=True, null=True, default=None)
+    sent_at = models.DateTimeField(default=None, blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    def __str__(self):
+        return f"{self.template_slug} to {self.to} ({self.status})"
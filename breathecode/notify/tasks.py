@@ -1,7 +1,7 @@
 import logging
 from celery import shared_task, Task
 from .models import SlackTeam
-from .actions import sync_slack_team_channel, sync_slack_team_users
+from .actions import sync_slack_team_channel, sync_slack_team_users, send_outbound_emails
 from breathecode.services.slack.client import Slack
 
 logger = logging.getLogger(__name__)
@@ -38,4 +38,8 @@ def async_slack_action(post_data):
     except Exception as e:
         logger.exception("Error processing slack action")
         return False
- 
+
+@shared_task
+def async_send_outbound_emails():
+    logger.debug("Starting async_send_outbound_emails")
+    return send_outbound_emails()
@@ -1,3 +1,207 @@
-from django.test import TestCase
+"""
+Test the slack team sync
+"""
+from unittest.mock import patch, MagicMock
+from mixer.backend.django import mixer
+from rest_framework.test import APITestCase
+from breathecode.tests.mixins import GenerateModelsMixin
+from django.db import DatabaseError
+from .actions import (sync_slack_team_users, sync_slack_team_channel, queue_email_messages, send_outbound_emails,
+    send_email_message, OUTBOUND_EMAIL_MAX_ATTEMPTS)
+from .models import SlackUser, SlackUserTeam, SlackChannel, OutboundEmail
 
-# Create your tests here.
+
+def slack_page(key, items, cursor=''):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {'ok': True, key: items, 'response_metadata': {'next_cursor': cursor}}
+    return response
+
+
+def slack_member(id, email, is_bot=False):
+    return {
+        'id': id,
+        'name': f'user{id}',
+        'real_name': f'User {id}',
+        'is_bot': is_bot,
+        'profile': {'email': email, 'status_text': '', 'status_emoji': ''},
+    }
+
+
+def slack_channel(id, name):
+    return {
+        'id': id,
+        'name_normalized': name,
+        'is_channel': True,
+        'is_group': False,
+        'is_general': False,
+        'topic': {'value': 'Topic'},
+        'purpose': {'value': 'Purpose'},
+    }
+
+
+class SyncSlackTeamTestSuite(APITestCase, GenerateModelsMixin):
+    """Test the slack team sync"""
+    def generate_team(self):
+        model = self.generate_models(user=True, academy=True, cohort=True, cohort_user=True, slack_team=True,
+            user_kwargs={'email': 'a@4geeks.co'}, cohort_kwargs={'slug': 'miami-1'})
+        mixer.blend('authenticate.CredentialsSlack', team_id=model['slack_team'].slack_id, token='x')
+        return model
+
+    def test_sync_slack_team_users(self):
+        """Test the members are reconciled page by page"""
+        model = self.generate_team()
+        pages = [
+            slack_page('members', [slack_member('U1', 'a@4geeks.co'), slack_member('B1', 'b@4geeks.co', True)],
+                'next'),
+            slack_page('members', [slack_member('U2', 'c@4geeks.co')]),
+        ]
+
+        with patch('breathecode.services.http.request', MagicMock(side_effect=pages)) as mock:
+            self.assertEqual(sync_slack_team_users(model['slack_team'].id), True)
+            self.assertEqual([x[1]['params'] for x in mock.call_args_list], [
+                {'token': 'x', 'limit': 300},
+                {'token': 'x', 'limit': 300, 'cursor': 'next'},
+            ])
+
+        self.assertEqual([(x.slack_id, x.user_id, x.email, x.real_name, x.synqued_at is not None)
+            for x in SlackUser.objects.order_by('id')], [
+                ('U1', model['user'].id, 'a@4geeks.co', 'User U1', True),
+                ('U2', None, None, None, False),
+            ])
+        self.assertEqual([(x.slack_user.slack_id, x.sync_status) for x in SlackUserTeam.objects.all()],
+            [('U1', 'COMPLETED')])
+
+        model['slack_team'].refresh_from_db()
+        self.assertEqual(model['slack_team'].sync_status, 'COMPLETED')
+        self.assertEqual(model['slack_team'].sync_message, 'Users: 1 created and 0 updated')
+
+        # the second sync only writes when the users were synced
+        with patch('breathecode.services.http.request', MagicMock(return_value=slack_page('members',
+                [slack_member('U1', 'a@4geeks.co')]))):
+            # team, credentials, team status, slack users, cohort users, links, memberships, sync time,
+            # team status
+            with self.assertNumQueries(9):
+                sync_slack_team_users(model['slack_team'].id)
+
+    def test_sync_slack_team_channel(self):
+        """Test the channels are reconciled with its cohorts"""
+        model = self.generate_team()
+        mixer.blend('notify.SlackChannel', slack_id='C2', team=model['slack_team'], name='old')
+
+        with patch('breathecode.services.http.request', MagicMock(return_value=slack_page('channels',
+                [slack_channel('C1', 'miami-1'), slack_channel('C2', 'general')]))):
+            self.assertEqual(sync_slack_team_channel(model['slack_team'].id), True)
+
+        self.assertEqual([(x.slack_id, x.name, x.cohort_id, x.topic, x.sync_status)
+            for x in SlackChannel.objects.order_by('slack_id')], [
+                ('C1', 'miami-1', model['cohort'].id, 'Topic', 'COMPLETED'),
+                ('C2', 'general', None, 'Topic', 'COMPLETED'),
+            ])
+
+        model['slack_team'].refresh_from_db()
+        self.assertEqual(model['slack_team'].sync_message, '2 channels: 1 created and 1 updated')
+
+
+def email(subject='Hello'):
+    return {'subject': subject, 'text': 'Text', 'html': '<p>Text</p>'}
+
+
+def mailgun_response(status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {'id': '<1@mailgun>'}
+    return response
+
+
+@patch('breathecode.notify.tasks.async_send_outbound_emails.delay', MagicMock())
+class OutboundEmailTestSuite(APITestCase):
+    """Test the outbound email queue"""
+    def test_send_outbound_emails_in_batch(self):
+        """Test the emails with the same content go in one request"""
+        queue_email_messages('message', [('a@4geeks.co', email()), ('b@4geeks.co', email()),
+            ('c@4geeks.co', email('Other'))])
+
+        with patch('breathecode.services.http.post', MagicMock(return_value=mailgun_response())) as mock:
+            self.assertEqual(send_outbound_emails(), 3)
+
+        data = [x[1]['data'] for x in mock.call_args_list]
+        self.assertEqual([(x['to'], x['subject'], x.get('recipient-variables')) for x in data], [
+            (['a@4geeks.co', 'b@4geeks.co'], 'Hello', '{"a@4geeks.co": {}, "b@4geeks.co": {}}'),
+            ('c@4geeks.co', 'Other', None),
+        ])
+
+        self.assertEqual(list(OutboundEmail.objects.values_list('status', 'attempts', 'mailgun_id')),
+            [('SENT', 1, '<1@mailgun>')] * 3)
+
+        # nothing left to send
+        with patch('breathecode.services.http.post', MagicMock()) as mock:
+            self.assertEqual(send_outbound_emails(), 0)
+            self.assertEqual(mock.call_count, 0)
+
+    def test_send_outbound_emails_with_retries(self):
+        """Test the failed emails are retried later until they run out of attempts"""
+        queue_email_messages('message', [('a@4geeks.co', email())])
+
+        with patch('breathecode.services.http.post', MagicMock(return_value=mailgun_response(500))):
+            self.assertEqual(send_outbound_emails(), 0)
+
+            outbound_email = OutboundEmail.objects.get()
+            self.assertEqual((outbound_email.status, outbound_email.attempts), ('PENDING', 1))
+            self.assertNotEqual(outbound_email.next_attempt_at, None)
+
+            # the backoff is not over
+            self.assertEqual(send_outbound_emails(), 0)
+            self.assertEqual(OutboundEmail.objects.get().attempts, 1)
+
+            for _ in range(OUTBOUND_EMAIL_MAX_ATTEMPTS - 1):
+                OutboundEmail.objects.update(next_attempt_at=None)
+                send_outbound_emails()
+
+        outbound_email = OutboundEmail.objects.get()
+        self.assertEqual((outbound_email.status, outbound_email.attempts, outbound_email.status_text),
+            ('ERROR', OUTBOUND_EMAIL_MAX_ATTEMPTS, 'Mailgun status code: 500'))
+
+    def test_send_outbound_emails_with_a_bad_request(self):
+        """Test a failed batch is sent one by one and a bad request is not retried"""
+        queue_email_messages('message', [('a@4geeks.co', email()), ('bad', email())])
+
+        def post(url, auth=None, data=None):
+            return mailgun_response(400 if 'bad' in data['to'] else 200)
+
+        with patch('breathecode.services.http.post', MagicMock(side_effect=post)) as mock:
+            self.assertEqual(send_outbound_emails(), 1)
+
+        self.assertEqual([x[1]['data']['to'] for x in mock.call_args_list],
+            [['a@4geeks.co', 'bad'], 'a@4geeks.co', 'bad'])
+
+        self.assertEqual(list(OutboundEmail.objects.values_list('to', 'status', 'attempts', 'status_text')), [
+            ('a@4geeks.co', 'SENT', 1, None),
+            ('bad', 'ERROR', 1, 'Mailgun status code: 400'),
+        ])
+
+    def test_queue_email_messages_after_commit(self):
+        """Test the delivery is scheduled when the transaction is committed"""
+        from breathecode.notify.tasks import async_send_outbound_emails
+        async_send_outbound_emails.delay.reset_mock()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_email_messages('message', [('a@4geeks.co', email())])
+            self.assertEqual(async_send_outbound_emails.delay.call_count, 0)
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(async_send_outbound_emails.delay.call_count, 1)
+
+    @patch.dict('os.environ', {'EMAIL_NOTIFICATIONS_ENABLED': 'TRUE'})
+    @patch('breathecode.notify.actions.get_template_content', MagicMock(return_value=email('Hello ' * 100)))
+    def test_send_email_message_returns_if_it_was_queued(self):
+        """Test send_email_message returns True only when the email was saved"""
+        self.assertEqual(send_email_message('message', 'a@4geeks.co'), True)
+        self.assertEqual(list(OutboundEmail.objects.values_list('to', 'subject')),
+            [('a@4geeks.co', 'Hello ' * 100)])
+
+        with patch.object(OutboundEmail.objects, 'bulk_create', MagicMock(side_effect=DatabaseError())):
+            self.assertEqual(send_email_message('message', 'b@4geeks.co'), False)
+
+        self.assertEqual(OutboundEmail.objects.count(), 1)
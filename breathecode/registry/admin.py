@@ -7,15 +7,20 @@ from breathecode.admissions.admin import CohortAdmin
 from .models import Asset, AssetTranslation, AssetTechnology, AssetAlias
 from .tasks import async_sync_with_github
 from .actions import sync_with_github
+from .caches import AssetCache
 
 logger = logging.getLogger(__name__)
 
 def add_gitpod(modeladmin, request, queryset):
     assets = queryset.update(gitpod=True)
+    # update does not send the post_save signal
+    AssetCache().clear()
 add_gitpod.short_description = "Add GITPOD"
 
 def remove_gitpod(modeladmin, request, queryset):
     assets = queryset.update(gitpod=False)
+    # update does not send the post_save signal
+    AssetCache().clear()
 remove_gitpod.short_description = "Remove GITPOD"
 
 def sync_github(modeladmin, request, queryset):
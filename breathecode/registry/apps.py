@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class FeedbackConfig(AppConfig):
     name = 'breathecode.registry'
+
+    def ready(self):
+        from . import receivers
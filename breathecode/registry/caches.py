@@ -0,0 +1,5 @@
+from breathecode.utils import Cache
+
+class AssetCache(Cache):
+    model = 'Asset'
+    parents = []
@@ -0,0 +1,20 @@
+import logging
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .caches import AssetCache
+from .models import Asset, AssetTechnology, AssetTranslation
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+@receiver(post_save, sender=AssetTechnology)
+@receiver(post_delete, sender=AssetTechnology)
+@receiver(post_save, sender=AssetTranslation)
+@receiver(post_delete, sender=AssetTranslation)
+@receiver(m2m_changed, sender=Asset.technologies.through)
+@receiver(m2m_changed, sender=Asset.translations.through)
+def clear_assets(sender, **kwargs):
+    logger.debug(f"{sender.__name__} was changed, clearing the assets")
+    AssetCache().clear()
@@ -6,7 +6,8 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .serializers import AssetSerializer, AssetBigSerializer, AssetMidSerializer
-from breathecode.utils import ValidationException
+from breathecode.utils import ValidationException, cache_view
+from .caches import AssetCache
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.views import APIView
@@ -40,6 +41,8 @@ class GetAssetView(APIView):
     List all snippets, or create a new snippet.
     """
     permission_classes = [AllowAny]
+
+    @cache_view(AssetCache())
     def get(self, request, asset_slug=None):
         
         if asset_slug is not None:
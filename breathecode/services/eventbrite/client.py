@@ -1,5 +1,6 @@
 import breathecode.services.eventbrite.actions as actions
 import logging, re, os, json, inspect, urllib
+from breathecode.services import http
 # from .decorator import commands, actions
 # from breathecode.services.eventbrite.commands import student, cohort
 # from breathecode.services.eventbrite.actions import monitoring
@@ -28,50 +29,55 @@ class Eventbrite:
         pass
 
     def request(self, _type, url, headers={}, query_string=None):
-        # wonderful way to fix one poor mocking system
-        import requests
-
         _headers = { **self.headers, **headers }
         _query_string = ""
         if query_string is not None:
             _query_string = "?" + urllib.parse.urlencode(query_string)
 
-        response = requests.request(_type, self.host + url + _query_string, headers=_headers)
+        response = http.request(_type, self.host + url + _query_string, headers=_headers)
         result = response.json()
 
         if 'status_code' in result and result['status_code'] >= 400:
             raise Exception(result['error_description'])
 
-        if "pagination" in result:
-            print("has more items?", result["pagination"]["has_more_items"])
-            if result["pagination"]["has_more_items"]:
-                    print("Continuation: ", result["pagination"]["continuation"])
-                    new_result = self.request(_type, url, query_string={ **query_string, "continuation": result["pagination"]["continuation"] })
-                    for key in new_result:
-                        print(key,type(new_result[key]) == "list")
-                        if type(new_result[key]) == "list":
-                            new_result[key] = result[key] + new_result[key]
-                    result.update(new_result)
-
         return result
 
+    def paginate(self, url, key, query_string=None):
+        """
+        Yield the items of each page of a paginated resource, one request
+        per page following the continuation token
+        """
+        query_string = {**(query_string or {})}
+
+        while True:
+            result = self.request('GET', url, query_string=query_string or None)
+            yield result.get(key, [])
+
+            pagination = result.get('pagination', {})
+            if not pagination.get('has_more_items') or not pagination.get('continuation'):
+                break
+
+            logger.debug(f"Continuation of {url}: {pagination['continuation']}")
+            query_string['continuation'] = pagination['continuation']
+
     def get_my_organizations(self):
         data = self.request('GET', f"/users/me/organizations/")
         return data
 
     def get_organization_events(self, organization_id):
-        query_string = { "expand": "organizer", "status": "live" }
-        data = self.request('GET', f"/organizations/{str(organization_id)}/events/", query_string=query_string)
-        return data
+        return {'events': [x for page in self.get_organization_event_pages(organization_id) for x in page]}
+
+    def get_organization_event_pages(self, organization_id):
+        query_string = { "expand": "organizer,venue", "status": "live" }
+        return self.paginate(f"/organizations/{str(organization_id)}/events/", 'events', query_string)
 
     def get_organization_venues(self, organization_id):
-        data = self.request('GET', f"/organizations/{str(organization_id)}/venues/")
-        return data
+        return {'venues': [x for page in self.get_organization_venue_pages(organization_id) for x in page]}
 
-    def execute_action(self, eventbrite_webhook_id: int):
-        # wonderful way to fix one poor mocking system
-        import requests
+    def get_organization_venue_pages(self, organization_id):
+        return self.paginate(f"/organizations/{str(organization_id)}/venues/", 'venues')
 
+    def execute_action(self, eventbrite_webhook_id: int):
         # prevent circular dependency import between thousand modules previuosly loaded and cached
         from breathecode.events.models import EventbriteWebhook
 
@@ -103,7 +109,7 @@ class Eventbrite:
 
         logger.debug(f"Executing => {action}")
         if hasattr(actions, action):
-            response = requests.get(api_url, headers=self.headers)
+            response = http.get(api_url, headers=self.headers)
             json = response.json()
 
             # logger.debug("Eventbrite response")
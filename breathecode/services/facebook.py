@@ -1,4 +1,5 @@
-import requests, logging
+import logging
+from breathecode.services import http
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ class Facebook:
                 **params,
             }
 
-        resp = requests.request(method=method_name,url=self.HOST+action_name, headers=self.headers, params=params, json=json)
+        resp = http.request(method=method_name,url=self.HOST+action_name, headers=self.headers, params=params, json=json)
         
         if resp.status_code == 200:
             data = resp.json()
@@ -1,17 +1,35 @@
-import logging
+import logging, threading
 from google.cloud import datastore
 from .credentials import resolve_credentials
 
 logger = logging.getLogger(__name__)
 
+__lock__ = threading.Lock()
+__state__ = {'client': None}
+
+
+def get_client():
+    """Client shared by the whole process, it is built the first time that it is used"""
+    with __lock__:
+        if __state__['client'] is None:
+            resolve_credentials()
+            __state__['client'] = datastore.Client()
+
+        return __state__['client']
+
+
+def reset():
+    """Forget the shared client, the tests build it again with its mocks"""
+    with __lock__:
+        __state__['client'] = None
+
 
 class Datastore:
     """Google Cloud Storage"""
     client = None
 
     def __init__(self):
-        resolve_credentials()
-        self.client = datastore.Client()
+        self.client = get_client()
 
     def fetch(self, **kwargs):
         """Get Fetch object
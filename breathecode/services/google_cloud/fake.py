@@ -0,0 +1,79 @@
+"""
+Local backend of Google Cloud Storage, the blobs are kept in memory, it is
+used in development (GOOGLE_CLOUD_STORAGE_BACKEND=local) and in the tests
+"""
+import threading
+from contextlib import contextmanager
+
+__lock__ = threading.Lock()
+__buckets__ = {}
+
+
+class FakeBlob:
+    chunk_size = None
+
+    def __init__(self, name, bucket):
+        self.name = name
+        self.bucket = bucket
+        self.content = None
+        self.content_type = None
+
+    @property
+    def public_url(self):
+        return f'https://storage.googleapis.com/{self.bucket.name}/{self.name}'
+
+    def upload_from_string(self, data, content_type=None):
+        self.content = data.encode('utf-8') if isinstance(data, str) else data
+        self.content_type = content_type
+        self.bucket.files[self.name] = self
+
+    def upload_from_file(self, file_obj, rewind=False, content_type=None):
+        if rewind:
+            file_obj.seek(0)
+
+        self.upload_from_string(file_obj.read(), content_type=content_type)
+
+    def download_as_bytes(self):
+        return self.content
+
+    def make_public(self):
+        return None
+
+    def generate_signed_url(self, version='v4', expiration=None, method='GET'):
+        return f'{self.public_url}?X-Goog-Signature=local'
+
+    def delete(self):
+        self.bucket.delete_blob(self.name)
+
+
+class FakeBucket:
+    def __init__(self, name):
+        self.name = name
+
+        with __lock__:
+            self.files = __buckets__.setdefault(name, {})
+
+    def blob(self, blob_name, chunk_size=None):
+        return FakeBlob(blob_name, self)
+
+    def get_blob(self, blob_name):
+        return self.files.get(blob_name)
+
+    def delete_blob(self, blob_name):
+        self.files.pop(blob_name, None)
+
+
+class FakeClient:
+    def bucket(self, bucket_name):
+        return FakeBucket(bucket_name)
+
+    @contextmanager
+    def batch(self):
+        yield self
+
+
+def clear():
+    """Remove all the blobs"""
+    with __lock__:
+        for files in __buckets__.values():
+            files.clear()
@@ -5,28 +5,60 @@ logger = logging.getLogger(__name__)
 
 class File:
     """Google Cloud Storage"""
+    # the resumable uploads are sent in chunks of a multiple of 256 KB
+    chunk_size = 8 * 1024 * 1024
     bucket = None
-    blob = None
     file_name = None
 
     def __init__(self, bucket, file_name: str):
         self.file_name = file_name
         self.bucket = bucket
-        self.blob = bucket.get_blob(file_name)
+        self._blob = None
+        self._fetched = False
+
+    @property
+    def blob(self):
+        """The Blob is fetched the first time that it is read, None if it does not exist"""
+        if not self._fetched:
+            self._blob = self.bucket.get_blob(self.file_name)
+            self._fetched = True
+
+        return self._blob
+
+    @blob.setter
+    def blob(self, value):
+        self._blob = value
+        self._fetched = True
 
     def delete(self):
         """Delete Blob from Bucker"""
-        if self.blob:
-            self.blob.delete()
+        from google.api_core.exceptions import NotFound
 
-    def upload(self, content: str, public=False):
-        """Delete Blob from Bucker"""
+        try:
+            self.bucket.delete_blob(self.file_name)
+        except NotFound:
+            pass
+
+        self.blob = None
+
+    def upload(self, content, public=False, content_type=None):
+        """Upload a string or stream a file object to the Blob"""
         self.blob = self.bucket.blob(self.file_name)
-        self.blob.upload_from_string(content)
+
+        if hasattr(content, 'read'):
+            self.blob.chunk_size = self.chunk_size
+            self.blob.upload_from_file(content, rewind=True, content_type=content_type)
+        else:
+            self.blob.upload_from_string(content)
 
         if public:
             self.blob.make_public()
 
+    def signed_url(self, expiration) -> str:
+        """Short lived url to read the Blob without making it public"""
+        blob = self._blob or self.bucket.blob(self.file_name)
+        return blob.generate_signed_url(version='v4', expiration=expiration, method='GET')
+
     def url(self) -> str:
         """Delete Blob from Bucker"""
         # TODO Private url
@@ -1,18 +1,65 @@
-import logging
+import logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from .credentials import resolve_credentials
 from .file import File
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_WORKERS = 4
+
+# google cloud storage accepts at most 1000 calls in one batch request
+DELETE_BATCH_SIZE = 1000
+
+__lock__ = threading.Lock()
+__state__ = {'client': None, 'buckets': {}}
+
+
+def __get_client_class__():
+    if settings.GOOGLE_CLOUD_STORAGE_BACKEND == 'local':
+        from .fake import FakeClient
+        return FakeClient
+
+    from google.cloud import storage
+    resolve_credentials()
+    return storage.Client
+
+
+def get_client():
+    """Client shared by the whole process, it is built the first time that it is used"""
+    with __lock__:
+        if __state__['client'] is None:
+            __state__['client'] = __get_client_class__()()
+
+        return __state__['client']
+
+
+def reset():
+    """Forget the shared client and its buckets, the tests build them again with its mocks"""
+    with __lock__:
+        __state__['client'] = None
+        __state__['buckets'] = {}
+
+
+def get_bucket(bucket_name: str):
+    """Bucket handle of the shared client, it does not fetch the metadata of the bucket"""
+    client = get_client()
+
+    with __lock__:
+        bucket = __state__['buckets'].get(bucket_name)
+        if bucket is None:
+            bucket = client.bucket(bucket_name)
+            __state__['buckets'][bucket_name] = bucket
+
+        return bucket
+
 
 class Storage:
     """Google Cloud Storage"""
     client = None
 
     def __init__(self):
-        from google.cloud import storage
-        resolve_credentials()
-        self.client = storage.Client()
+        self.client = get_client()
 
     def file(self, bucket_name: str, file_name: str):
         """Get File object
@@ -24,5 +71,45 @@ class Storage:
         Returns:
             File: File object
         """
-        bucket = self.client.bucket(bucket_name)
-        return File(bucket, file_name)
+        return File(get_bucket(bucket_name), file_name)
+
+    def upload_files(self, bucket_name: str, files: dict, public=False):
+        """Upload many files concurrently
+
+        Args:
+            bucket_name (str): Name of bucket in Google Cloud Storage
+            files (dict): Content of each blob by name, strings or file objects
+            public (bool): Make the blobs public
+
+        Returns:
+            dict: File object of each blob by name
+        """
+        def upload(file_name):
+            content = files[file_name]
+            file = self.file(bucket_name, file_name)
+            file.upload(content, public=public, content_type=getattr(content, 'content_type', None))
+            return file
+
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            return dict(zip(files, executor.map(upload, files)))
+
+    def delete_files(self, bucket_name: str, file_names: list):
+        """Delete many blobs in batch requests, the missing blobs are ignored
+
+        Args:
+            bucket_name (str): Name of bucket in Google Cloud Storage
+            file_names (list): Names of the blobs
+        """
+        from google.api_core.exceptions import NotFound
+
+        bucket = get_bucket(bucket_name)
+
+        for index in range(0, len(file_names), DELETE_BATCH_SIZE):
+            # every call of the batch is sent, a missing blob is raised when it finishes
+            try:
+                with self.client.batch():
+                    for file_name in file_names[index:index + DELETE_BATCH_SIZE]:
+                        bucket.delete_blob(file_name)
+
+            except NotFound:
+                logger.debug(f'Some of the blobs of {bucket_name} were already deleted')
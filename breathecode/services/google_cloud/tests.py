@@ -0,0 +1,67 @@
+"""
+Test Storage with the local backend
+"""
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+from django.test import SimpleTestCase, override_settings
+from google.api_core.exceptions import NotFound
+from . import fake
+from .storage import Storage, get_client, get_bucket
+
+
+@override_settings(GOOGLE_CLOUD_STORAGE_BACKEND='local')
+class StorageTestSuite(SimpleTestCase):
+    """Test Storage with the local backend"""
+    def setUp(self):
+        fake.clear()
+
+    def test_client_and_bucket_are_shared(self):
+        """Test the client and the bucket handles are built once"""
+        self.assertIs(Storage().client, Storage().client)
+        self.assertIs(get_client(), Storage().client)
+        self.assertIs(get_bucket('bucket'), get_bucket('bucket'))
+
+    def test_file_is_fetched_lazily(self):
+        """Test the blob metadata is fetched only when it is read"""
+        with patch.object(fake.FakeBucket, 'get_blob', wraps=get_bucket('bucket').get_blob) as mock:
+            file = Storage().file('bucket', 'a')
+            file.upload('content')
+            self.assertEqual(file.url(), 'https://storage.googleapis.com/bucket/a')
+            self.assertEqual(mock.call_count, 0)
+
+            self.assertEqual(Storage().file('bucket', 'a').blob.download_as_bytes(), b'content')
+            self.assertEqual(mock.call_count, 1)
+
+    def test_upload_and_delete_files(self):
+        """Test the files are uploaded and deleted in batch"""
+        storage = Storage()
+        files = storage.upload_files('bucket', {'a': 'A', 'b': 'B', 'c': 'C'})
+
+        self.assertEqual(sorted(files), ['a', 'b', 'c'])
+        self.assertEqual(sorted(get_bucket('bucket').files), ['a', 'b', 'c'])
+
+        storage.delete_files('bucket', ['a', 'b', 'missing'])
+        self.assertEqual(list(get_bucket('bucket').files), ['c'])
+        self.assertEqual(storage.file('bucket', 'a').blob, None)
+
+    @patch('breathecode.services.google_cloud.storage.DELETE_BATCH_SIZE', 2)
+    def test_delete_files_in_chunks(self):
+        """Test each batch has at most DELETE_BATCH_SIZE calls and a missing blob doesn't stop the rest"""
+        storage = Storage()
+        storage.upload_files('bucket', {'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D'})
+        bucket = get_bucket('bucket')
+        batches = []
+
+        @contextmanager
+        def batch():
+            batches.append([])
+            yield storage.client
+
+            # like google cloud storage, the 404 of a call is raised when the batch finishes
+            raise NotFound('missing')
+
+        with patch.object(bucket, 'delete_blob', MagicMock(side_effect=lambda x: batches[-1].append(x))), \
+                patch.object(storage.client, 'batch', batch):
+            storage.delete_files('bucket', ['a', 'b', 'missing', 'c'])
+
+        self.assertEqual(batches, [['a', 'b'], ['missing', 'c']])
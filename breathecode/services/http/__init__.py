@@ -0,0 +1 @@
+from .client import HttpClient, client, request, get, post, put, delete, metrics
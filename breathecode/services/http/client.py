@@ -0,0 +1,170 @@
+import logging, threading, time
+import requests
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['HttpClient', 'client', 'request', 'get', 'post', 'put', 'delete', 'metrics']
+
+DEFAULT_TIMEOUT = (5, 30)
+RETRY_STATUSES = [429, 502, 503, 504]
+IDEMPOTENT_METHODS = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+
+# the requests that run inside a view also wait for the retries, a longer
+# Retry-After is cut to it
+MAX_RETRY_AFTER = 5
+
+
+class HttpClient:
+    """
+    Keep-alive sessions pooled per host, with a default timeout, retries with
+    backoff (that honour the Retry-After of a 429) and latency/error metrics
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5, pool_size=10):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+
+        self._sessions = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+
+        return session
+
+    def __record__(self, url, started_at, status_code=None, retried=False):
+        latency = time.monotonic() - started_at
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            data = self._metrics.setdefault(host, {'requests': 0, 'errors': 0, 'retries': 0,
+                'total_latency': 0.0, 'max_latency': 0.0})
+
+            data['requests'] += 1
+            data['total_latency'] += latency
+            data['max_latency'] = max(data['max_latency'], latency)
+
+            if status_code is None or status_code >= 500:
+                data['errors'] += 1
+
+            if retried:
+                data['retries'] += 1
+
+        logger.debug(f'{host} answered {status_code} in {latency:.3f}s')
+
+    def __retry_after__(self, response, attempt):
+        value = response.headers.get('Retry-After') if response is not None else None
+
+        if value:
+            try:
+                seconds = float(value)
+            except ValueError:
+                try:
+                    seconds = parsedate_to_datetime(value).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    seconds = None
+
+            if seconds is not None:
+                return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+        return self.backoff * (2 ** attempt)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            started_at = time.monotonic()
+            try:
+                response = self.session(url).request(method, url, **kwargs)
+
+            # a request that could have reached the server is not sent twice
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                retry = attempt < self.retries and (idempotent or
+                    isinstance(e, requests.exceptions.ConnectTimeout))
+                self.__record__(url, started_at, retried=retry)
+
+                if not retry:
+                    raise
+
+                time.sleep(self.__retry_after__(None, attempt))
+                attempt += 1
+                continue
+
+            # the 429 was not processed, it is safe to retry any method
+            retry = (attempt < self.retries and response.status_code in RETRY_STATUSES and
+                (idempotent or response.status_code == 429))
+
+            self.__record__(url, started_at, response.status_code, retried=retry)
+
+            if not retry:
+                return response
+
+            logger.warning(f'{method} {url} answered {response.status_code}, retrying')
+
+            # give back the connection to the pool before waiting, a streamed body holds it
+            response.close()
+            time.sleep(self.__retry_after__(response, attempt))
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def metrics(self):
+        with self._lock:
+            return {host: {**data, 'avg_latency': data['total_latency'] / data['requests']}
+                for host, data in self._metrics.items() if data['requests']}
+
+
+# shared by all the integrations, the connections are reused between calls
+client = HttpClient()
+
+
+def request(method, url, **kwargs):
+    return client.request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return client.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return client.post(url, **kwargs)
+
+
+def put(url, **kwargs):
+    return client.put(url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return client.delete(url, **kwargs)
+
+
+def metrics():
+    return client.metrics()
@@ -0,0 +1,84 @@
+"""
+Test HttpClient
+"""
+import requests
+from unittest import TestCase
+from unittest.mock import MagicMock, patch, call
+from .client import HttpClient, MAX_RETRY_AFTER
+
+
+def response(status_code=200, headers={}):
+    result = MagicMock()
+    result.status_code = status_code
+    result.headers = headers
+    return result
+
+
+class HttpClientTestSuite(TestCase):
+    """Test HttpClient"""
+
+    @patch('time.sleep', MagicMock())
+    @patch('requests.Session.request', MagicMock(return_value=response()))
+    def test_request_with_default_timeout(self):
+        """Test the timeout is added and the session is reused per host"""
+        client = HttpClient()
+        client.get('https://api.mailgun.net/v3/a')
+        client.post('https://api.mailgun.net/v3/b', data={'a': 1})
+        client.get('https://slack.com/api/c', timeout=1)
+
+        self.assertEqual(requests.Session.request.call_args_list, [
+            call('GET', 'https://api.mailgun.net/v3/a', timeout=(5, 30)),
+            call('POST', 'https://api.mailgun.net/v3/b', data={'a': 1}, timeout=(5, 30)),
+            call('GET', 'https://slack.com/api/c', timeout=1),
+        ])
+        self.assertEqual(len(client._sessions), 2)
+        self.assertEqual(client.metrics()['api.mailgun.net']['requests'], 2)
+
+    @patch('time.sleep', MagicMock())
+    @patch('requests.Session.request', MagicMock(side_effect=[
+        response(429, {'Retry-After': '4'}), response(503), response(200)]))
+    def test_request_retry_with_retry_after(self):
+        """Test a 429 and a 503 are retried, the Retry-After is honoured"""
+        import time
+
+        result = HttpClient(backoff=0.5).get('https://slack.com/api/a')
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(requests.Session.request.call_count, 3)
+        self.assertEqual(time.sleep.call_args_list, [call(4.0), call(1.0)])
+
+    @patch('time.sleep', MagicMock())
+    def test_request_retry_closes_the_response(self):
+        """Test the response is closed before waiting for the retry and a long Retry-After is cut"""
+        import time
+        responses = [response(429, {'Retry-After': '120'}), response(200)]
+
+        with patch('requests.Session.request', MagicMock(side_effect=responses)):
+            result = HttpClient().get('https://slack.com/api/a', stream=True)
+
+        self.assertEqual(result, responses[1])
+        self.assertEqual(responses[0].close.call_count, 1)
+        self.assertEqual(responses[1].close.call_count, 0)
+        self.assertEqual(time.sleep.call_args_list, [call(MAX_RETRY_AFTER)])
+
+    @patch('time.sleep', MagicMock())
+    @patch('requests.Session.request', MagicMock(side_effect=[response(503), response(200)]))
+    def test_request_post_is_not_retried(self):
+        """Test a POST that could be processed is not sent twice"""
+        result = HttpClient().post('https://slack.com/api/a')
+
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(requests.Session.request.call_count, 1)
+
+    @patch('time.sleep', MagicMock())
+    @patch('requests.Session.request', MagicMock(side_effect=requests.exceptions.ConnectionError()))
+    def test_request_connection_error(self):
+        """Test the connection errors are retried until the retries are exhausted"""
+        client = HttpClient(retries=2)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get('https://slack.com/api/a')
+
+        self.assertEqual(requests.Session.request.call_count, 3)
+        self.assertEqual(client.metrics()['slack.com']['errors'], 3)
+        self.assertEqual(client.metrics()['slack.com']['retries'], 2)
@@ -1,4 +1,5 @@
-import requests, logging, re, os, json, inspect
+import logging, re, os, json, inspect
+from breathecode.services import http
 from .decorator import commands, actions
 from breathecode.services.slack.commands import student, cohort
 from breathecode.services.slack.actions import monitoring
@@ -17,6 +18,24 @@ class Slack:
     def post(self, action_name, request_data={}):
         return self._call("POST", action_name, json=request_data)
 
+    def paginate(self, action_name, key, request_data={}):
+        """
+        Yield the items of each page of a cursor paginated method, one request
+        per page following the next_cursor
+        """
+        request_data = {**request_data}
+
+        while True:
+            data = self.get(action_name, request_data)
+            yield data.get(key, [])
+
+            cursor = data.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+
+            logger.debug(f"Next cursor of {action_name}: {cursor}")
+            request_data['cursor'] = cursor
+
     def _call(self, method_name, action_name, params=None, json=None):
 
         if self.token is None:
@@ -33,7 +52,7 @@ class Slack:
                 **params,
             }
 
-        resp = requests.request(method=method_name,url=self.HOST+action_name, headers=self.headers,
+        resp = http.request(method=method_name,url=self.HOST+action_name, headers=self.headers,
             params=params, json=json)
 
         if resp.status_code == 200:
@@ -100,7 +119,7 @@ class Slack:
             response = getattr(_class, method)(payload=payload) # call action method
 
             if "response_url" in payload and response:
-                resp = requests.post(payload["response_url"], json=response)
+                resp = http.post(payload["response_url"], json=response)
                 return resp.status_code == 200
             else:
                 return True
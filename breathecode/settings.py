@@ -84,6 +84,7 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
         'rest_framework_csv.renderers.CSVRenderer',
+        'breathecode.utils.streaming_export.NDJSONRenderer',
     ),
 }
 
@@ -311,6 +312,15 @@ CACHES = {
 
 CACHE_MIDDLEWARE_SECONDS = 60 * int(os.getenv('CACHE_MIDDLEWARE_MINUTES', 120))
 
+# how the masked media is served: proxy, signed (redirect to a signed url of
+# the bucket) or accel (X-Accel-Redirect to an internal location of nginx)
+MEDIA_MASKING_MODE = os.getenv('MEDIA_MASKING_MODE', 'proxy')
+MEDIA_SIGNED_URL_MINUTES = int(os.getenv('MEDIA_SIGNED_URL_MINUTES', 15))
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/internal-media/')
+
+# gcs or local, the local backend keeps the blobs in memory
+GOOGLE_CLOUD_STORAGE_BACKEND = os.getenv('GOOGLE_CLOUD_STORAGE_BACKEND', 'gcs')
+
 # Simplified static file serving.
 # https://warehouse.python.org/project/whitenoise/
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -8,5 +8,5 @@ class MarketingQueriesMixin():
         return {
             'module': 'marketing',
             'models': ['ActiveCampaignAcademy', 'Automation', 'Tag', 'Contact',
-                'FormEntry', 'ShortLink']
+                'FormEntry', 'ShortLink', 'LeadReportRollup']
         }
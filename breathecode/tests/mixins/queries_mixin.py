@@ -0,0 +1,19 @@
+"""
+Queries mixin
+"""
+from contextlib import contextmanager
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+class QueriesMixin():
+    """Queries mixin"""
+
+    @contextmanager
+    def assertMaxNumQueries(self, num, using='default'):
+        """Assert that the block doesn't run more than `num` queries"""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        self.assertLessEqual(executed, num, f'{executed} queries executed, {num} expected at most:\n' +
+            '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(context.captured_queries, start=1)))
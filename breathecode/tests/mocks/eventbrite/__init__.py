@@ -9,7 +9,7 @@ from .constants import (EVENTBRITE_EVENT, EVENTBRITE_ORDER, EVENTBRITE_ATTENDEE,
 
 
 EVENTBRITE_PATH = {
-    'get': 'requests.get',
+    'get': 'breathecode.services.http.get',
 }
 
 EVENTBRITE_INSTANCES = {
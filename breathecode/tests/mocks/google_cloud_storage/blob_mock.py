@@ -12,9 +12,19 @@ class BlobMock():
         self.content = data
         return None
 
+    def upload_from_file(self, file_obj, rewind=False, content_type=None):
+        if rewind:
+            file_obj.seek(0)
+
+        self.content = file_obj.read()
+        return None
+
     def make_public(self):
         self.public_url = f'https://storage.cloud.google.com/{self.bucket.name}/{self.name}'
 
+    def generate_signed_url(self, version='v4', expiration=None, method='GET'):
+        return f'https://storage.googleapis.com/{self.bucket.name}/{self.name}?X-Goog-Signature=signature'
+
     def delete(self):
         return None
 
@@ -16,5 +16,8 @@ class BucketMock():
         self.files[blob_name] = Blob(blob_name, self)
         return self.files[blob_name]
 
+    def delete_blob(self, blob_name):
+        self.files.pop(blob_name, None)
+
     def delete(self):
         return None
@@ -5,7 +5,7 @@ from unittest.mock import Mock
 from .requests_mock import post_mock
 
 MAILGUN_PATH = {
-    'post': 'requests.post',
+    'post': 'breathecode.services.http.post',
 }
 
 MAILGUN_INSTANCES = {
@@ -8,7 +8,7 @@ from .constants import (OLD_BREATHECODE_ADMIN, OLD_BREATHECODE_ADMIN_URL, CONTAC
 
 
 OLD_BREATHECODE_PATH = {
-    'request': 'requests.request',
+    'request': 'breathecode.services.http.request',
 }
 
 OLD_BREATHECODE_INSTANCES = {
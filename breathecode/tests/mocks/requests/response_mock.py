@@ -1,5 +1,15 @@
 import json
 
+class RawMock():
+    """Simulate the urllib3 response of a streamed Response"""
+    def __init__(self, content):
+        self.content = content.encode('utf-8') if isinstance(content, str) else content
+
+    def stream(self, amt=2**16, decode_content=None):
+        for index in range(0, len(self.content), amt):
+            yield self.content[index:index + amt]
+
+
 class ResponseMock():
     """Simutate Response to be used by mocks"""
     status_code = None
@@ -16,10 +26,9 @@ class ResponseMock():
     def __init__(self, status_code=200, data='', url=''):
         self.status_code = status_code
         self.reason = 'OK'
-        self.raw = data
         self.url = url
 
-        if isinstance(data, str):
+        if isinstance(data, (str, bytes)):
             self.content = data
             self.text = data
         else:
@@ -29,6 +38,11 @@ class ResponseMock():
             self.content = content
             self.text = content
 
+        self.raw = RawMock(self.content)
+
+    def close(self):
+        return None
+
     def json(self) -> dict:
         """Convert Response to JSON"""
         return self.data
@@ -5,7 +5,7 @@ from unittest.mock import Mock
 from .requests_mock import request_mock
 
 SLACK_PATH = {
-    'request': 'requests.request',
+    'request': 'breathecode.services.http.request',
 }
 
 SLACK_INSTANCES = {
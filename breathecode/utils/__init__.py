@@ -6,10 +6,15 @@ from .admin_export_csv_mixin import AdminExportCsvMixin
 from .attr_dict import AttrDict
 from .breathecode_exception_handler import breathecode_exception_handler
 from .cache import Cache
+from .cache_view import cache_view
+from .hit_counter import HitCounter
+from .academy_capabilities import AcademyCapabilitiesCache, get_academy_capabilities
 from .capable_of import capable_of
+from .eager_load import eager_load, get_eager_load_plan
 from .header_limit_offset_pagination import HeaderLimitOffsetPagination
 from .localize_query import localize_query
 from .permissions import permissions
 from .script_notification import ScriptNotification
+from .streaming_export import NDJSONRenderer, export_response, get_export_format
 from .validation_exception import ValidationException, APIException
 from .generate_lookups_mixin import GenerateLookupsMixin
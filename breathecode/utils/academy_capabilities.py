@@ -0,0 +1,40 @@
+from breathecode.authenticate.models import ProfileAcademy
+from .cache import Cache
+
+
+class AcademyCapabilitiesCache(Cache):
+    model = 'ProfileAcademy'
+    parents = []
+
+
+def get_academy_capabilities(request) -> dict[int, set[str]]:
+    """
+    Return the capabilities of the request user grouped by academy, the map
+    is resolved once per request and shared between processes through the
+    cache until one ProfileAcademy or Role changes
+    """
+
+    capabilities = getattr(request, '_academy_capabilities', None)
+    if capabilities is not None:
+        return capabilities
+
+    cache = AcademyCapabilitiesCache()
+    user_id = request.user.id
+
+    data = cache.get(user_id=user_id)
+    if data is None:
+        data = {}
+        items = ProfileAcademy.objects.filter(user__id=user_id).values_list('academy__id',
+            'role__capabilities__slug')
+
+        for academy_id, capability in items:
+            # the academy is kept even if its role doesn't have any capability
+            data.setdefault(str(academy_id), [])
+            if capability:
+                data[str(academy_id)].append(capability)
+
+        cache.set(data, user_id=user_id)
+
+    capabilities = {int(academy_id): set(data[academy_id]) for academy_id in data}
+    setattr(request, '_academy_capabilities', capabilities)
+    return capabilities
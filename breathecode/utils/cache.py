@@ -1,55 +1,65 @@
-import urllib.parse, json, re, os
-from django.core.cache import cache, caches
+import urllib.parse, json, time
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from datetime import datetime
 from breathecode.tests.mixins import DatetimeMixin
 
 
 class Cache(DatetimeMixin):
+    """
+    Namespaced cache, each model has a version counter that is folded into
+    every key, clear() bumps the counter and the old keys just expire.
+    """
     model: str
     parents: list[str]
 
-    def __generate_key__(self, storage_key=False, parent='', **kwargs):
-        key = self.model if not parent else parent
+    # seconds that each entry is kept, for the results that change with the time
+    timeout = DEFAULT_TIMEOUT
 
-        if storage_key:
-            return f'{key}__keys'
+    def __version_key__(self, model=''):
+        return f'{model or self.model}__version'
 
-        credentials = urllib.parse.urlencode(kwargs)
-        return f'{key}__{credentials}'
-
-    def __add_key_to_storage__(self, key: str):
-        storage_key = self.__generate_key__(storage_key=True)
+    def __seed_version__(self):
+        # if the counter was evicted, never go back to a version already used, the
+        # counter can't be bumped faster than once per nanosecond
+        return time.time_ns()
 
-        json_data = cache.get(storage_key)
-        keys = json.loads(json_data) if json_data else []
+    def __get_version__(self, model=''):
+        key = self.__version_key__(model)
+        version = cache.get(key)
 
-        keys.append(key)
+        if version is None:
+            cache.add(key, self.__seed_version__(), timeout=None)
+            version = cache.get(key)
 
-        json_data = json.dumps(keys)
-        cache.set(storage_key, json_data)
-
-    def keys(self):
-        # we get key from cache to support multiprocess
-        key = self.__generate_key__(storage_key=True)
-        json_data = cache.get(key)
-        return json.loads(json_data) if json_data else []
+        return version
 
-    def __clear_one__(self, parent=''):
-        # we get key from cache to support multiprocess
-        storage_key = self.__generate_key__(storage_key=True, parent=parent)
-        keys = self.keys()
+    def __bump_version__(self, model=''):
+        key = self.__version_key__(model)
 
-        for key in keys:
-            cache.set(key, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # other process could have seeded the counter in the meantime
+            if not cache.add(key, self.__seed_version__(), timeout=None):
+                cache.incr(key)
 
-        cache.set(storage_key, None)
+    def __generate_key__(self, version=None, **kwargs):
+        version = version or self.__get_version__()
+        credentials = urllib.parse.urlencode(kwargs)
+        return f'{self.model}__v{version}__{credentials}'
 
     def clear(self):
-        # we get key from cache to support multiprocess
+        # one increment per namespace, whatever the number of cached keys
         for parent in self.parents:
-            self.__clear_one__(parent)
+            self.__bump_version__(parent)
+
+        self.__bump_version__()
 
-        self.__clear_one__()
+    def delete(self, *items):
+        """Remove the entries of each dict of kwargs, the rest of the namespace is kept"""
+        version = self.__get_version__()
+        cache.delete_many([self.__generate_key__(version, **x) for x in items])
 
     def get(self, **kwargs) -> dict:
         key = self.__generate_key__(**kwargs)
@@ -84,6 +94,4 @@ class Cache(DatetimeMixin):
         data = self.__fix_fields_in_array__(data)
 
         json_data = json.dumps(data)
-        cache.set(key, json_data)
-
-        self.__add_key_to_storage__(key)
+        cache.set(key, json_data, self.timeout)
@@ -0,0 +1,83 @@
+import functools, hashlib, json, urllib.parse
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag, parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+VARY_HEADERS = ['Accept', 'Authorization', 'Academy']
+
+
+def __get_request__(args):
+    # function views receive the request first, the methods of the views receive self first
+    for arg in args[:2]:
+        if isinstance(arg, (Request, HttpRequest)):
+            return arg
+
+    raise Exception("Missing request information, please apply this decorator to views only")
+
+
+def __get_cache_kwargs__(request):
+    is_anonymous = isinstance(request.user, AnonymousUser)
+    return {
+        'path': request.path,
+        'query': urllib.parse.urlencode(sorted(request.GET.lists()), doseq=True),
+        'accept': request.META.get('HTTP_ACCEPT', ''),
+        'academy': request.META.get('HTTP_ACADEMY', ''),
+        'user': '' if is_anonymous else request.user.id,
+    }
+
+
+def cache_view(cache, max_age=60):
+    """
+    Cache the successful GET responses of a view in the namespace of `cache`,
+    they vary on the path, the query string, the Accept header and the user,
+    the namespace is cleared by the receivers of the models it depends on.
+
+    The responses have an ETag and the anonymous ones can be kept by a CDN
+    for `max_age` seconds.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            request = __get_request__(args)
+            if request.method != 'GET':
+                return function(*args, **kwargs)
+
+            cache_kwargs = __get_cache_kwargs__(request)
+            entry = cache.get(**cache_kwargs)
+
+            if entry is None:
+                response = function(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+                    return response
+
+                body = JSONRenderer().render(response.data)
+                entry = {
+                    'data': json.loads(body),
+                    'etag': hashlib.md5(body).hexdigest(),
+                    'headers': {k: v for k, v in response.items() if k.lower() != 'content-type'},
+                }
+                cache.set(entry, **cache_kwargs)
+
+            etag = quote_etag(entry['etag'])
+            if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=entry['headers'])
+            else:
+                response = Response(entry['data'], headers=entry['headers'])
+
+            response['ETag'] = etag
+            patch_vary_headers(response, VARY_HEADERS)
+
+            # the responses of an user must not be kept by a shared cache
+            if cache_kwargs['user']:
+                patch_cache_control(response, private=True, max_age=max_age)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+
+            return response
+        return wrapper
+    return decorator
@@ -1,7 +1,7 @@
 from rest_framework.exceptions import PermissionDenied
-from breathecode.authenticate.models import ProfileAcademy
 from django.contrib.auth.models import AnonymousUser
 from .validation_exception import ValidationException
+from .academy_capabilities import get_academy_capabilities
 
 def capable_of(capability=None):
     def decorator(function):
@@ -33,8 +33,8 @@ def capable_of(capability=None):
             if isinstance(request.user, AnonymousUser):
                 raise PermissionDenied("Invalid user")
 
-            capable = ProfileAcademy.objects.filter(user=request.user.id, academy__id=academy_id, role__capabilities__slug=capability)
-            if capable.count() > 0:
+            capabilities = get_academy_capabilities(request)
+            if capability in capabilities.get(int(academy_id), set()):
                 kwargs['academy_id'] = academy_id
                 return function(*args, **kwargs)
 
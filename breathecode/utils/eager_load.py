@@ -0,0 +1,54 @@
+import serpy
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+
+
+@lru_cache(maxsize=None)
+def get_eager_load_plan(serializer, model, prefix=''):
+    """
+    Walk the nested serpy serializers to know what relations will be read,
+    MethodFields can't be inspected so the serializer can declare the
+    relations they use in `select_related` and `prefetch_related`
+    """
+
+    select_related = [prefix + x for x in getattr(serializer, 'select_related', [])]
+    prefetch_related = [prefix + x for x in getattr(serializer, 'prefetch_related', [])]
+
+    for name, field in serializer._field_map.items():
+        if not isinstance(field, serpy.Serializer):
+            continue
+
+        attr = field.attr or name
+        try:
+            relation = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            continue
+
+        if not relation.is_relation:
+            continue
+
+        path = prefix + attr
+        nested_select, nested_prefetch = get_eager_load_plan(type(field), relation.related_model,
+            path + '__')
+
+        if relation.many_to_one or relation.one_to_one:
+            select_related += [path, *nested_select]
+            prefetch_related += nested_prefetch
+
+        # everything below a prefetched relation must be prefetched too
+        else:
+            prefetch_related += [path, *nested_select, *nested_prefetch]
+
+    return tuple(select_related), tuple(prefetch_related)
+
+
+def eager_load(queryset, serializer):
+    select_related, prefetch_related = get_eager_load_plan(serializer, queryset.model)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+
+    return queryset
@@ -1,15 +1,30 @@
+import base64, json
 from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.utils.urls import replace_query_param, remove_query_param
+from .validation_exception import ValidationException
 
 
 class HeaderLimitOffsetPagination(LimitOffsetPagination):
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    # the view can set it, otherwise the first field of the queryset ordering is used
+    cursor_ordering = None
 
     def paginate_queryset(self, queryset, request, view=None):
         self.use_envelope = True
         if str(request.GET.get('envelope')).lower() in ['false', '0']:
             self.use_envelope = False
+
+        self.use_cursor = self.cursor_query_param in request.GET
+        if self.use_cursor:
+            return self.__paginate_by_cursor__(queryset, request)
+
         return super().paginate_queryset(queryset, request, view)
 
     def __parse_comma__(self, string: str):
@@ -18,6 +33,109 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
 
         return string.replace('%2C', ',')
 
+    def __get_cursor_ordering__(self, queryset):
+        ordering = self.cursor_ordering
+        if ordering is None:
+            ordering = next(iter(queryset.query.order_by or queryset.model._meta.ordering), '-pk')
+
+        if not isinstance(ordering, str):
+            ordering = '-pk'
+
+        descending = ordering.startswith('-')
+        name = ordering.lstrip('-')
+
+        if name == 'pk':
+            return 'pk', descending
+
+        try:
+            field = queryset.model._meta.get_field(name)
+
+        # lookups through relations are not supported, the primary key is used instead
+        except FieldDoesNotExist:
+            return 'pk', descending
+
+        if field.primary_key:
+            return 'pk', descending
+
+        # a null can't be compared with lt/gt, the rows with it would be skipped
+        if field.null:
+            raise ValidationException(f'Cursor pagination is not supported with the ordering {ordering}, '
+                'use limit and offset instead', code=400)
+
+        return field.attname, descending
+
+    def __encode_cursor__(self, item, reverse=False):
+        position = [item.pk] if self.cursor_field == 'pk' else [getattr(item, self.cursor_field), item.pk]
+        # str keeps the microseconds of the datetimes, the database can parse it back
+        data = json.dumps({'p': position, 'r': int(reverse)}, default=str)
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('utf-8')
+
+    def __decode_cursor__(self, cursor, model):
+        if not cursor:
+            return None, False
+
+        fields = [model._meta.pk]
+        if self.cursor_field != 'pk':
+            fields.insert(0, model._meta.get_field(self.cursor_field))
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')).decode('utf-8'))
+            position = data['p']
+
+            if not isinstance(position, list) or len(position) != len(fields):
+                raise ValueError('Invalid position')
+
+            position = [field.to_python(value) for field, value in zip(fields, position)]
+            if None in position:
+                raise ValueError('Invalid position')
+
+            return position, bool(data['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def __paginate_by_cursor__(self, queryset, request):
+        self.request = request
+        self.limit = self.get_limit(request) or 100
+        self.offset = 0
+
+        self.count = None
+        if str(request.GET.get(self.count_query_param)).lower() not in ['false', '0']:
+            self.count = self.get_count(queryset)
+
+        self.cursor_field, descending = self.__get_cursor_ordering__(queryset)
+        position, reverse = self.__decode_cursor__(request.GET.get(self.cursor_query_param),
+            queryset.model)
+
+        # going backward is the same query with the ordering inverted
+        lookup = 'lt' if descending != reverse else 'gt'
+        prefix = '-' if descending != reverse else ''
+
+        if self.cursor_field == 'pk':
+            queryset = queryset.order_by(f'{prefix}pk')
+        else:
+            queryset = queryset.order_by(f'{prefix}{self.cursor_field}', f'{prefix}pk')
+
+        if position and self.cursor_field == 'pk':
+            queryset = queryset.filter(**{f'pk__{lookup}': position[0]})
+
+        elif position:
+            value, pk = position
+            queryset = queryset.filter(Q(**{f'{self.cursor_field}__{lookup}': value}) |
+                Q(**{self.cursor_field: value, f'pk__{lookup}': pk}))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+
+        if reverse:
+            results.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.cursor_results = results
+
+        return results
+
     def get_paginated_response(self, data, cache=None, cache_kwargs={}):
         next_url = self.__parse_comma__(self.get_next_link())
         previous_url = self.__parse_comma__(self.get_previous_link())
@@ -35,7 +153,8 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
                 links.append('<{}>; rel="{}"'.format(url, label))
 
         headers = {'Link': ', '.join(links)} if links else {}
-        headers['x-total-count'] = self.count
+        if self.count is not None:
+            headers['x-total-count'] = self.count
 
         if self.use_envelope:
             data = OrderedDict([
@@ -52,7 +171,36 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
 
         return Response(data, headers=headers)
 
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+
+        if not self.has_next or not self.cursor_results:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = self.__encode_cursor__(self.cursor_results[-1])
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+
+        if not self.has_previous or not self.cursor_results:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = self.__encode_cursor__(self.cursor_results[0], reverse=True)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
     def get_first_link(self):
+        if self.use_cursor:
+            if not self.has_previous:
+                return None
+
+            url = self.request.build_absolute_uri()
+            return replace_query_param(url, self.cursor_query_param, '')
+
         if self.offset <= 0:
             return None
 
@@ -60,6 +208,10 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
         return remove_query_param(url, self.offset_query_param)
 
     def get_last_link(self):
+        # a keyset can't jump to the end without walk the whole table
+        if self.use_cursor:
+            return None
+
         if self.offset + self.limit >= self.count:
             return None
 
@@ -70,10 +222,17 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
 
     def is_paginate(self, request):
         return (request.GET.get(self.limit_query_param) or
-            request.GET.get(self.offset_query_param))
+            request.GET.get(self.offset_query_param) or
+            self.cursor_query_param in request.GET)
 
     def pagination_params(self, request):
-        return {
+        params = {
             self.limit_query_param: request.GET.get(self.limit_query_param),
             self.offset_query_param: request.GET.get(self.offset_query_param),
         }
+
+        if self.cursor_query_param in request.GET:
+            params[self.cursor_query_param] = request.GET.get(self.cursor_query_param)
+            params[self.count_query_param] = request.GET.get(self.count_query_param)
+
+        return params
@@ -0,0 +1,105 @@
+import os, logging, threading
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+__local_hits__ = defaultdict(lambda: defaultdict(int))
+__local_hits_lock__ = threading.Lock()
+__local_warned__ = []
+
+
+def __get_redis__():
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    # the cache is not redis (like in the tests), the hits are kept in this process
+    except (ImportError, NotImplementedError):
+        if not __local_warned__ and os.getenv('ENV') != 'test':
+            __local_warned__.append(True)
+            logger.warning('The cache is not redis, the hits are kept in each process and only the '
+                'hits of the process that runs flush() are written')
+
+        return None
+
+
+class HitCounter:
+    """
+    Count hits in redis on the hot path, flush() writes the accumulated
+    deltas to the database with one UPDATE per distinct delta.
+
+    Without redis the hits are kept in the memory of each process, the hits of
+    a web process are never written by a flush() that runs in a worker.
+    """
+    def __init__(self, model, field='hits'):
+        self.model = model
+        self.field = field
+
+    def __key__(self):
+        return f'{self.model.__name__}__{self.field}__hits'
+
+    def hit(self, pk, amount=1):
+        redis = __get_redis__()
+        if redis is None:
+            with __local_hits_lock__:
+                __local_hits__[self.__key__()][str(pk)] += amount
+            return
+
+        redis.hincrby(self.__key__(), str(pk), amount)
+
+    def __take__(self):
+        key = self.__key__()
+        redis = __get_redis__()
+
+        if redis is None:
+            with __local_hits_lock__:
+                return dict(__local_hits__.pop(key, {}))
+
+        from redis.exceptions import ResponseError
+
+        # RENAMENX never overwrites the hash of a flush in progress, if it exists the new
+        # hits stay for the next flush and this one takes that hash, a hash left by a
+        # flush that crashed is written the same way
+        flushing_key = f'{key}__flushing'
+        try:
+            redis.renamenx(key, flushing_key)
+
+        # nobody hit it since the last flush
+        except ResponseError:
+            pass
+
+        # read and delete in one MULTI, two flushes never take the same hits
+        pipe = redis.pipeline(transaction=True)
+        pipe.hgetall(flushing_key)
+        pipe.delete(flushing_key)
+        hits, _ = pipe.execute()
+
+        return {x.decode('utf-8'): int(y) for x, y in hits.items()}
+
+    def __give_back__(self, hits):
+        for pk, amount in hits.items():
+            self.hit(pk, amount)
+
+    def flush(self):
+        hits = self.__take__()
+        if not hits:
+            return 0
+
+        by_amount = defaultdict(list)
+        for pk, amount in hits.items():
+            if amount:
+                by_amount[amount].append(pk)
+
+        try:
+            with transaction.atomic():
+                for amount, pks in by_amount.items():
+                    self.model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + amount})
+
+        except Exception:
+            logger.exception(f'Error flushing the {self.field} of {self.model.__name__}')
+            self.__give_back__(hits)
+            raise
+
+        return sum(hits.values())
@@ -1,6 +1,6 @@
 import logging
-from breathecode.authenticate.models import ProfileAcademy
 from django.contrib.auth.models import AnonymousUser
+from .academy_capabilities import get_academy_capabilities
 
 logger = logging.getLogger(__name__)
 
@@ -10,8 +10,7 @@ def localize_query(query, request, matcher=None):
     if isinstance(request.user, AnonymousUser):
         return None
 
-    academy_ids = ProfileAcademy.objects.filter(user=request.user).values_list('academy__id',
-        flat=True)
+    academy_ids = list(get_academy_capabilities(request).keys())
 
     kwargs = {}
     if matcher is None:
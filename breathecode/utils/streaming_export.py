@@ -0,0 +1,89 @@
+import csv, json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_FORMATS = ['csv', 'ndjson']
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """csv.writer writes in this buffer, it just returns the line"""
+    def write(self, value):
+        return value
+
+
+def __rows__(queryset, fields):
+    # the rows are fetched in chunks and never cached by the queryset
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def __in_chunks__(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def export_headers(fields):
+    return [x.replace('__', '.') for x in fields]
+
+
+def stream_csv(queryset, fields, headers=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers or export_headers(fields))
+
+    yield from __in_chunks__(writer.writerow(row) for row in __rows__(queryset, fields))
+
+
+def stream_ndjson(queryset, fields, headers=None):
+    keys = headers or export_headers(fields)
+    lines = (json.dumps(dict(zip(keys, row)), cls=DjangoJSONEncoder) + '\n'
+        for row in __rows__(queryset, fields))
+
+    yield from __in_chunks__(lines)
+
+
+def get_export_format(request):
+    export_format = request.GET.get('format')
+    return export_format if export_format in EXPORT_FORMATS else None
+
+
+def export_response(queryset, fields, export_format='csv', filename='export', headers=None):
+    """
+    Stream the queryset as csv or ndjson, the memory used does not grow with the
+    amount of rows, fields are lookups like the ones passed to values_list
+    """
+    stream = stream_csv if export_format == 'csv' else stream_ndjson
+
+    response = StreamingHttpResponse(stream(queryset, fields, headers),
+        content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename={filename}.{export_format}'
+    return response
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Let the content negotiation accept ?format=ndjson"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = data['results']
+
+        if not isinstance(data, list):
+            data = [data]
+
+        return ''.join(json.dumps(x, cls=DjangoJSONEncoder) + '\n' for x in data).encode('utf-8')
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_google_cloud_clients():
+    """The google cloud clients are shared by the process, each test builds them with its own mocks"""
+    from breathecode.services.google_cloud import storage, datastore
+
+    storage.reset()
+    datastore.reset()
+    yield